@@ -19,6 +19,7 @@ from .models import (
     MoodCategory,
     ReferenceContent,
 )
+from .portfolio import invalidate_mentor_portfolios
 
 
 class CustomUserAdmin(UserAdmin):
@@ -119,13 +120,24 @@ class MenteeAssessmentAdmin(admin.ModelAdmin):
     average_score_display.short_description = "Average"
 
 
-class ObjectiveItemAdmin(admin.ModelAdmin):
+class PortfolioItemAdmin(admin.ModelAdmin):
+    # These models have no delete receiver (see core.portfolio).
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_mentor_portfolios()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        invalidate_mentor_portfolios()
+
+
+class ObjectiveItemAdmin(PortfolioItemAdmin):
     list_display = ("mentee", "objective_title", "status", "progress_percent", "updated_at")
     list_filter = ("status",)
     search_fields = ("mentee__full_name", "objective_title", "objective_text")
 
 
-class YearPlanItemAdmin(admin.ModelAdmin):
+class YearPlanItemAdmin(PortfolioItemAdmin):
     list_display = ("mentee", "year", "milestone", "status", "updated_at")
     list_filter = ("year", "status")
     search_fields = ("mentee__full_name", "milestone")
@@ -0,0 +1,137 @@
+"""
+Cohort analytics over assessment ratings.
+
+A cohort is any combination of mentee school, chapter, location, programme
+and academic cycle plus the assessment's programme year.  Its ratings are
+loaded in one ``values_list`` query and reduced with NumPy: per-domain mean
+and 1-5 score distribution, and the mean change between a mentee's
+consecutive sessions in each domain.  Results are cached by cohort key until
+a transaction that saves an assessment, rating or mentee, or deletes an
+assessment or mentee, commits; provided the cache is shared by all workers
+(see ``cache_is_shared``).  Ratings have no delete receiver, so code deleting
+them outside an assessment must call ``invalidate_cohort_analytics()``.
+"""
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from core.mentee_access import bump_cache_generation_on_commit, cache_generation, cache_is_shared
+from core.models import AssessmentRating, RatingDomain
+
+
+GENERATION_CACHE_KEY = "core:cohort_analytics:generation"
+DEFAULT_CACHE_SECONDS = 60 * 60
+COHORT_FILTERS = {
+    "school": "assessment__mentee__school_id",
+    "chapter": "assessment__mentee__chapter_id",
+    "location": "assessment__mentee__location_id",
+    "programme_fk": "assessment__mentee__programme_fk_id",
+    "academic_cycle": "assessment__mentee__academic_cycle_id",
+    "year": "assessment__year",
+}
+SCORES = np.arange(1, 6)
+
+
+def invalidate_cohort_analytics():
+    bump_cache_generation_on_commit(GENERATION_CACHE_KEY)
+
+
+def cohort_key(cohort):
+    """Stable string for a cohort dict, e.g. ``"chapter=3;year=1"``."""
+    return ";".join(f"{name}={cohort[name]}" for name in COHORT_FILTERS if cohort.get(name) is not None) or "all"
+
+
+def load_cohort_ratings(cohort):
+    """Rating rows as (mentee_id, assessment_id, date ordinal, domain_id, value) int arrays.
+
+    The value column is not constrained, so ratings outside the 1-5 scale are
+    left out rather than binned into a neighbouring domain's distribution.
+    """
+    filters = {COHORT_FILTERS[name]: value for name, value in cohort.items() if value is not None}
+    rows = list(
+        AssessmentRating.objects.filter(**filters, value__range=(int(SCORES[0]), int(SCORES[-1])))
+        .order_by()
+        .values_list("assessment__mentee_id", "assessment_id", "assessment__date", "domain_id", "value")
+    )
+    if not rows:
+        return np.empty((5, 0), dtype=np.int64)
+    mentee_ids, assessment_ids, dates, domain_ids, values = zip(*rows)
+    return np.array(
+        [mentee_ids, assessment_ids, [day.toordinal() for day in dates], domain_ids, values],
+        dtype=np.int64,
+    )
+
+
+def summarise_ratings(ratings):
+    """Per-domain statistics for the arrays returned by ``load_cohort_ratings``."""
+    mentees, assessments, dates, domains, values = ratings
+    domain_ids, domain_index = np.unique(domains, return_inverse=True)
+    domain_count = len(domain_ids)
+
+    counts = np.bincount(domain_index, minlength=domain_count)
+    sums = np.bincount(domain_index, weights=values, minlength=domain_count)
+    distribution = np.bincount(
+        domain_index * len(SCORES) + (values - SCORES[0]),
+        minlength=domain_count * len(SCORES),
+    ).reshape(domain_count, len(SCORES))
+
+    # Order each mentee's ratings in a domain by session, then compare neighbours.
+    order = np.lexsort((assessments, dates, domain_index, mentees))
+    ordered_mentees, ordered_domains, ordered_values = mentees[order], domain_index[order], values[order]
+    same_series = (ordered_mentees[1:] == ordered_mentees[:-1]) & (ordered_domains[1:] == ordered_domains[:-1])
+    deltas = (ordered_values[1:] - ordered_values[:-1])[same_series]
+    delta_domains = ordered_domains[1:][same_series]
+    pairs = np.bincount(delta_domains, minlength=domain_count)
+    delta_sums = np.bincount(delta_domains, weights=deltas, minlength=domain_count)
+    improved = np.bincount(delta_domains[deltas > 0], minlength=domain_count)
+    declined = np.bincount(delta_domains[deltas < 0], minlength=domain_count)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+        mean_deltas = np.where(pairs > 0, delta_sums / np.maximum(pairs, 1), np.nan)
+
+    return {
+        "mentees": int(len(np.unique(mentees))),
+        "assessments": int(len(np.unique(assessments))),
+        "ratings": int(len(values)),
+        "domains": [
+            {
+                "domain_id": int(domain_ids[index]),
+                "count": int(counts[index]),
+                "mean": round(float(means[index]), 2),
+                "distribution": [int(value) for value in distribution[index]],
+                "session_pairs": int(pairs[index]),
+                "mean_delta": None if np.isnan(mean_deltas[index]) else round(float(mean_deltas[index]), 2),
+                "improved": int(improved[index]),
+                "declined": int(declined[index]),
+            }
+            for index in range(domain_count)
+        ],
+    }
+
+
+def _compute(cohort):
+    summary = summarise_ratings(load_cohort_ratings(cohort))
+    domains = {
+        domain.id: domain
+        for domain in RatingDomain.objects.filter(id__in=[row["domain_id"] for row in summary["domains"]])
+    }
+    for row in summary["domains"]:
+        domain = domains[row["domain_id"]]
+        row.update(name=domain.name, year=domain.year, sort_order=domain.sort_order)
+    summary["domains"].sort(key=lambda row: (row["year"], row["sort_order"], row["name"]))
+    summary["cohort"] = {name: cohort.get(name) for name in COHORT_FILTERS}
+    return summary
+
+
+def cohort_analytics(cohort):
+    """Cached analytics for ``cohort``, a dict keyed by COHORT_FILTERS names (None = any)."""
+    if not cache_is_shared():
+        return _compute(cohort)
+    key = f"core:cohort_analytics:{cache_generation(GENERATION_CACHE_KEY)}:{cohort_key(cohort)}"
+    summary = cache.get(key)
+    if summary is None:
+        summary = _compute(cohort)
+        cache.set(key, summary, getattr(settings, "COHORT_ANALYTICS_CACHE_SECONDS", DEFAULT_CACHE_SECONDS))
+    return summary
@@ -0,0 +1,140 @@
+"""
+Endorser -> mentor assignment graph.
+
+The admin assignment page reads counts with one annotated query per side and
+the full mapping with one prefetched query; edits arrive as the mentors to add
+and remove per endorser and are applied to the M2M through table in one
+transaction, so a page loaded before someone else's edit cannot undo it.
+``graph_version`` changes when a transaction that changes the graph or a user
+in it commits, and serves as the ETag of the mapping endpoint when the cache is shared by all
+workers (see ``graph_etag``).
+"""
+
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
+
+from core.mentee_access import bump_cache_generation_on_commit, cache_generation, cache_is_shared
+from core.models import CustomUser
+
+
+GENERATION_CACHE_KEY = "core:assignment_graph:generation"
+EndorserMentor = CustomUser.mentors.through
+USER_FIELDS = ("id", "first_name", "last_name", "email")
+
+
+class AssignmentGraphError(ValueError):
+    pass
+
+
+def graph_version():
+    return cache_generation(GENERATION_CACHE_KEY)
+
+
+def graph_etag(request):
+    """ETag of the mapping endpoint, or None when a per-process cache would serve stale 304s."""
+    return f'"{graph_version()}"' if cache_is_shared() else None
+
+
+def invalidate_assignment_graph():
+    bump_cache_generation_on_commit(GENERATION_CACHE_KEY)
+
+
+def endorsers_with_counts():
+    """Endorsers annotated with ``mentor_count``, in one query."""
+    return list(
+        CustomUser.objects.with_role("endorser")
+        .annotate(mentor_count=Count("mentors", distinct=True))
+        .only(*USER_FIELDS)
+        .order_by("first_name", "last_name", "id")
+    )
+
+
+def mentors_with_counts():
+    """Mentors annotated with ``endorser_count``, in one query."""
+    return list(
+        CustomUser.objects.with_role("mentor")
+        .annotate(endorser_count=Count("assigned_endorsers", distinct=True))
+        .only(*USER_FIELDS)
+        .order_by("first_name", "last_name", "id")
+    )
+
+
+def _user_row(user):
+    return {"id": user.id, "first_name": user.first_name, "last_name": user.last_name, "email": user.email}
+
+
+def endorser_mentor_mapping():
+    """Every endorser with its mentors, as JSON-ready dicts (one prefetched query)."""
+    endorsers = (
+        CustomUser.objects.with_role("endorser")
+        .only(*USER_FIELDS)
+        .prefetch_related(Prefetch("mentors", queryset=CustomUser.objects.only(*USER_FIELDS).order_by("first_name", "last_name", "id")))
+        .order_by("first_name", "last_name", "id")
+    )
+    return [
+        {**_user_row(endorser), "mentors": [_user_row(mentor) for mentor in endorser.mentors.all()]}
+        for endorser in endorsers
+    ]
+
+
+def _id_sets(changes):
+    return {
+        int(endorser_id): {int(mentor_id) for mentor_id in mentor_ids}
+        for endorser_id, mentor_ids in (changes or {}).items()
+    }
+
+
+def apply_assignments(add=None, remove=None):
+    """Add and remove endorser -> mentor links; return (added, removed).
+
+    ``add`` and ``remove`` map endorser ids to mentor ids.  Only the listed
+    links change, so edits from two admin pages never undo each other; links
+    that already exist (or are already gone) are not counted.  Raises
+    AssignmentGraphError if an id is not an endorser or mentor, or a link is
+    both added and removed.
+    """
+    add, remove = _id_sets(add), _id_sets(remove)
+    endorser_ids = set(add) | set(remove)
+    if not endorser_ids:
+        return 0, 0
+
+    for endorser_id in set(add) & set(remove):
+        if add[endorser_id] & remove[endorser_id]:
+            raise AssignmentGraphError(f"Both added and removed: {sorted(add[endorser_id] & remove[endorser_id])}")
+    mentor_ids = set().union(*add.values(), *remove.values())
+    known_endorsers = set(CustomUser.objects.with_role("endorser").filter(id__in=endorser_ids).values_list("id", flat=True))
+    known_mentors = set(CustomUser.objects.with_role("mentor").filter(id__in=mentor_ids).values_list("id", flat=True))
+    if endorser_ids - known_endorsers:
+        raise AssignmentGraphError(f"Not endorsers: {sorted(endorser_ids - known_endorsers)}")
+    if mentor_ids - known_mentors:
+        raise AssignmentGraphError(f"Not mentors: {sorted(mentor_ids - known_mentors)}")
+
+    with transaction.atomic():
+        current = {}
+        for endorser_id, mentor_id in (
+            EndorserMentor.objects.select_for_update()
+            .filter(from_customuser_id__in=endorser_ids)
+            .values_list("from_customuser_id", "to_customuser_id")
+        ):
+            current.setdefault(endorser_id, set()).add(mentor_id)
+
+        additions = [
+            EndorserMentor(from_customuser_id=endorser_id, to_customuser_id=mentor_id)
+            for endorser_id, mentors in add.items()
+            for mentor_id in sorted(mentors - current.get(endorser_id, set()))
+        ]
+        removals = Q()
+        removed = 0
+        for endorser_id, mentors in remove.items():
+            linked = current.get(endorser_id, set()) & mentors
+            if linked:
+                removals |= Q(from_customuser_id=endorser_id, to_customuser_id__in=linked)
+                removed += len(linked)
+
+        if additions:
+            EndorserMentor.objects.bulk_create(additions, ignore_conflicts=True)
+        if removed:
+            EndorserMentor.objects.filter(removals).delete()
+    if additions or removed:
+        invalidate_assignment_graph()
+    return len(additions), removed
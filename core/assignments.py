@@ -0,0 +1,88 @@
+"""
+Maintenance of the current mentor -> mentee assignment table.
+
+CurrentMentorAssignment mirrors the MentorMenteeAssignment rows that are
+active and not past their end_date, so authorisation reads are a plain
+indexed lookup by mentor.  Saves and deletes keep it current through
+core.signals; ``maintain_assignments`` (run nightly from cron) retires expired
+assignments and rebuilds the table to catch bulk writes.
+"""
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.mentee_access import invalidate_mentee_access
+from core.models import CurrentMentorAssignment, MentorMenteeAssignment
+
+
+def _is_current(assignment, today):
+    return assignment.is_active and (assignment.end_date is None or assignment.end_date >= today)
+
+
+def _current_row(assignment_id, mentor_id, mentee_id, end_date):
+    return CurrentMentorAssignment(assignment_id=assignment_id, mentor_id=mentor_id, mentee_id=mentee_id, end_date=end_date)
+
+
+def current_assignment_filter(today=None):
+    today = today or timezone.now().date()
+    return Q(end_date__isnull=True) | Q(end_date__gte=today)
+
+
+def refresh_current_assignment(assignment):
+    """Add, update or drop the current row for one saved assignment."""
+    if _is_current(assignment, timezone.now().date()):
+        CurrentMentorAssignment.objects.update_or_create(
+            assignment=assignment,
+            defaults={
+                "mentor_id": assignment.mentor_id,
+                "mentee_id": assignment.mentee_id,
+                "end_date": assignment.end_date,
+            },
+        )
+    else:
+        CurrentMentorAssignment.objects.filter(assignment=assignment).delete()
+
+
+def expire_assignments(today=None, dry_run=False):
+    """Set is_active=False on active assignments whose end_date has passed; return the count."""
+    today = today or timezone.now().date()
+    expired = MentorMenteeAssignment.objects.filter(is_active=True, end_date__lt=today)
+    if dry_run:
+        return expired.count()
+    return expired.update(is_active=False)
+
+
+def rebuild_current_assignments(today=None, dry_run=False, batch_size=1000):
+    """Diff the current table against live assignments; return (added, updated, removed)."""
+    today = today or timezone.now().date()
+    wanted = {
+        assignment_id: (mentor_id, mentee_id, end_date)
+        for assignment_id, mentor_id, mentee_id, end_date in MentorMenteeAssignment.objects.filter(is_active=True)
+        .filter(current_assignment_filter(today))
+        .values_list("id", "mentor_id", "mentee_id", "end_date")
+        .iterator(chunk_size=batch_size)
+    }
+    existing = {
+        assignment_id: (mentor_id, mentee_id, end_date)
+        for assignment_id, mentor_id, mentee_id, end_date in CurrentMentorAssignment.objects.values_list(
+            "assignment_id", "mentor_id", "mentee_id", "end_date"
+        ).iterator(chunk_size=batch_size)
+    }
+
+    stale = [assignment_id for assignment_id, row in existing.items() if wanted.get(assignment_id) != row]
+    changed = {assignment_id for assignment_id in stale if assignment_id in wanted}
+    missing = [assignment_id for assignment_id in wanted if assignment_id not in existing]
+    counts = (len(missing), len(changed), len(stale) - len(changed))
+    if dry_run or not (stale or missing):
+        return counts
+
+    with transaction.atomic():
+        for start in range(0, len(stale), batch_size):
+            CurrentMentorAssignment.objects.filter(assignment_id__in=stale[start:start + batch_size]).delete()
+        CurrentMentorAssignment.objects.bulk_create(
+            [_current_row(assignment_id, *wanted[assignment_id]) for assignment_id in [*missing, *changed]],
+            batch_size=batch_size,
+        )
+    invalidate_mentee_access()
+    return counts
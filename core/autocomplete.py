@@ -0,0 +1,95 @@
+"""
+Prefix-search sources behind the autocomplete widgets.
+
+Each entry in AUTOCOMPLETE_SOURCES names the roles that may query it, the
+queryset of valid choices for the requesting user (forms validate submitted
+ids against the same queryset), the columns searched and the option label.
+Searches compare ``UPPER(column)`` against a prefix range so they can use the
+expression indexes on those columns instead of scanning the table.
+"""
+
+from django.db.models import Q
+from django.db.models.functions import Upper
+
+from core.models import CustomUser, Mentee, UserRole
+
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+USER_SEARCH_FIELDS = ("first_name", "last_name", "username", "email")
+MENTEE_SEARCH_FIELDS = ("full_name", "register_no")
+
+
+def user_label(user):
+    return f"{user.get_full_name() or user.username} ({user.get_role_display()})"
+
+
+def mentee_label(mentee):
+    return f"{mentee.full_name} ({mentee.register_no})" if mentee.register_no else mentee.full_name
+
+
+def work_item_assignees(creator):
+    """Users ``creator`` may assign work items to."""
+    if creator.role == "admin":
+        queryset = CustomUser.objects.exclude(role="admin")
+    else:
+        queryset = CustomUser.objects.filter(
+            Q(id__in=UserRole.user_ids_with_role("mentor"))
+            | Q(id__in=UserRole.user_ids_with_role("volunteer"), reporting_assignment__endorser=creator)
+        )
+    return queryset.distinct().order_by("first_name", "username")
+
+
+AUTOCOMPLETE_SOURCES = {
+    "work-item-assignees": {
+        "roles": ("admin", "endorser"),
+        "queryset": work_item_assignees,
+        "fields": USER_SEARCH_FIELDS,
+        "label": user_label,
+    },
+    "mentors": {
+        "roles": ("admin",),
+        "queryset": lambda user: CustomUser.objects.with_role("mentor").order_by("first_name", "username"),
+        "fields": USER_SEARCH_FIELDS,
+        "label": user_label,
+    },
+    "volunteers": {
+        "roles": ("admin",),
+        "queryset": lambda user: CustomUser.objects.with_role("volunteer").order_by("first_name", "username"),
+        "fields": USER_SEARCH_FIELDS,
+        "label": user_label,
+    },
+    "endorsers": {
+        "roles": ("admin",),
+        "queryset": lambda user: CustomUser.objects.with_role("endorser").order_by("first_name", "username"),
+        "fields": USER_SEARCH_FIELDS,
+        "label": user_label,
+    },
+    "mentees": {
+        "roles": ("admin",),
+        "queryset": lambda user: Mentee.objects.order_by("full_name", "id"),
+        "fields": MENTEE_SEARCH_FIELDS,
+        "label": mentee_label,
+    },
+}
+
+
+def prefix_search(queryset, fields, term):
+    """Rows of ``queryset`` where any of ``fields`` starts with ``term``, case-insensitively."""
+    term = term.strip().upper()
+    if not term:
+        return queryset
+    annotations = {f"{field}_upper": Upper(field) for field in fields}
+    matches = Q()
+    for field in fields:
+        # A range on UPPER(field) is an index range scan; LIKE/ILIKE often is not.
+        matches |= Q(**{f"{field}_upper__gte": term, f"{field}_upper__lt": term + "\uffff"})
+    return queryset.annotate(**annotations).filter(matches)
+
+
+def search(source, user, term, limit=DEFAULT_LIMIT):
+    """Up to ``limit`` (id, label) pairs from ``source`` and whether more exist."""
+    config = AUTOCOMPLETE_SOURCES[source]
+    limit = max(1, min(limit, MAX_LIMIT))
+    rows = list(prefix_search(config["queryset"](user), config["fields"], term)[: limit + 1])
+    return [(row.pk, config["label"](row)) for row in rows[:limit]], len(rows) > limit
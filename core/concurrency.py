@@ -0,0 +1,98 @@
+"""
+Concurrent ORM reads for async dashboard views.
+
+Django's async queryset methods (``acount``, ``afirst`` ...) all hop onto the
+single thread-sensitive executor, so awaiting several of them together still
+runs them one after another.  ``gather_reads`` instead runs each read on a
+small worker pool, where every thread holds its own database connection, and
+awaits them together.  It falls back to one sequential pass on the request's
+own connection when that is not safe or useful:
+
+* SQLite serialises access to the database file (and test databases live in
+  memory), so fanning out buys nothing there;
+* inside a transaction (``ATOMIC_REQUESTS``, tests) other connections cannot
+  see the request's uncommitted rows.
+
+``DASHBOARD_CONCURRENT_READS`` forces the choice (True/False); the default
+``None`` decides from the database vendor.  Worker connections get the
+request connection's execute wrappers, so query budgets, Server-Timing and
+the per-view report count the fanned-out reads like any other query.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.shortcuts import render
+
+
+DEFAULT_READ_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _read_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "DASHBOARD_READ_WORKERS", DEFAULT_READ_WORKERS),
+                thread_name_prefix="dashboard-read",
+            )
+        return _executor
+
+
+def concurrent_reads_enabled():
+    """Whether reads may fan out to other connections; call on the request's thread."""
+    if connection.in_atomic_block:
+        return False
+    setting = getattr(settings, "DASHBOARD_CONCURRENT_READS", None)
+    if setting is None:
+        return connection.vendor != "sqlite"
+    return bool(setting)
+
+
+def _run_sequentially(reads):
+    return {name: read() for name, read in reads.items()}
+
+
+def _request_connection_state():
+    return concurrent_reads_enabled(), list(connection.execute_wrappers)
+
+
+def _run_in_worker(read, wrappers):
+    try:
+        with ExitStack() as stack:
+            for wrapper in wrappers:
+                stack.enter_context(connection.execute_wrapper(wrapper))
+            return read()
+    finally:
+        # Pool threads outlive the request, so honour CONN_MAX_AGE here as
+        # request_finished would for a request thread.
+        close_old_connections()
+
+
+async def gather_reads(**reads):
+    """Evaluate independent zero-argument reads and return their results by name.
+
+    Each read must fully evaluate what it fetches (``qs.count``, ``qs.first``,
+    ``lambda: list(qs[:5])``) so nothing lazy reaches the template.
+    """
+    enabled, wrappers = await sync_to_async(_request_connection_state)()
+    if not enabled:
+        return await sync_to_async(_run_sequentially)(reads)
+
+    names = list(reads)
+    run = sync_to_async(_run_in_worker, thread_sensitive=False, executor=_read_executor())
+    results = await asyncio.gather(*(run(reads[name], wrappers) for name in names))
+    return dict(zip(names, results))
+
+
+async def render_async(request, template_name, context):
+    """``render`` for async views; context processors and templates may still query."""
+    return await sync_to_async(render)(request, template_name, context)
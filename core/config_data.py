@@ -0,0 +1,297 @@
+"""
+Bulk writes and portable snapshots of the admin-editable configuration.
+
+``upsert`` is the write path shared by ``seed_config_data`` and snapshot
+imports.  A snapshot is JSON Lines: a header line naming the format and
+version, then one ``{"model": <config key>, "fields": {...}}`` line per row,
+model by model in dependency order.  Foreign keys are written as the natural
+key of the target row (``["Christ CBSE"]`` rather than a school id), so a
+snapshot taken from one database applies cleanly to another.
+"""
+
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core.analytics import invalidate_cohort_analytics
+from core.models import (
+    AcademicCycle,
+    Chapter,
+    CustomUser,
+    DomainIndicator,
+    Location,
+    MoodCategory,
+    Programme,
+    RatingDomain,
+    RatingScaleDefinition,
+    ReferenceContent,
+    School,
+    SessionType,
+    StatusConfig,
+    TemplateConfig,
+)
+from core.portfolio import invalidate_mentor_portfolios
+
+
+SNAPSHOT_FORMAT = "lud-suite-config"
+# Bump whenever a snapshot model gains, loses or renames a field.
+SNAPSHOT_VERSION = 1
+
+# Keys match CONFIG_REGISTRY in core/views/admin.py; a model is listed after
+# every model it references.
+SNAPSHOT_MODELS = [
+    ("schools", School),
+    ("locations", Location),
+    ("chapters", Chapter),
+    ("academic-cycles", AcademicCycle),
+    ("programmes", Programme),
+    ("statuses", StatusConfig),
+    ("session-types", SessionType),
+    ("rating-domains", RatingDomain),
+    ("domain-indicators", DomainIndicator),
+    ("rating-scale-definitions", RatingScaleDefinition),
+    ("mood-categories", MoodCategory),
+    ("reference-content", ReferenceContent),
+    ("template-configs", TemplateConfig),
+]
+
+NATURAL_KEYS = {
+    School: ("name",),
+    Location: ("code",),
+    Chapter: ("school", "name"),
+    AcademicCycle: ("year_label",),
+    Programme: ("name",),
+    StatusConfig: ("name",),
+    SessionType: ("name",),
+    RatingDomain: ("year", "name"),
+    DomainIndicator: ("domain", "sort_order"),
+    RatingScaleDefinition: ("domain", "score"),
+    MoodCategory: ("name",),
+    ReferenceContent: ("section", "title"),
+    TemplateConfig: ("scope", "year", "name"),
+    # Chapter leaders are users, which snapshots reference but never carry.
+    CustomUser: ("username",),
+}
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def upsert(model, key_fields, rows, update_fields=()):
+    """Write ``rows`` (field dicts) to ``model`` matching existing rows on ``key_fields``.
+
+    Rows whose key is missing are inserted; existing rows get
+    ``update_fields`` overwritten, or are left alone when it is empty.
+    Existing keys come from one ``values_list`` query and the write is one
+    ``bulk_create`` that upserts on the preloaded primary key, which also
+    covers natural keys with nullable columns (TemplateConfig.year).
+    Returns {key tuple: pk}.
+    """
+    existing = {tuple(values[:-1]): values[-1] for values in model.objects.values_list(*key_fields, "pk")}
+    objs = []
+    for row in rows:
+        pk = existing.get(tuple(row[field] for field in key_fields))
+        if pk is None or update_fields:
+            objs.append(model(pk=pk, **row))
+    if not objs:
+        return existing
+    if update_fields:
+        model.objects.bulk_create(objs, update_conflicts=True, unique_fields=["pk"], update_fields=list(update_fields))
+    else:
+        model.objects.bulk_create(objs)
+    if any(obj.pk is None for obj in objs):
+        # Backends that cannot return ids from an upsert.
+        return {tuple(values[:-1]): values[-1] for values in model.objects.values_list(*key_fields, "pk")}
+    return {**existing, **{tuple(getattr(obj, field) for field in key_fields): obj.pk for obj in objs}}
+
+
+def _fields(model):
+    return [field for field in model._meta.concrete_fields if not field.primary_key]
+
+
+def _dumps(payload):
+    return json.dumps(payload, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+def iter_snapshot():
+    """Yield the snapshot line by line; each model is read with one query."""
+    yield _dumps({
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "exported_at": timezone.now(),
+        "models": [key for key, _ in SNAPSHOT_MODELS],
+    })
+    for key, model in SNAPSHOT_MODELS:
+        columns = [
+            (field, [f"{field.name}__{name}" for name in NATURAL_KEYS[field.related_model]] if field.is_relation else [field.attname])
+            for field in _fields(model)
+        ]
+        lookups = [lookup for _, field_lookups in columns for lookup in field_lookups]
+        for values in model.objects.order_by("pk").values_list(*lookups).iterator():
+            fields = {}
+            offset = 0
+            for field, field_lookups in columns:
+                value = values[offset:offset + len(field_lookups)]
+                offset += len(field_lookups)
+                if field.is_relation:
+                    fields[field.name] = None if all(part is None for part in value) else list(value)
+                else:
+                    fields[field.name] = value[0]
+            yield _dumps({"model": key, "fields": fields})
+
+
+def read_snapshot(lines):
+    """Parse snapshot ``lines`` (str or bytes) into {config key: [(line number, fields), ...]}."""
+    models = dict(SNAPSHOT_MODELS)
+    rows = {}
+    header = None
+    for number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            try:
+                line = line.decode("utf-8")
+            except UnicodeDecodeError as exc:
+                raise SnapshotError(f"Line {number} is not UTF-8 text.") from exc
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise SnapshotError(f"Line {number} is not valid JSON: {exc}") from exc
+        if header is None:
+            header = record
+            if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+                raise SnapshotError("Not a configuration snapshot.")
+            if header.get("version") != SNAPSHOT_VERSION:
+                raise SnapshotError(f"Unsupported snapshot version {header.get('version')} (expected {SNAPSHOT_VERSION}).")
+            continue
+        if not isinstance(record, dict):
+            raise SnapshotError(f"Line {number} is not a JSON object.")
+        model = models.get(record.get("model"))
+        if model is None:
+            raise SnapshotError(f"Line {number}: unknown model {record.get('model')!r}.")
+        expected = {field.name for field in _fields(model)}
+        if not isinstance(record.get("fields"), dict) or set(record["fields"]) != expected:
+            raise SnapshotError(f"Line {number}: {record['model']} fields do not match this version.")
+        rows.setdefault(record["model"], []).append((number, record["fields"]))
+    if header is None:
+        raise SnapshotError("The snapshot is empty.")
+    return rows
+
+
+def _unique_field_sets(model):
+    """Attnames of the natural key and of every unique column or unique_together set of ``model``."""
+    field_sets = [NATURAL_KEYS[model]]
+    field_sets += [(field.name,) for field in _fields(model) if field.unique]
+    field_sets += [tuple(names) for names in model._meta.unique_together]
+    attnames = []
+    for names in field_sets:
+        names = tuple(model._meta.get_field(name).attname for name in names)
+        if names not in attnames:
+            attnames.append(names)
+    return attnames
+
+
+def _check_unique(model, key_fields, numbered_rows):
+    """Raise SnapshotError for a row that repeats an earlier row's key or takes another row's unique value.
+
+    Catching these here names the line; the database would only report an
+    IntegrityError for the whole model.
+    """
+    for names in _unique_field_sets(model):
+        taken = {} if list(names) == key_fields else {
+            tuple(values[:len(names)]): tuple(values[len(names):])
+            for values in model.objects.values_list(*names, *key_fields)
+        }
+        seen = {}
+        for number, row in numbered_rows:
+            values = tuple(row[name] for name in names)
+            if None in values:
+                continue
+            key = tuple(row[field] for field in key_fields)
+            label = ", ".join(f"{name}={value!r}" for name, value in zip(names, values))
+            if values in seen:
+                raise SnapshotError(f"Line {number}: {model._meta.verbose_name} {label} repeats line {seen[values]}.")
+            seen[values] = number
+            if taken.get(values, key) != key:
+                raise SnapshotError(f"Line {number}: another {model._meta.verbose_name} already has {label}.")
+
+
+def apply_snapshot(lines):
+    """Upsert every row of a snapshot in dependency order, in one transaction; return rows per config key.
+
+    A nullable reference whose natural key matches nothing here (a chapter
+    leader without an account in this database) keeps the row's current
+    value, or stays empty on new rows.  Rows that cannot be written raise
+    SnapshotError naming their line.
+    """
+    rows = read_snapshot(lines)
+    key_maps = {}
+    unresolved = object()
+
+    def resolve(field, natural_key):
+        target = field.related_model
+        if target not in key_maps:
+            # Loaded on first use, after the target's own rows were applied.
+            key_maps[target] = {
+                tuple(values[:-1]): values[-1]
+                for values in target.objects.values_list(*NATURAL_KEYS[target], "pk")
+            }
+        if not isinstance(natural_key, list):
+            raise SnapshotError(f"{natural_key!r} is not a natural key.")
+        pk = key_maps[target].get(tuple(natural_key))
+        if pk is None:
+            if not field.null:
+                raise SnapshotError(f"No {target._meta.verbose_name} matches {natural_key}.")
+            return unresolved
+        return pk
+
+    counts = {}
+    with transaction.atomic():
+        for key, model in SNAPSHOT_MODELS:
+            model_rows = rows.get(key, [])
+            if not model_rows:
+                continue
+            fields = _fields(model)
+            key_fields = [model._meta.get_field(name).attname for name in NATURAL_KEYS[model]]
+            prepared = []
+            kept = []
+            for number, values in model_rows:
+                row = {}
+                for field in fields:
+                    value = values[field.name]
+                    try:
+                        if field.is_relation:
+                            row[field.attname] = None if value is None else resolve(field, value)
+                        else:
+                            row[field.attname] = field.to_python(value)
+                    except ValidationError as exc:
+                        raise SnapshotError(f"Line {number}: {field.name}: {' '.join(exc.messages)}") from exc
+                    except SnapshotError as exc:
+                        raise SnapshotError(f"Line {number}: {field.name}: {exc}") from exc
+                    if row[field.attname] is unresolved:
+                        kept.append((row, field.attname))
+                prepared.append((number, row))
+            if kept:
+                kept_fields = sorted({attname for _, attname in kept})
+                current = {
+                    tuple(values[:len(key_fields)]): dict(zip(kept_fields, values[len(key_fields):]))
+                    for values in model.objects.values_list(*key_fields, *kept_fields)
+                }
+                for row, attname in kept:
+                    row[attname] = current.get(tuple(row[field] for field in key_fields), {}).get(attname)
+            _check_unique(model, key_fields, prepared)
+            update_fields = [field.attname for field in fields if field.attname not in key_fields]
+            try:
+                upsert(model, key_fields, [row for _, row in prepared], update_fields=update_fields)
+            except IntegrityError as exc:
+                raise SnapshotError(f"Lines {prepared[0][0]}-{prepared[-1][0]} ({key}): {exc}") from exc
+            counts[key] = len(prepared)
+
+    # Bulk writes skip the post_save receivers that reset these caches.
+    invalidate_mentor_portfolios()
+    invalidate_cohort_analytics()
+    return counts
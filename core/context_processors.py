@@ -1,8 +1,9 @@
-from core.views.common import role_layout_context
+from core.identity import request_identity
+from core.perf import timing_phase
 
 
 def role_shell(request):
-    user = getattr(request, "user", None)
-    if not getattr(user, "is_authenticated", False):
+    if not getattr(getattr(request, "user", None), "is_authenticated", False):
         return {}
-    return role_layout_context(user)
+    with timing_phase("ctx"):
+        return request_identity(request).layout
@@ -1,24 +1,43 @@
+from asgiref.sync import iscoroutinefunction
 from django.core.exceptions import PermissionDenied
 from django.contrib.auth.decorators import login_required
 from functools import wraps
 
+from core.identity import request_identity
+
+
+def _check_roles(request, allowed_roles):
+    identity = request_identity(request)
+    # First, check if the user is logged in
+    if not identity.is_authenticated:
+        raise PermissionDenied("You must be logged in to access this page.")
+
+    # Assigned roles and the active role are resolved once per request
+    if identity.has_any_role(allowed_roles):
+        return
+
+    raise PermissionDenied("You are not allowed to access this page.")
+
+
 def role_required(allowed_roles=[]):
     def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_async_view(request, *args, **kwargs):
+                user = await request.auser()
+                # Hand the resolved user to sync code (context processors,
+                # templates) so it is not loaded a second time.
+                request.user = user
+                _check_roles(request, allowed_roles)
+                return await view_func(request, *args, **kwargs)
+            # Read by the route harness (core/test_query_budgets.py).
+            _wrapped_async_view.allowed_roles = tuple(allowed_roles)
+            return _wrapped_async_view
+
         @wraps(view_func)
         def _wrapped_view(request, *args, **kwargs):
-            # First, check if the user is logged in
-            if not request.user.is_authenticated:
-                raise PermissionDenied("You must be logged in to access this page.")
-
-            # Check if any of the user's roles overlap with allowed_roles
-            user_roles = getattr(request.user, 'roles', None) or []
-            if user_roles and any(r in allowed_roles for r in user_roles):
-                return view_func(request, *args, **kwargs)
-
-            # Fallback: check the active role field
-            if hasattr(request.user, "role") and request.user.role in allowed_roles:
-                return view_func(request, *args, **kwargs)
-
-            raise PermissionDenied("You are not allowed to access this page.")
+            _check_roles(request, allowed_roles)
+            return view_func(request, *args, **kwargs)
+        _wrapped_view.allowed_roles = tuple(allowed_roles)
         return _wrapped_view
     return decorator
@@ -0,0 +1,144 @@
+"""
+Progress workbook covering many mentees at once.
+
+``write_cohort_workbook`` streams every mentee of a queryset into a
+write-only openpyxl workbook with one sheet per section (mentees,
+objectives, year plans, assessments).  Mentees are read with
+``iterator(chunk_size=...)`` so each batch costs the same handful of
+queries (mentees plus one prefetch per section) and only one batch of
+model instances is held in memory; the workbook itself spools rows to
+temporary files until it is saved.
+"""
+
+import openpyxl
+from django.db.models import Prefetch
+
+from core.models import AssessmentRating, MenteeAssessment, ObjectiveItem, RatingDomain, YearPlanItem
+from core.perf import timing_phase
+
+
+DEFAULT_BATCH_SIZE = 500
+
+MENTEE_HEADERS = ["Mentee ID", "Mentee", "Register No", "School", "Chapter", "Current Year", "Active"]
+OBJECTIVE_HEADERS = [
+    "Mentee ID",
+    "Mentee",
+    "Title",
+    "Objective Text",
+    "Action Items",
+    "Start Date",
+    "End Date",
+    "Expected Outcome",
+    "Status",
+    "Progress %",
+    "Mentee Remarks",
+    "Mentor Comments",
+]
+YEAR_PLAN_HEADERS = [
+    "Mentee ID",
+    "Mentee",
+    "Year",
+    "Milestone",
+    "Deliverable",
+    "Target Date",
+    "Target Period",
+    "Status",
+    "Remarks",
+    "Mentor Comments",
+    "Review Date",
+]
+ASSESSMENT_HEADERS = [
+    "Mentee ID",
+    "Mentee",
+    "Date",
+    "Year",
+    "Session Type",
+    "Theme/Topic",
+    "Beginning Mood",
+    "End Mood",
+    "Average",
+    "Mentor Remarks",
+    "Action Plan",
+]
+
+
+def _date(value):
+    return value.strftime("%Y-%m-%d") if value else ""
+
+
+def cohort_queryset(mentees):
+    """``mentees`` with every section the workbook needs prefetched."""
+    return (
+        mentees.select_related("school", "chapter__school")
+        .prefetch_related(
+            Prefetch("objective_items", queryset=ObjectiveItem.objects.select_related("status")),
+            Prefetch("year_plan_items", queryset=YearPlanItem.objects.select_related("status")),
+            Prefetch(
+                "assessments",
+                queryset=MenteeAssessment.objects.select_related("session_type").prefetch_related(
+                    Prefetch("ratings", queryset=AssessmentRating.objects.order_by())
+                ),
+            ),
+        )
+        .order_by("full_name", "id")
+    )
+
+
+def write_cohort_workbook(mentees, stream, batch_size=DEFAULT_BATCH_SIZE):
+    """Write the progress workbook for ``mentees`` (a Mentee queryset) to ``stream``; return the mentee count."""
+    domains = list(
+        RatingDomain.objects.filter(assessmentrating__assessment__mentee__in=mentees.values("id"))
+        .distinct()
+        .order_by("year", "sort_order", "name")
+    )
+
+    workbook = openpyxl.Workbook(write_only=True)
+    mentee_sheet = workbook.create_sheet("Mentees")
+    objective_sheet = workbook.create_sheet("Objectives")
+    year_plan_sheet = workbook.create_sheet("Year Plans")
+    assessment_sheet = workbook.create_sheet("Assessments")
+    mentee_sheet.append(MENTEE_HEADERS)
+    objective_sheet.append(OBJECTIVE_HEADERS)
+    year_plan_sheet.append(YEAR_PLAN_HEADERS)
+    assessment_sheet.append(ASSESSMENT_HEADERS + [f"{domain.get_year_display()} - {domain.name}" for domain in domains])
+
+    count = 0
+    for mentee in cohort_queryset(mentees).iterator(chunk_size=batch_size):
+        count += 1
+        name = mentee.full_name
+        mentee_sheet.append([
+            mentee.id,
+            name,
+            mentee.register_no,
+            mentee.school.name if mentee.school else "",
+            str(mentee.chapter) if mentee.chapter else "",
+            mentee.get_current_year_display(),
+            "Yes" if mentee.is_active else "No",
+        ])
+        for obj in mentee.objective_items.all():
+            objective_sheet.append([
+                mentee.id, name, obj.objective_title, obj.objective_text, obj.action_items,
+                _date(obj.start_date), _date(obj.end_date), obj.expected_outcome,
+                obj.status.name if obj.status else "", obj.progress_percent,
+                obj.mentee_remarks, obj.mentor_comments,
+            ])
+        for plan in mentee.year_plan_items.all():
+            year_plan_sheet.append([
+                mentee.id, name, plan.get_year_display(), plan.milestone, plan.deliverable,
+                _date(plan.target_date), plan.target_period, plan.status.name if plan.status else "",
+                plan.remarks, plan.mentor_comments, _date(plan.review_date),
+            ])
+        for assessment in mentee.assessments.all():
+            ratings = {rating.domain_id: rating.value for rating in assessment.ratings.all()}
+            average = round(sum(ratings.values()) / len(ratings), 2) if ratings else None
+            assessment_sheet.append([
+                mentee.id, name, _date(assessment.date), assessment.get_year_display(),
+                assessment.session_type.name if assessment.session_type else "",
+                assessment.theme_topic, assessment.beginning_mood, assessment.end_mood,
+                average, assessment.mentor_remarks, assessment.action_plan,
+                *[ratings.get(domain.id, "") for domain in domains],
+            ])
+
+    with timing_phase("export"):
+        workbook.save(stream)
+    return count
@@ -1,7 +1,7 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.urls import reverse
 from .models import (
     CustomUser,
     Activity,
@@ -25,6 +25,7 @@ from .models import (
     Chapter,
     AcademicCycle,
     Programme,
+    ProgramYear,
     ReflectiveReport,
     DiaryEntry,
     VolunteerTranscript,
@@ -33,9 +34,48 @@ from .models import (
     VolunteerReportingAssignment,
 )
 from decimal import Decimal
+from .autocomplete import AUTOCOMPLETE_SOURCES, mentee_label, user_label, work_item_assignees
 User = get_user_model()
 
 
+class AutocompleteWidgetMixin:
+    """Select that renders only the selected options and searches the rest via the autocomplete endpoint.
+
+    The field keeps its full queryset, so submitted ids are still validated
+    server-side with a single ``pk__in`` lookup.
+    """
+
+    def __init__(self, source, attrs=None):
+        super().__init__(attrs)
+        self.source = source
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["attrs"]["data-autocomplete-url"] = reverse("autocomplete", args=[self.source])
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        selected = [item for item in value if str(item).isdigit()]
+        options = []
+        if not self.allow_multiple_selected:
+            options.append(self.create_option(name, "", "---------", not selected, 0, attrs=attrs))
+        if selected:
+            field = self.choices.field
+            for obj in self.choices.queryset.filter(pk__in=selected):
+                options.append(
+                    self.create_option(name, str(obj.pk), field.label_from_instance(obj), True, len(options), attrs=attrs)
+                )
+        return [(None, options, 0)]
+
+
+class AutocompleteSelect(AutocompleteWidgetMixin, forms.Select):
+    pass
+
+
+class AutocompleteSelectMultiple(AutocompleteWidgetMixin, forms.SelectMultiple):
+    pass
+
+
 # -------------------- Activity Form --------------------
 class ActivityForm(forms.ModelForm):
     
@@ -102,7 +142,7 @@ class ProfileForm(forms.ModelForm):
 class WorkScheduleForm(forms.ModelForm):
     assignees = forms.ModelMultipleChoiceField(
         queryset=User.objects.none(),
-        widget=forms.CheckboxSelectMultiple(attrs={'class': 'form-check-input'}),
+        widget=AutocompleteSelectMultiple("work-item-assignees", attrs={'class': 'form-select'}),
         required=True
     )
 
@@ -123,18 +163,10 @@ class WorkScheduleForm(forms.ModelForm):
             creator = kwargs.pop("endorser", None)
         super().__init__(*args, **kwargs)
         if creator:
-            if creator.role == "admin":
-                assignee_queryset = User.objects.exclude(role="admin")
-            else:
-                assignee_queryset = User.objects.filter(
-                    Q(role="mentor") | Q(role="volunteer", reporting_assignment__endorser=creator)
-                )
-            self.fields["assignees"].queryset = assignee_queryset.distinct().order_by("first_name", "username")
+            self.fields["assignees"].queryset = work_item_assignees(creator)
         if self.instance.pk:
-            self.fields["assignees"].initial = self.instance.mentors.all()
-        self.fields['assignees'].label_from_instance = (
-            lambda obj: f"{obj.get_full_name() or obj.username} ({obj.get_role_display()})"
-        )
+            self.fields["assignees"].initial = self.instance.mentors.values_list("id", flat=True)
+        self.fields['assignees'].label_from_instance = user_label
 
 
 class WorkScheduleAssignmentUpdateForm(forms.ModelForm):
@@ -293,31 +325,62 @@ class MentorMenteeAssignmentForm(forms.ModelForm):
         model = MentorMenteeAssignment
         fields = ["mentor", "mentee", "start_date", "end_date", "is_active"]
         widgets = {
-            "mentor": forms.Select(attrs={"class": "form-select"}),
-            "mentee": forms.Select(attrs={"class": "form-select"}),
+            "mentor": AutocompleteSelect("mentors", attrs={"class": "form-select"}),
+            "mentee": AutocompleteSelect("mentees", attrs={"class": "form-select"}),
             "start_date": forms.DateInput(attrs={"type": "date", "class": "form-control"}),
             "end_date": forms.DateInput(attrs={"type": "date", "class": "form-control"}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["mentor"].queryset = AUTOCOMPLETE_SOURCES["mentors"]["queryset"](None)
+        self.fields["mentor"].label_from_instance = user_label
+        self.fields["mentee"].label_from_instance = mentee_label
+
 
 class VolunteerReportingAssignmentForm(forms.ModelForm):
     class Meta:
         model = VolunteerReportingAssignment
         fields = ["volunteer", "programme", "location", "endorser"]
         widgets = {
-            "volunteer": forms.Select(attrs={"class": "form-select"}),
+            "volunteer": AutocompleteSelect("volunteers", attrs={"class": "form-select"}),
             "programme": forms.Select(attrs={"class": "form-select"}),
             "location": forms.Select(attrs={"class": "form-select"}),
-            "endorser": forms.Select(attrs={"class": "form-select"}),
+            "endorser": AutocompleteSelect("endorsers", attrs={"class": "form-select"}),
         }
 
     def __init__(self, *args, **kwargs):
         kwargs.pop("user", None)
         super().__init__(*args, **kwargs)
-        self.fields["volunteer"].queryset = User.objects.filter(role="volunteer").order_by("first_name", "username")
+        self.fields["volunteer"].queryset = AUTOCOMPLETE_SOURCES["volunteers"]["queryset"](None)
         self.fields["programme"].queryset = Programme.objects.filter(is_active=True).order_by("name")
         self.fields["location"].queryset = Location.objects.filter(is_active=True).order_by("name")
-        self.fields["endorser"].queryset = User.objects.filter(role="endorser").order_by("first_name", "username")
+        self.fields["endorser"].queryset = AUTOCOMPLETE_SOURCES["endorsers"]["queryset"](None)
+        self.fields["volunteer"].label_from_instance = user_label
+        self.fields["endorser"].label_from_instance = user_label
+
+
+class CohortFilterForm(forms.Form):
+    school = forms.ModelChoiceField(queryset=School.objects.order_by("name"), required=False)
+    chapter = forms.ModelChoiceField(queryset=Chapter.objects.select_related("school"), required=False)
+    location = forms.ModelChoiceField(queryset=Location.objects.order_by("name"), required=False)
+    programme_fk = forms.ModelChoiceField(queryset=Programme.objects.order_by("name"), required=False, label="Programme")
+    academic_cycle = forms.ModelChoiceField(queryset=AcademicCycle.objects.all(), required=False)
+    year = forms.TypedChoiceField(
+        choices=[("", "Any year"), *ProgramYear.choices], coerce=int, empty_value=None, required=False
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            field.widget.attrs["class"] = "form-select form-select-sm"
+
+    def cohort(self):
+        """Selected filters as ids, for core.analytics.cohort_analytics()."""
+        return {
+            name: getattr(value, "pk", value)
+            for name, value in self.cleaned_data.items()
+        }
 
 
 class StatusConfigForm(forms.ModelForm):
@@ -444,9 +507,7 @@ class ChapterForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields["leader"].queryset = User.objects.filter(
-            role__in=["mentor", "endorser"]
-        )
+        self.fields["leader"].queryset = User.objects.with_role("mentor", "endorser")
         self.fields["leader"].required = False
 
 
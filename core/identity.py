@@ -0,0 +1,72 @@
+from django.utils.functional import cached_property
+
+from core.mentee_access import accessible_mentee_ids
+
+
+# core.views.common is imported inside the properties: the decorators import
+# this module while the views package is still loading.
+
+
+class RequestIdentity:
+    """What a request needs to know about its user, each part resolved once on first use."""
+
+    def __init__(self, user):
+        self.user = user
+
+    @property
+    def is_authenticated(self):
+        return getattr(self.user, "is_authenticated", False)
+
+    @property
+    def is_admin(self):
+        return self.is_authenticated and (self.user.is_superuser or self.user.role == "admin")
+
+    @cached_property
+    def roles(self):
+        if not self.is_authenticated:
+            return frozenset()
+        roles = set(getattr(self.user, "roles", None) or [])
+        if getattr(self.user, "role", None):
+            roles.add(self.user.role)
+        return frozenset(roles)
+
+    def has_any_role(self, allowed_roles):
+        return not self.roles.isdisjoint(allowed_roles)
+
+    @cached_property
+    def layout(self):
+        if not self.is_authenticated:
+            return {}
+        from core.views.common import role_layout_context
+
+        return role_layout_context(self.user)
+
+    @cached_property
+    def mentee(self):
+        if not self.is_authenticated:
+            return None
+        return self.user.mentee_profile_safe
+
+    @cached_property
+    def reporting_assignment(self):
+        from core.views.common import volunteer_reporting_assignment_for
+
+        return volunteer_reporting_assignment_for(self.user)
+
+    @cached_property
+    def accessible_mentee_ids(self):
+        """Mentees the user mentors through an active assignment (admins may open any mentee)."""
+        if not self.is_authenticated:
+            return frozenset()
+        return accessible_mentee_ids(self.user)
+
+    def can_access_mentee(self, mentee):
+        return self.is_admin or mentee.id in self.accessible_mentee_ids
+
+
+def request_identity(request):
+    """``request.identity``, built on the spot when IdentityMiddleware did not run."""
+    identity = getattr(request, "identity", None)
+    if identity is None:
+        identity = request.identity = RequestIdentity(request.user)
+    return identity
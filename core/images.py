@@ -0,0 +1,139 @@
+"""
+Resized WebP/JPEG derivatives of uploaded photos.
+
+Profile pictures, activity photos and reflective report photos are stored at
+upload resolution.  Pages that only need a thumbnail ask for a derivative by
+preset name instead (see core/templatetags/images.py).  Derivatives are
+stored next to the uploads as ``derivatives/<hash[:2]>/<hash>-<w>x<h>.<ext>``,
+keyed by the SHA-256 of the original and the preset size, so identical
+uploads share files and a replaced photo never serves a stale thumbnail.
+
+The presets in UPLOAD_PRESETS are built when a photo is saved, and the
+original's hash is then stored on the row (``<field>_sha256``).  Rendering a
+URL only formats a name from that hash: no cache lookup, storage check or
+resize happens while a page renders.  Until a row has a hash (the file is not
+an image, or it was uploaded before hashes were stored; run
+``build_image_derivatives`` for those) pages link the original.
+"""
+
+import hashlib
+import logging
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+from core.models import Activity, CustomUser, ReflectiveReport
+
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_DIR = "derivatives"
+QUALITY = 82
+
+# name: (width, height, crop to fill)
+PRESETS = {
+    "avatar": (96, 96, True),
+    "profile": (320, 320, True),
+    "thumb": (160, 160, True),
+}
+FORMATS = {
+    "webp": ("WEBP", "webp"),
+    "jpeg": ("JPEG", "jpg"),
+}
+BUILT_FORMATS = tuple(fmt for fmt in FORMATS if fmt != "webp" or features.check("webp"))
+UPLOAD_PRESETS = {
+    CustomUser: {"profile_pic": ("avatar", "profile")},
+    Activity: {"photo": ("thumb",)},
+    ReflectiveReport: {"photo": ("thumb",)},
+}
+
+
+def digest_field(field_name):
+    """Name of the column holding the hash of the image in ``field_name``."""
+    return f"{field_name}_sha256"
+
+
+def file_digest(field_file):
+    """SHA-256 of the stored original."""
+    sha = hashlib.sha256()
+    with field_file.storage.open(field_file.name, "rb") as handle:
+        for chunk in iter(lambda: handle.read(64 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def derivative_name(digest, preset, fmt):
+    width, height, crop = PRESETS[preset]
+    return f"{DERIVATIVE_DIR}/{digest[:2]}/{digest}-{width}x{height}{'c' if crop else ''}.{FORMATS[fmt][1]}"
+
+
+def render_derivative(source, preset, fmt):
+    """Bytes of ``source`` (a file object) resized to ``preset`` and encoded as ``fmt``."""
+    width, height, crop = PRESETS[preset]
+    with Image.open(source) as original:
+        # Phone photos are often stored sideways with an EXIF rotation flag.
+        image = ImageOps.exif_transpose(original)
+        if crop:
+            image = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+        else:
+            image.thumbnail((width, height), Image.Resampling.LANCZOS)
+
+        if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, "white")
+            image.paste(rgba, mask=rgba.getchannel("A"))
+        elif fmt == "webp" and image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+
+        output = BytesIO()
+        image.save(output, FORMATS[fmt][0], quality=QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def build_derivatives(field_file, presets):
+    """Render ``presets`` of ``field_file`` in every format that is missing; return the original's hash."""
+    storage = field_file.storage
+    digest = file_digest(field_file)
+    for preset in presets:
+        for fmt in BUILT_FORMATS:
+            name = derivative_name(digest, preset, fmt)
+            if not storage.exists(name):
+                with storage.open(field_file.name, "rb") as source:
+                    data = render_derivative(source, preset, fmt)
+                storage.save(name, ContentFile(data))
+    return digest
+
+
+def derivative_url(field_file, preset, fmt="jpeg"):
+    """URL of ``field_file`` resized to ``preset``, or of the original until its derivatives are built."""
+    if not field_file:
+        return ""
+    digest = getattr(field_file.instance, digest_field(field_file.field.name), "")
+    presets = UPLOAD_PRESETS.get(type(field_file.instance), {}).get(field_file.field.name, ())
+    if not digest or preset not in presets:
+        return field_file.url
+    if fmt not in BUILT_FORMATS:
+        fmt = "jpeg"
+    return field_file.storage.url(derivative_name(digest, preset, fmt))
+
+
+def build_upload_derivatives(instance, field_names):
+    """Render the UPLOAD_PRESETS of ``field_names`` on ``instance`` and store each original's hash on its row.
+
+    A file that cannot be read as an image is logged and gets an empty hash,
+    so pages keep linking the original.
+    """
+    presets = UPLOAD_PRESETS[type(instance)]
+    digests = {}
+    for field_name in field_names:
+        field_file = getattr(instance, field_name)
+        digest = ""
+        if field_file:
+            try:
+                digest = build_derivatives(field_file, presets[field_name])
+            except (OSError, ValueError, Image.DecompressionBombError) as exc:
+                logger.warning("No derivatives for %s: %s", field_file.name, exc)
+        digests[digest_field(field_name)] = digest
+        setattr(instance, digest_field(field_name), digest)
+    type(instance)._default_manager.filter(pk=instance.pk).update(**digests)
@@ -0,0 +1,370 @@
+"""
+Replay scripted role journeys and report per-step latency.
+
+Usage:
+    python manage.py generate_load_data --scale 10
+    python manage.py benchmark --iterations 50 --concurrency 4 --output before.json
+
+Each journey logs in as a generated user and drives real views through the
+Django test client:
+
+    volunteer  submit a work diary, then open the volunteer dashboard
+    reviewer   open the approval queue, then approve a submitted diary
+    admin      open the admin dashboard, then export work diaries
+    mentor     open the assessment form, then create an assessment
+
+Every step declares the response it expects: a status code, or the URL a
+successful POST redirects to.  Anything else (a permission redirect to the
+role's home, a form re-rendered with errors) counts as an error.  Each
+reviewer approves diaries from its own queue, each at most once; a reviewer
+whose queue runs dry records an error instead of a request.
+
+For every step the command reports p50/p95/p99 latency, queries per request
+and error count, and writes them as JSON so runs can be compared before and
+after a change.  With --trace-memory it also records each step's peak Python
+allocation above what was live when the step started (tracemalloc, reset per
+step); tracing slows every step and is process-wide, so it needs
+--concurrency 1 and its latencies are not comparable with untraced runs.  Journeys write to the database (diaries,
+approvals, assessments); regenerate load data with --flush for like-for-like
+comparisons.  SQLite serialises writers, so concurrent write steps may
+report "database is locked" errors there; those are counted, not fatal.
+"""
+
+import json
+import math
+import platform
+import queue
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import CustomUser, MentorMenteeAssignment, MoodCategory, SessionType
+from core.perf import QueryRecorder, percentile
+from core.review_queues import diary_queue_queryset
+from core.views.common import domains_for_year
+
+
+JOURNEYS = ("volunteer", "reviewer", "admin", "mentor")
+PERCENTILES = (50, 95, 99)
+ACTORS_PER_JOURNEY = 50
+LOAD_USERNAME_SUFFIX = "@load.example.com"
+
+
+def _client_host():
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*":
+            return host.lstrip(".")
+    return "localhost"
+
+
+def _succeeded(response, expected):
+    if isinstance(expected, int):
+        return response.status_code == expected
+    return response.status_code == 302 and response.url == expected
+
+
+class Command(BaseCommand):
+    help = "Benchmark role journeys against generated load data and write results as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20, help="Runs of each journey (default 20).")
+        parser.add_argument("--concurrency", type=int, default=1, help="Concurrent client threads (default 1).")
+        parser.add_argument("--warmup", type=int, default=1, help="Unrecorded runs of each journey first (default 1).")
+        parser.add_argument(
+            "--journeys",
+            default=",".join(JOURNEYS),
+            help=f"Comma-separated journeys to run (default {','.join(JOURNEYS)}).",
+        )
+        parser.add_argument("--output", default="benchmark-results.json", help="Path of the JSON report.")
+        parser.add_argument(
+            "--trace-memory",
+            action="store_true",
+            help="Record each step's peak allocation with tracemalloc (slower; needs --concurrency 1).",
+        )
+
+    def handle(self, *args, **options):
+        journeys = [name.strip() for name in options["journeys"].split(",") if name.strip()]
+        unknown = sorted(set(journeys) - set(JOURNEYS))
+        if unknown:
+            raise CommandError(f"Unknown journeys: {', '.join(unknown)}.")
+        if options["iterations"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--iterations and --concurrency must be at least 1.")
+        if options["trace_memory"] and options["concurrency"] > 1:
+            raise CommandError("--trace-memory measures one step at a time; use --concurrency 1.")
+
+        self._prepare(journeys, options["warmup"] + options["iterations"])
+        self.host = _client_host()
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.trace_memory = False
+
+        for journey in journeys:
+            for iteration in range(options["warmup"]):
+                self._run_journey(journey, iteration, record=False)
+
+        started_tracing = options["trace_memory"] and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        self.trace_memory = options["trace_memory"]
+        started_at = datetime.now(dt_timezone.utc)
+        started = time.perf_counter()
+        try:
+            self._run_concurrently(journeys, options["iterations"], options["concurrency"])
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+        elapsed = time.perf_counter() - started
+
+        report = {
+            "started_at": started_at.isoformat(),
+            "duration_s": round(elapsed, 3),
+            "iterations": options["iterations"],
+            "concurrency": options["concurrency"],
+            "trace_memory": options["trace_memory"],
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "users": CustomUser.objects.count(),
+            "steps": [
+                self._summarize(key, samples)
+                for key, samples in sorted(self._stats.items(), key=lambda item: JOURNEYS.index(item[0][0]))
+            ],
+        }
+        with open(options["output"], "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+        self._print_report(report)
+        self.stdout.write(self.style.SUCCESS(f"Benchmark results written to {options['output']}."))
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+    def _prepare(self, journeys, runs):
+        generated = CustomUser.objects.filter(username__endswith=LOAD_USERNAME_SUFFIX).order_by("id")
+        self.actors = {
+            "volunteer": list(generated.filter(role="volunteer", reporting_assignment__isnull=False)[:ACTORS_PER_JOURNEY]),
+            "reviewer": list(generated.filter(role="endorser")[:ACTORS_PER_JOURNEY]),
+            "admin": list(generated.filter(role="admin")[:ACTORS_PER_JOURNEY]),
+            "mentor": [],
+        }
+        assignments = (
+            MentorMenteeAssignment.objects.filter(is_active=True, mentor__in=generated)
+            .select_related("mentor", "mentee")
+            .order_by("mentor_id", "id")
+        )
+        seen_mentors = set()
+        for assignment in assignments:
+            if assignment.mentor_id in seen_mentors:
+                continue
+            seen_mentors.add(assignment.mentor_id)
+            self.actors["mentor"].append((assignment.mentor, assignment.mentee))
+            if len(seen_mentors) >= ACTORS_PER_JOURNEY:
+                break
+
+        missing = [journey for journey in journeys if not self.actors[journey]]
+        if missing:
+            raise CommandError(
+                f"No generated users for: {', '.join(missing)}. Run `python manage.py generate_load_data` first."
+            )
+
+        # Approving a diary twice only re-saves it, so every run gets a diary of its own.
+        self.diary_queues = {}
+        if "reviewer" in journeys:
+            runs_per_reviewer = math.ceil(runs / len(self.actors["reviewer"]))
+            taken = set()
+            for reviewer in self.actors["reviewer"]:
+                diary_ids = list(
+                    diary_queue_queryset(reviewer)
+                    .exclude(id__in=taken)
+                    .order_by("id")
+                    .values_list("id", flat=True)[:runs_per_reviewer]
+                )
+                taken.update(diary_ids)
+                self.diary_queues[reviewer.id] = deque(diary_ids)
+        self.session_type = SessionType.objects.filter(is_active=True).first()
+        self.mood = MoodCategory.objects.order_by("sort_order", "name").values_list("name", flat=True).first() or ""
+        self.domain_ids = {
+            year: [domain.id for domain in domains_for_year(year)] for year in (1, 2, 3)
+        }
+        if "reviewer" in journeys and not any(self.diary_queues.values()):
+            raise CommandError("No submitted work diaries to approve.")
+        if "mentor" in journeys and self.session_type is None:
+            raise CommandError("No active session types. Run `python manage.py seed_config_data` first.")
+
+    def _approve_next_diary(self, client, reviewer):
+        with self._lock:
+            diaries = self.diary_queues[reviewer.id]
+            diary_id = diaries.popleft() if diaries else None
+        if diary_id is None:
+            return None
+        return client.post(
+            reverse("review_work_diary", args=[diary_id]),
+            {"action": "approve", "comments": "Benchmark approval."},
+        )
+
+    # ------------------------------------------------------------------
+    # Journeys
+    # ------------------------------------------------------------------
+    def _steps(self, journey, actor):
+        """(name, request, expected) per step; expected is a status code or a redirect URL."""
+        today = timezone.localdate().isoformat()
+        if journey == "volunteer":
+            return [
+                ("submit_diary", lambda client: client.post(
+                    reverse("work_diary"),
+                    {
+                        "date": today,
+                        "duration": "1.50",
+                        "linked_activity": "Benchmark visit",
+                        "narrative_entry": "Benchmark diary entry.",
+                        "submit_action": "submit",
+                    },
+                ), reverse("work_diary")),
+                ("dashboard", lambda client: client.get(reverse("volunteer_dashboard")), 200),
+            ]
+        if journey == "reviewer":
+            return [
+                ("approval_queue", lambda client: client.get(reverse("approval_queue")), 200),
+                ("approve_diary", lambda client: self._approve_next_diary(client, actor), reverse("approval_queue")),
+            ]
+        if journey == "admin":
+            return [
+                ("dashboard", lambda client: client.get(reverse("admin_dashboard")), 200),
+                ("export_work_diaries", lambda client: client.get(reverse("export_work_diaries")), 200),
+            ]
+        mentor, mentee = actor
+        payload = {
+            "year": mentee.current_year,
+            "session_type": self.session_type.id,
+            "date": today,
+            "theme_topic": "Benchmark session",
+            "beginning_mood": self.mood,
+            "end_mood": self.mood,
+        }
+        payload.update({f"rating_{domain_id}": "4" for domain_id in self.domain_ids.get(mentee.current_year, [])})
+        return [
+            ("assessment_form", lambda client: client.get(reverse("mentor_assessment_create", args=[mentee.id])), 200),
+            ("create_assessment", lambda client: client.post(
+                reverse("mentor_assessment_create", args=[mentee.id]), payload
+            ), reverse("mentor_assessment_list", args=[mentee.id])),
+        ]
+
+    def _run_journey(self, journey, iteration, record=True):
+        actors = self.actors[journey]
+        actor = actors[iteration % len(actors)]
+        user = actor[0] if journey == "mentor" else actor
+
+        client = Client(HTTP_HOST=self.host, raise_request_exception=False)
+        client.force_login(user)
+        for step, request, expected in self._steps(journey, actor):
+            recorder = QueryRecorder()
+            if self.trace_memory:
+                live_before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            started = time.perf_counter()
+            with connection.execute_wrapper(recorder):
+                response = request(client)
+                if response is not None and response.streaming:
+                    b"".join(response.streaming_content)
+            if response is None:
+                if record:
+                    self._record_missing(journey, step)
+                continue
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            peak_kb = None
+            if self.trace_memory:
+                peak_kb = (tracemalloc.get_traced_memory()[1] - live_before) // 1024
+            if record:
+                self._record(journey, step, elapsed_ms, recorder.count, not _succeeded(response, expected), peak_kb)
+
+    def _run_concurrently(self, journeys, iterations, concurrency):
+        jobs = queue.Queue()
+        for iteration in range(iterations):
+            for journey in journeys:
+                jobs.put((journey, iteration))
+
+        if concurrency == 1:
+            while not jobs.empty():
+                self._run_journey(*jobs.get_nowait())
+            return
+
+        def worker():
+            try:
+                while True:
+                    try:
+                        journey, iteration = jobs.get_nowait()
+                    except queue.Empty:
+                        return
+                    self._run_journey(journey, iteration)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def _samples(self, journey, step):
+        return self._stats.setdefault(
+            (journey, step), {"latencies": [], "queries": [], "errors": 0, "peak_alloc_kb": None}
+        )
+
+    def _record_missing(self, journey, step):
+        with self._lock:
+            self._samples(journey, step)["errors"] += 1
+
+    def _record(self, journey, step, elapsed_ms, query_count, failed, peak_kb=None):
+        with self._lock:
+            samples = self._samples(journey, step)
+            samples["latencies"].append(elapsed_ms)
+            samples["queries"].append(query_count)
+            samples["errors"] += int(failed)
+            if peak_kb is not None:
+                samples["peak_alloc_kb"] = max(samples["peak_alloc_kb"] or 0, peak_kb)
+
+    def _summarize(self, key, samples):
+        journey, step = key
+        latencies = samples["latencies"]
+        queries = samples["queries"]
+        summary = {
+            "journey": journey,
+            "step": step,
+            "requests": len(latencies),
+            "errors": samples["errors"],
+            "latency_ms": {f"p{pct}": None for pct in PERCENTILES},
+            "queries": {"mean": None, "max": None},
+            "peak_alloc_kb": samples["peak_alloc_kb"],
+        }
+        if latencies:
+            summary["latency_ms"] = {f"p{pct}": round(percentile(latencies, pct), 2) for pct in PERCENTILES}
+            summary["latency_ms"]["mean"] = round(sum(latencies) / len(latencies), 2)
+            summary["latency_ms"]["max"] = round(max(latencies), 2)
+            summary["queries"] = {"mean": round(sum(queries) / len(queries), 1), "max": max(queries)}
+        return summary
+
+    def _print_report(self, report):
+        header = f"  {'journey / step':<34}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'errors':>8}{'alloc MB':>10}"
+        self.stdout.write(header)
+        for row in report["steps"]:
+            if not row["requests"]:
+                self.stdout.write(f"  {row['journey'] + ' / ' + row['step']:<34}{'-':>9}{'-':>9}{'-':>9}{'-':>9}{row['errors']:>8}")
+                continue
+            latency = row["latency_ms"]
+            alloc = "-" if row["peak_alloc_kb"] is None else f"{row['peak_alloc_kb'] / 1024:.1f}"
+            self.stdout.write(
+                f"  {row['journey'] + ' / ' + row['step']:<34}"
+                f"{latency['p50']:>9.1f}{latency['p95']:>9.1f}{latency['p99']:>9.1f}"
+                f"{row['queries']['mean']:>9.1f}{row['errors']:>8}{alloc:>10}"
+            )
@@ -0,0 +1,42 @@
+"""
+Build thumbnails for photos that have no stored image hash yet.
+
+Usage:
+    python manage.py build_image_derivatives
+    python manage.py build_image_derivatives --batch-size 200
+
+Photos get their derivatives and hash when they are uploaded; rows saved
+before hashes were stored keep linking the full-size original until this
+command has run once.  Files that cannot be read as images are reported and
+left without a hash, so rerunning it only retries those.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.images import UPLOAD_PRESETS, build_upload_derivatives, digest_field
+
+
+class Command(BaseCommand):
+    help = "Build missing photo derivatives and store each original's hash."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows read per query.")
+
+    def handle(self, *args, **options):
+        built = failed = 0
+        for model, field_names in UPLOAD_PRESETS.items():
+            for field_name in field_names:
+                rows = (
+                    model._default_manager.filter(**{digest_field(field_name): ""})
+                    .exclude(**{field_name: ""})
+                    .exclude(**{f"{field_name}__isnull": True})
+                    .only("pk", field_name)
+                    .order_by("pk")
+                )
+                for instance in rows.iterator(chunk_size=options["batch_size"]):
+                    build_upload_derivatives(instance, [field_name])
+                    if getattr(instance, digest_field(field_name)):
+                        built += 1
+                    else:
+                        failed += 1
+        self.stdout.write(self.style.SUCCESS(f"Built derivatives for {built} photos; {failed} could not be read."))
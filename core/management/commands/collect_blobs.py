@@ -0,0 +1,42 @@
+"""
+Garbage-collect the deduplicating evidence storage.
+
+Usage:
+    python manage.py collect_blobs
+    python manage.py collect_blobs --dry-run --min-age-hours 0
+
+Recounts how many repository assets, profile artifacts, diary entries and
+objectives point at each stored blob, then deletes the blobs nothing points
+at any more.  Blobs written within the last ``--min-age-hours`` are kept so
+uploads whose row is still being saved are never collected.  Safe to run
+any number of times, e.g. nightly from cron:
+
+    30 0 * * * cd /srv/lud-suite && venv/bin/python manage.py collect_blobs
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from core.storage import DEFAULT_MIN_AGE, collect_garbage
+
+
+class Command(BaseCommand):
+    help = "Recount evidence blob references and delete unreferenced blobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age-hours",
+            type=float,
+            default=DEFAULT_MIN_AGE.total_seconds() / 3600,
+            help="Keep unreferenced blobs younger than this (default: 24).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted without deleting.")
+
+    def handle(self, *args, **options):
+        blobs, size = collect_garbage(
+            min_age=timedelta(hours=options["min_age_hours"]),
+            dry_run=options["dry_run"],
+        )
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {blobs} unreferenced blobs ({size} bytes)."))
@@ -0,0 +1,34 @@
+"""
+Export the admin-editable configuration as a JSON Lines snapshot.
+
+Usage:
+    python manage.py export_config > config.jsonl
+    python manage.py export_config --output config.jsonl
+
+Covers every model on the admin Configuration page.  Apply the file to
+another environment with ``import_config``.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.config_data import iter_snapshot
+
+
+class Command(BaseCommand):
+    help = "Write a versioned JSON Lines snapshot of the configuration tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", help="File to write (default: stdout).")
+
+    def handle(self, *args, **options):
+        if not options["output"]:
+            for line in iter_snapshot():
+                self.stdout.write(line, ending="")
+            return
+
+        rows = -1  # the header line
+        with open(options["output"], "w", encoding="utf-8") as handle:
+            for line in iter_snapshot():
+                handle.write(line)
+                rows += 1
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} configuration rows to {options['output']}."))
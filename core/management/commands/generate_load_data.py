@@ -0,0 +1,439 @@
+"""
+Generate synthetic load-test data for the LUD Suite.
+
+Usage:
+    python manage.py seed_config_data
+    python manage.py generate_load_data --scale 10
+
+Every scale unit adds a fixed slice of users (all roles), mentees with
+mentor assignments, objectives, year plans, assessments with ratings,
+volunteer activities, reflective reports, diaries, transcripts,
+notifications and repository assets.  Rows are written with bulk_create,
+passwords are hashed once, and all random choices come from a seeded RNG so
+the same --scale/--seed always produces the same dataset.  Roughly 2,600
+rows are created per scale unit (--scale 400 is about a million rows).
+"""
+
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core.assignments import rebuild_current_assignments
+from core.models import (
+    Activity,
+    AssessmentRating,
+    CustomUser,
+    DiaryEntry,
+    EvidenceAttachment,
+    Location,
+    Mentee,
+    MenteeAssessment,
+    MentorMenteeAssignment,
+    Notification,
+    ObjectiveItem,
+    Programme,
+    RatingDomain,
+    ReflectiveReport,
+    RepositoryAsset,
+    School,
+    SessionType,
+    StatusConfig,
+    UserRole,
+    VolunteerReportingAssignment,
+    VolunteerTranscript,
+    YearPlanItem,
+)
+
+
+# Rows created per scale unit.
+USERS_PER_UNIT = {"admin": 1, "endorser": 2, "mentor": 10, "volunteer": 10, "mentee": 50}
+OBJECTIVES_PER_MENTEE = 4
+YEAR_PLAN_ITEMS_PER_MENTEE = 3
+ASSESSMENTS_PER_MENTEE = 6
+ACTIVITIES_PER_VOLUNTEER = 8
+REPORTS_PER_VOLUNTEER = 4
+DIARIES_PER_VOLUNTEER = 10
+NOTIFICATIONS_PER_UNIT = 5
+ASSETS_PER_UNIT = 5
+
+# Weighted distributions so dashboards and queues look like production.
+RATING_WEIGHTS = (5, 15, 35, 30, 15)
+REPORT_STATUS_WEIGHTS = {"Draft": 10, "Submitted": 30, "Reviewed": 15, "Approved": 40, "Returned": 5}
+DIARY_STATUS_WEIGHTS = REPORT_STATUS_WEIGHTS
+TRANSCRIPT_STATUS_WEIGHTS = {"Draft": 30, "Pending Review": 30, "Approved": 40}
+YEAR_WEIGHTS = (50, 30, 20)
+HISTORY_DAYS = 365
+
+USERNAME_DOMAIN = "load.example.com"
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Command(BaseCommand):
+    help = "Generate deterministic synthetic data for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=int, default=1, help="Number of scale units to generate (default 1).")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed (default 42).")
+        parser.add_argument("--password", default="loadtest", help="Password for every generated user.")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows per bulk_create batch.")
+        parser.add_argument("--flush", action="store_true", help="Delete previously generated load data first.")
+
+    def handle(self, *args, **options):
+        scale = options["scale"]
+        if scale < 1:
+            raise CommandError("--scale must be at least 1.")
+        self.batch_size = options["batch_size"]
+        self.rng = random.Random(options["seed"])
+        self.today = timezone.localdate()
+        self.counts = {}
+
+        if options["flush"]:
+            self._flush()
+        elif CustomUser.objects.filter(username__endswith=f"@{USERNAME_DOMAIN}").exists():
+            raise CommandError("Load data already exists. Re-run with --flush to replace it.")
+
+        self._load_config()
+        started = time.perf_counter()
+        with transaction.atomic():
+            users = self._create_users(scale, make_password(options["password"]))
+            mentees = self._create_mentees(users["mentee"], users["mentor"])
+            self._create_endorser_links(users["endorser"], users["mentor"])
+            self._create_mentee_records(mentees)
+            self._create_volunteer_records(users["volunteer"], users["endorser"], users["admin"][0])
+            self._create_shared_records(scale, users)
+            rebuild_current_assignments(batch_size=self.batch_size)
+        elapsed = time.perf_counter() - started
+
+        for label, count in self.counts.items():
+            self.stdout.write(f"  {label}: {count}")
+        total = sum(self.counts.values())
+        self.stdout.write(self.style.SUCCESS(f"Generated {total} rows in {elapsed:.1f}s."))
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _bulk(self, model, objects, keep=True):
+        created = []
+        count = 0
+        for batch in _chunks(objects, self.batch_size):
+            rows = model.objects.bulk_create(batch)
+            count += len(rows)
+            if keep:
+                created.extend(rows)
+        label = model._meta.object_name
+        self.counts[label] = self.counts.get(label, 0) + count
+        return created
+
+    def _past_date(self, days=HISTORY_DAYS):
+        return self.today - timedelta(days=self.rng.randrange(days))
+
+    def _weighted(self, weights):
+        return self.rng.choices(list(weights), weights=list(weights.values()))[0]
+
+    def _flush(self):
+        generated = CustomUser.objects.filter(username__endswith=f"@{USERNAME_DOMAIN}")
+        VolunteerReportingAssignment.objects.filter(volunteer__in=generated).delete()
+        Mentee.objects.filter(user__in=generated).delete()
+        RepositoryAsset.objects.filter(uploaded_by__in=generated).delete()
+        deleted, _ = generated.delete()
+        self.stdout.write(f"  Flushed {deleted} rows of previous load data.")
+
+    def _load_config(self):
+        self.schools = list(School.objects.all())
+        self.locations = list(Location.objects.filter(is_active=True))
+        self.programmes = list(Programme.objects.filter(is_active=True))
+        self.statuses = list(StatusConfig.objects.filter(is_active=True))
+        self.session_types = list(SessionType.objects.filter(is_active=True))
+        self.domains_by_year = {}
+        for domain in RatingDomain.objects.filter(is_active=True, source=RatingDomain.Source.TRACKER):
+            self.domains_by_year.setdefault(domain.year, []).append(domain)
+        if not all([self.schools, self.locations, self.programmes, self.statuses, self.session_types, self.domains_by_year]):
+            raise CommandError("Configuration data is missing. Run `python manage.py seed_config_data` first.")
+        self.chapters_by_school = {school.id: list(school.chapters.all()) for school in self.schools}
+
+    # ------------------------------------------------------------------
+    # Users
+    # ------------------------------------------------------------------
+    def _create_users(self, scale, password_hash):
+        users = {}
+        for role, per_unit in USERS_PER_UNIT.items():
+            users[role] = self._bulk(
+                CustomUser,
+                (
+                    CustomUser(
+                        username=f"{role}-{index}@{USERNAME_DOMAIN}",
+                        email=f"{role}-{index}@{USERNAME_DOMAIN}",
+                        password=password_hash,
+                        first_name=role.title(),
+                        last_name=str(index),
+                        role=role,
+                        roles=[role],
+                        is_staff=role == "admin",
+                    )
+                    for index in range(scale * per_unit)
+                ),
+            )
+            # bulk_create skips CustomUser.save, so mirror the role memberships here.
+            self._bulk(UserRole, (UserRole(user=user, role=role) for user in users[role]), keep=False)
+        return users
+
+    def _create_mentees(self, mentee_users, mentors):
+        mentees = self._bulk(
+            Mentee,
+            (self._mentee_for(user, index, mentors) for index, user in enumerate(mentee_users)),
+        )
+        self._bulk(
+            MentorMenteeAssignment,
+            (
+                MentorMenteeAssignment(
+                    mentor_id=mentee.assigned_mentor_id,
+                    mentee=mentee,
+                    start_date=mentee.joining_date,
+                )
+                for mentee in mentees
+            ),
+            keep=False,
+        )
+        return mentees
+
+    def _mentee_for(self, user, index, mentors):
+        school = self.rng.choice(self.schools)
+        chapters = self.chapters_by_school.get(school.id) or [None]
+        return Mentee(
+            user=user,
+            full_name=f"Mentee {index}",
+            register_no=f"LD{index:07d}",
+            grade=str(self.rng.randint(6, 12)),
+            school=school,
+            chapter=self.rng.choice(chapters),
+            location=self.rng.choice(self.locations),
+            programme_fk=self.rng.choice(self.programmes),
+            joining_date=self._past_date(),
+            current_year=self.rng.choices((1, 2, 3), weights=YEAR_WEIGHTS)[0],
+            assigned_mentor=mentors[index % len(mentors)],
+        )
+
+    def _create_endorser_links(self, endorsers, mentors):
+        through = CustomUser.mentors.through
+        self._bulk(
+            through,
+            (
+                through(from_customuser_id=endorsers[index % len(endorsers)].id, to_customuser_id=mentor.id)
+                for index, mentor in enumerate(mentors)
+            ),
+            keep=False,
+        )
+
+    # ------------------------------------------------------------------
+    # Mentee records
+    # ------------------------------------------------------------------
+    def _create_mentee_records(self, mentees):
+        rng = self.rng
+        self._bulk(
+            ObjectiveItem,
+            (
+                ObjectiveItem(
+                    mentee=mentee,
+                    objective_title=f"Objective {number}",
+                    objective_text="Generated objective.",
+                    start_date=mentee.joining_date,
+                    end_date=mentee.joining_date + timedelta(days=rng.randint(30, 270)),
+                    status=rng.choice(self.statuses),
+                    progress_percent=rng.randint(0, 100),
+                    mentor_approved=rng.random() < 0.4,
+                )
+                for mentee in mentees
+                for number in range(1, OBJECTIVES_PER_MENTEE + 1)
+            ),
+            keep=False,
+        )
+        self._bulk(
+            YearPlanItem,
+            (
+                YearPlanItem(
+                    mentee=mentee,
+                    year=mentee.current_year,
+                    milestone=f"Milestone {number}",
+                    target_date=self.today + timedelta(days=rng.randint(-90, 180)),
+                    status=rng.choice(self.statuses),
+                )
+                for mentee in mentees
+                for number in range(1, YEAR_PLAN_ITEMS_PER_MENTEE + 1)
+            ),
+            keep=False,
+        )
+        for batch in _chunks(mentees, max(1, self.batch_size // ASSESSMENTS_PER_MENTEE)):
+            assessments = self._bulk(
+                MenteeAssessment,
+                (
+                    MenteeAssessment(
+                        mentee=mentee,
+                        mentor_id=mentee.assigned_mentor_id,
+                        year=mentee.current_year,
+                        session_type=rng.choice(self.session_types),
+                        date=self._past_date(),
+                        theme_topic=f"Session {number}",
+                    )
+                    for mentee in batch
+                    for number in range(1, ASSESSMENTS_PER_MENTEE + 1)
+                ),
+            )
+            self._bulk(
+                AssessmentRating,
+                (
+                    AssessmentRating(
+                        assessment=assessment,
+                        domain=domain,
+                        value=rng.choices((1, 2, 3, 4, 5), weights=RATING_WEIGHTS)[0],
+                    )
+                    for assessment in assessments
+                    for domain in self.domains_by_year.get(assessment.year, ())
+                ),
+                keep=False,
+            )
+
+    # ------------------------------------------------------------------
+    # Volunteer records
+    # ------------------------------------------------------------------
+    def _create_volunteer_records(self, volunteers, endorsers, admin):
+        rng = self.rng
+        self._bulk(
+            VolunteerReportingAssignment,
+            (
+                VolunteerReportingAssignment(
+                    volunteer=volunteer,
+                    programme=rng.choice(self.programmes),
+                    location=rng.choice(self.locations),
+                    endorser=endorsers[index % len(endorsers)],
+                    assigned_by=admin,
+                )
+                for index, volunteer in enumerate(volunteers)
+            ),
+            keep=False,
+        )
+        activity_choices = [key for key, _ in Activity.ACTIVITY_CHOICES]
+        self._bulk(
+            Activity,
+            (
+                Activity(
+                    user=volunteer,
+                    date=self._past_date(),
+                    duration=Decimal(rng.choice(("1.00", "1.50", "2.00", "3.00"))),
+                    activity=rng.choice(activity_choices),
+                    learnings="Generated learnings.",
+                )
+                for volunteer in volunteers
+                for _ in range(ACTIVITIES_PER_VOLUNTEER)
+            ),
+            keep=False,
+        )
+        self.reports = self._bulk(
+            ReflectiveReport,
+            (
+                ReflectiveReport(
+                    user=volunteer,
+                    programme=rng.choice(self.programmes),
+                    location=rng.choice(self.locations),
+                    activity_name=f"Activity {number}",
+                    duration=Decimal(rng.choice(("1.00", "2.00", "4.00"))),
+                    endorser=endorsers[index % len(endorsers)],
+                    date=self._past_date(),
+                    learnings="Generated reflection.",
+                    status=self._weighted(REPORT_STATUS_WEIGHTS),
+                )
+                for index, volunteer in enumerate(volunteers)
+                for number in range(1, REPORTS_PER_VOLUNTEER + 1)
+            ),
+        )
+        self._bulk(
+            DiaryEntry,
+            (
+                DiaryEntry(
+                    volunteer=volunteer,
+                    date=self._past_date(),
+                    duration=Decimal(rng.choice(("0.50", "1.00", "2.00"))),
+                    location=rng.choice(self.locations),
+                    narrative_entry="Generated diary entry.",
+                    review_status=self._weighted(DIARY_STATUS_WEIGHTS),
+                )
+                for volunteer in volunteers
+                for _ in range(DIARIES_PER_VOLUNTEER)
+            ),
+            keep=False,
+        )
+        self._bulk(
+            VolunteerTranscript,
+            (
+                VolunteerTranscript(
+                    volunteer=volunteer,
+                    template_choice="Volunteer Service Summary",
+                    generated_summary="Generated summary.",
+                    approval_status=self._weighted(TRANSCRIPT_STATUS_WEIGHTS),
+                )
+                for volunteer in volunteers
+            ),
+            keep=False,
+        )
+
+    # ------------------------------------------------------------------
+    # Notifications and repository
+    # ------------------------------------------------------------------
+    def _create_shared_records(self, scale, users):
+        rng = self.rng
+        admins = users["admin"]
+        targets = [key for key, _ in Notification.ROLE_CHOICES]
+        self._bulk(
+            Notification,
+            (
+                Notification(
+                    subject=f"Notice {index}",
+                    message="Generated notification.",
+                    target_group=rng.choice(targets),
+                    created_by=rng.choice(admins),
+                )
+                for index in range(scale * NOTIFICATIONS_PER_UNIT)
+            ),
+            keep=False,
+        )
+        visibility = [key for key, _ in RepositoryAsset.ROLE_VISIBILITY_CHOICES]
+        assets = self._bulk(
+            RepositoryAsset,
+            (
+                RepositoryAsset(
+                    title=f"Asset {index}",
+                    category=rng.choice(("Guides", "Templates", "Reports")),
+                    file_upload=f"repository/load-{index}.pdf",
+                    uploaded_by=rng.choice(admins),
+                    role_visibility=rng.choice(visibility),
+                )
+                for index in range(scale * ASSETS_PER_UNIT)
+            ),
+        )
+        self._bulk(
+            EvidenceAttachment,
+            (
+                EvidenceAttachment(
+                    asset=asset,
+                    linked_model="ReflectiveReport",
+                    linked_id=report.id,
+                    uploaded_by_id=report.user_id,
+                )
+                for asset, report in zip(assets, rng.sample(self.reports, min(len(assets), len(self.reports))))
+            ),
+            keep=False,
+        )
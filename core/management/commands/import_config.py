@@ -0,0 +1,40 @@
+"""
+Apply a configuration snapshot written by ``export_config``.
+
+Usage:
+    python manage.py import_config config.jsonl
+    python manage.py import_config - < config.jsonl
+
+Rows are matched on natural keys (school name, location code, domain year
+and name, ...), so existing rows are updated in place and missing ones are
+created; nothing is deleted.  The whole snapshot is applied in one
+transaction, model by model in dependency order.
+"""
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.config_data import SnapshotError, apply_snapshot
+
+
+class Command(BaseCommand):
+    help = "Upsert configuration rows from a JSON Lines snapshot."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Snapshot file, or - to read standard input.")
+
+    def handle(self, *args, **options):
+        try:
+            if options["path"] == "-":
+                counts = apply_snapshot(sys.stdin.buffer)
+            else:
+                # Binary, so read_snapshot can name the line of any bytes that are not UTF-8.
+                with open(options["path"], "rb") as handle:
+                    counts = apply_snapshot(handle)
+        except (OSError, SnapshotError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        for key, count in counts.items():
+            self.stdout.write(f"  {key}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"Imported {sum(counts.values())} configuration rows."))
@@ -0,0 +1,55 @@
+"""
+Nightly maintenance of mentor -> mentee assignments.
+
+Usage:
+    python manage.py maintain_assignments
+    python manage.py maintain_assignments --dry-run
+
+Sets is_active=False on assignments whose end_date has passed, then brings
+the CurrentMentorAssignment table in line with the remaining active rows
+(adding rows written by bulk operations, dropping expired ones) and resets
+the cached mentee access sets when anything changed.  Safe to run any number
+of times; schedule it shortly after midnight, e.g. from cron:
+
+    5 0 * * * cd /srv/lud-suite && venv/bin/python manage.py maintain_assignments
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core.assignments import expire_assignments, rebuild_current_assignments
+from core.mentee_access import invalidate_mentee_access
+
+
+class Command(BaseCommand):
+    help = "Expire ended mentor-mentee assignments and rebuild the current assignment table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Treat this ISO date as today (default: today).")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per delete/insert batch.")
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        if options["date"]:
+            try:
+                today = date.fromisoformat(options["date"])
+            except ValueError:
+                raise CommandError("--date must be an ISO date (YYYY-MM-DD).")
+        dry_run = options["dry_run"]
+
+        with transaction.atomic():
+            expired = expire_assignments(today, dry_run=dry_run)
+            added, updated, removed = rebuild_current_assignments(
+                today, dry_run=dry_run, batch_size=options["batch_size"]
+            )
+        if expired and not dry_run:
+            invalidate_mentee_access()
+
+        prefix = "Would expire" if dry_run else "Expired"
+        self.stdout.write(f"  {prefix} {expired} assignment(s) ending before {today.isoformat()}.")
+        self.stdout.write(f"  Current assignments: {added} added, {updated} updated, {removed} removed.")
+        self.stdout.write(self.style.SUCCESS("Assignment maintenance complete."))
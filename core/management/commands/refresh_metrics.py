@@ -0,0 +1,25 @@
+"""
+Recompute the queue-depth snapshot served at /metrics.
+
+Usage:
+    python manage.py refresh_metrics
+
+Counts the review queues and mentee import totals and stores them in the
+shared cache, where every worker's /metrics endpoint reads them.  Scrapes
+never run these counts themselves, so schedule the command at the scrape
+interval, e.g. every minute from cron:
+
+    * * * * * cd /srv/lud-suite && venv/bin/python manage.py refresh_metrics
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.metrics import queue_snapshot
+
+
+class Command(BaseCommand):
+    help = "Recompute the review queue and import snapshot served at /metrics."
+
+    def handle(self, *args, **options):
+        queue_snapshot.refresh()
+        self.stdout.write(self.style.SUCCESS("Queue snapshot refreshed."))
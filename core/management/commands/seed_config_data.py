@@ -2,10 +2,13 @@
 Seed configuration data for the LUD Suite.
 
 Usage:
-    python manage.py seed_config_data
+    python manage.py seed_config_data [--timing]
 
-All records use get_or_create / update_or_create so the command is
-idempotent – running it multiple times will never create duplicates.
+Each section preloads the natural keys already in its table with one
+query and writes every row with a single bulk upsert in its own
+transaction, so the command is idempotent – running it multiple times
+will never create duplicates.  Sections that used to be get_or_create
+only insert missing rows; the others also refresh the seeded fields.
 """
 
 from datetime import date
@@ -28,26 +31,46 @@ from core.models import (
     StatusConfig,
     TemplateConfig,
 )
+from core.config_data import upsert
+from core.perf import RequestTimer
+from core.portfolio import invalidate_mentor_portfolios
 
 
 class Command(BaseCommand):
     help = "Populate configuration seed data (idempotent)."
 
-    @transaction.atomic
+    sections = [
+        ("Schools", "_seed_schools"),
+        ("Locations", "_seed_locations"),
+        ("Chapters", "_seed_chapters"),
+        ("Academic Cycles", "_seed_academic_cycles"),
+        ("Programmes", "_seed_programmes"),
+        ("Statuses", "_seed_statuses"),
+        ("Session Types", "_seed_session_types"),
+        ("Rating Domains", "_seed_rating_domains"),
+        ("Domain Indicators", "_seed_domain_indicators"),
+        ("Rating Scale Definitions", "_seed_rating_scales"),
+        ("Mood Categories", "_seed_mood_categories"),
+        ("Reference Content", "_seed_reference_content"),
+        ("Template Configs", "_seed_template_configs"),
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument("--timing", action="store_true", help="Report how long each section took.")
+
     def handle(self, *args, **options):
-        self._seed_schools()
-        self._seed_locations()
-        self._seed_chapters()
-        self._seed_academic_cycles()
-        self._seed_programmes()
-        self._seed_statuses()
-        self._seed_session_types()
-        self._seed_rating_domains()
-        self._seed_domain_indicators()
-        self._seed_rating_scales()
-        self._seed_mood_categories()
-        self._seed_reference_content()
-        self._seed_template_configs()
+        timer = RequestTimer()
+        for label, method in self.sections:
+            with timer.phase(label), transaction.atomic():
+                count = getattr(self, method)()
+            if options["timing"]:
+                self.stdout.write(f"  {label}: {count} ({timer.phases[label] * 1000:.1f} ms)")
+            else:
+                self.stdout.write(f"  {label}: {count}")
+        # Bulk writes skip the post_save receivers that reset these caches.
+        invalidate_mentor_portfolios()
+        if options["timing"]:
+            self.stdout.write(f"  Total: {timer.elapsed() * 1000:.1f} ms")
         self.stdout.write(self.style.SUCCESS("Seed data populated successfully."))
 
     # ------------------------------------------------------------------
@@ -55,9 +78,8 @@ class Command(BaseCommand):
     # ------------------------------------------------------------------
     def _seed_schools(self):
         names = ["Christ Vidyalaya", "Christ CBSE"]
-        for name in names:
-            School.objects.get_or_create(name=name)
-        self.stdout.write(f"  Schools: {len(names)}")
+        upsert(School, ["name"], [{"name": name} for name in names])
+        return len(names)
 
     # ------------------------------------------------------------------
     # 2) Locations
@@ -72,12 +94,13 @@ class Command(BaseCommand):
             ("Hyderabad", "LUD-HYD"),
             ("Chennai", "LUD-CHE"),
         ]
-        for name, code in items:
-            Location.objects.update_or_create(
-                code=code,
-                defaults={"name": name, "is_active": True},
-            )
-        self.stdout.write(f"  Locations: {len(items)}")
+        upsert(
+            Location,
+            ["code"],
+            [{"code": code, "name": name, "is_active": True} for name, code in items],
+            update_fields=["name", "is_active"],
+        )
+        return len(items)
 
     # ------------------------------------------------------------------
     # 3) Chapters
@@ -95,19 +118,15 @@ class Command(BaseCommand):
                 ("Christ CBSE \u2013 Chapter 3", "CBSE-03"),
             ],
         }
-        count = 0
-        for school_name, chapters in chapter_map.items():
-            school = School.objects.filter(name=school_name).first()
-            if not school:
-                continue
-            for ch_name, ch_code in chapters:
-                Chapter.objects.update_or_create(
-                    school=school,
-                    name=ch_name,
-                    defaults={"code": ch_code, "is_active": True},
-                )
-                count += 1
-        self.stdout.write(f"  Chapters: {count}")
+        schools = dict(School.objects.filter(name__in=chapter_map).values_list("name", "id"))
+        rows = [
+            {"school_id": schools[school_name], "name": ch_name, "code": ch_code, "is_active": True}
+            for school_name, chapters in chapter_map.items()
+            if school_name in schools
+            for ch_name, ch_code in chapters
+        ]
+        upsert(Chapter, ["school_id", "name"], rows, update_fields=["code", "is_active"])
+        return len(rows)
 
     # ------------------------------------------------------------------
     # 4) Academic Cycles
@@ -118,12 +137,16 @@ class Command(BaseCommand):
             ("2026\u20132027", date(2026, 6, 1), date(2027, 5, 31), True),
             ("2027\u20132028", date(2027, 6, 1), date(2028, 5, 31), False),
         ]
-        for label, start, end, active in cycles:
-            AcademicCycle.objects.update_or_create(
-                year_label=label,
-                defaults={"start_date": start, "end_date": end, "is_active": active},
-            )
-        self.stdout.write(f"  Academic Cycles: {len(cycles)}")
+        upsert(
+            AcademicCycle,
+            ["year_label"],
+            [
+                {"year_label": label, "start_date": start, "end_date": end, "is_active": active}
+                for label, start, end, active in cycles
+            ],
+            update_fields=["start_date", "end_date", "is_active"],
+        )
+        return len(cycles)
 
     # ------------------------------------------------------------------
     # 5) Programmes
@@ -136,12 +159,13 @@ class Command(BaseCommand):
             ("DIP\u2013LUD Integrated Mentoring", "DIP-LUD", "Integrated programme combining DIP and LUD methodologies."),
             ("DIP\u2013YCLP Reflective Reporting", "DIP-YCLP", "Combined reflective reporting for DIP and YCLP activities."),
         ]
-        for name, code, desc in items:
-            Programme.objects.update_or_create(
-                name=name,
-                defaults={"code": code, "description": desc, "is_active": True},
-            )
-        self.stdout.write(f"  Programmes: {len(items)}")
+        upsert(
+            Programme,
+            ["name"],
+            [{"name": name, "code": code, "description": desc, "is_active": True} for name, code, desc in items],
+            update_fields=["code", "description", "is_active"],
+        )
+        return len(items)
 
     # ------------------------------------------------------------------
     # 6) Statuses
@@ -172,12 +196,13 @@ class Command(BaseCommand):
             ("On Hold", "warning", 18),
             ("Delayed", "danger", 19),
         ]
-        for name, color, ordering in items:
-            StatusConfig.objects.update_or_create(
-                name=name,
-                defaults={"color": color, "ordering": ordering, "is_active": True},
-            )
-        self.stdout.write(f"  Statuses: {len(items)}")
+        upsert(
+            StatusConfig,
+            ["name"],
+            [{"name": name, "color": color, "ordering": ordering, "is_active": True} for name, color, ordering in items],
+            update_fields=["color", "ordering", "is_active"],
+        )
+        return len(items)
 
     # ------------------------------------------------------------------
     # 7) Session Types
@@ -194,9 +219,8 @@ class Command(BaseCommand):
             "Leadership Session",
             "Community Session",
         ]
-        for name in names:
-            SessionType.objects.get_or_create(name=name, defaults={"is_active": True})
-        self.stdout.write(f"  Session Types: {len(names)}")
+        upsert(SessionType, ["name"], [{"name": name, "is_active": True} for name in names])
+        return len(names)
 
     # ------------------------------------------------------------------
     # 8) Rating Domains
@@ -225,16 +249,13 @@ class Command(BaseCommand):
                 "Conflict Navigation",
             ],
         }
-        count = 0
-        for year, names in tracker_domains.items():
-            for idx, name in enumerate(names, start=1):
-                RatingDomain.objects.update_or_create(
-                    year=year,
-                    name=name,
-                    defaults={"source": "tracker", "sort_order": idx, "is_active": True},
-                )
-                count += 1
-        self.stdout.write(f"  Rating Domains: {count}")
+        rows = [
+            {"year": year, "name": name, "source": "tracker", "sort_order": idx, "is_active": True}
+            for year, names in tracker_domains.items()
+            for idx, name in enumerate(names, start=1)
+        ]
+        upsert(RatingDomain, ["year", "name"], rows, update_fields=["source", "sort_order", "is_active"])
+        return len(rows)
 
     # ------------------------------------------------------------------
     # 9) Domain Indicators
@@ -311,22 +332,15 @@ class Command(BaseCommand):
                 "Seeks peaceful resolution",
             ],
         }
-        count = 0
-        for (year, domain_name), descs in indicators_map.items():
-            domain = RatingDomain.objects.filter(year=year, name=domain_name).first()
-            if not domain:
-                continue
-            for idx, desc in enumerate(descs, start=1):
-                _, created = DomainIndicator.objects.get_or_create(
-                    domain=domain,
-                    sort_order=idx,
-                    defaults={"description": desc},
-                )
-                if not created:
-                    # Update description if record already exists
-                    DomainIndicator.objects.filter(domain=domain, sort_order=idx).update(description=desc)
-                count += 1
-        self.stdout.write(f"  Domain Indicators: {count}")
+        domains = {(year, name): pk for year, name, pk in RatingDomain.objects.values_list("year", "name", "id")}
+        rows = [
+            {"domain_id": domains[key], "sort_order": idx, "description": desc}
+            for key, descs in indicators_map.items()
+            if key in domains
+            for idx, desc in enumerate(descs, start=1)
+        ]
+        upsert(DomainIndicator, ["domain_id", "sort_order"], rows, update_fields=["description"])
+        return len(rows)
 
     # ------------------------------------------------------------------
     # 10) Rating Scales (per-domain Likert definitions)
@@ -339,16 +353,13 @@ class Command(BaseCommand):
             (4, "Agree"),
             (5, "Strongly Agree"),
         ]
-        count = 0
-        for domain in RatingDomain.objects.filter(is_active=True):
-            for score, desc in scale:
-                RatingScaleDefinition.objects.update_or_create(
-                    domain=domain,
-                    score=score,
-                    defaults={"description": desc},
-                )
-                count += 1
-        self.stdout.write(f"  Rating Scale Definitions: {count}")
+        rows = [
+            {"domain_id": domain_id, "score": score, "description": desc}
+            for domain_id in RatingDomain.objects.filter(is_active=True).values_list("id", flat=True)
+            for score, desc in scale
+        ]
+        upsert(RatingScaleDefinition, ["domain_id", "score"], rows, update_fields=["description"])
+        return len(rows)
 
     # ------------------------------------------------------------------
     # 11) Mood Categories
@@ -368,16 +379,16 @@ class Command(BaseCommand):
             ("Frustrated", "Feeling blocked or annoyed", "distress", 11),
             ("Withdrawn", "Disengaged or pulling back", "distress", 12),
         ]
-        for name, desc, mood_type, order in items:
-            MoodCategory.objects.update_or_create(
-                name=name,
-                defaults={
-                    "description": desc,
-                    "mood_types": mood_type,
-                    "sort_order": order,
-                },
-            )
-        self.stdout.write(f"  Mood Categories: {len(items)}")
+        upsert(
+            MoodCategory,
+            ["name"],
+            [
+                {"name": name, "description": desc, "mood_types": mood_type, "sort_order": order}
+                for name, desc, mood_type, order in items
+            ],
+            update_fields=["description", "mood_types", "sort_order"],
+        )
+        return len(items)
 
     # ------------------------------------------------------------------
     # 12) Reference Content
@@ -405,13 +416,16 @@ class Command(BaseCommand):
             ("Volunteer Guidance", "Work Diary Instructions", "How to maintain an accurate and useful work diary.", 16),
             ("Volunteer Guidance", "Volunteer Transcript Criteria", "Criteria and standards for volunteer transcript evaluation.", 17),
         ]
-        for section, title, content, order in items:
-            ReferenceContent.objects.update_or_create(
-                section=section,
-                title=title,
-                defaults={"content": content, "sort_order": order},
-            )
-        self.stdout.write(f"  Reference Content: {len(items)}")
+        upsert(
+            ReferenceContent,
+            ["section", "title"],
+            [
+                {"section": section, "title": title, "content": content, "sort_order": order}
+                for section, title, content, order in items
+            ],
+            update_fields=["content", "sort_order"],
+        )
+        return len(items)
 
     # ------------------------------------------------------------------
     # 13) Template Configs
@@ -520,13 +534,13 @@ class Command(BaseCommand):
                 },
             ),
         ]
-        count = 0
-        for name, scope, year, fields_config in templates:
-            TemplateConfig.objects.update_or_create(
-                scope=scope,
-                year=year,
-                name=name,
-                defaults={"fields_config": fields_config, "is_active": True},
-            )
-            count += 1
-        self.stdout.write(f"  Template Configs: {count}")
+        upsert(
+            TemplateConfig,
+            ["scope", "year", "name"],
+            [
+                {"scope": scope, "year": year, "name": name, "fields_config": fields_config, "is_active": True}
+                for name, scope, year, fields_config in templates
+            ],
+            update_fields=["fields_config", "is_active"],
+        )
+        return len(templates)
@@ -0,0 +1,78 @@
+"""
+Report or delete media files that no row references.
+
+Usage:
+    python manage.py sweep_media
+    python manage.py sweep_media --delete
+    python manage.py sweep_media --delete --derivatives --batch-size 1000
+
+Compares the file names stored in every FileField/ImageField of the core
+app with a walk of MEDIA_ROOT.  Without ``--delete`` the orphans are only
+listed.  Files modified within ``--min-age-hours`` are left alone so
+uploads in flight are never touched.  Deduplicated evidence blobs are
+collected by ``collect_blobs`` instead; thumbnails are only swept with
+``--derivatives``.
+"""
+
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.media_sweep import iter_orphans
+
+
+class Command(BaseCommand):
+    help = "Report or delete media files that are not referenced by any row."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--delete", action="store_true", help="Delete orphans instead of listing them.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Orphans handled per batch.")
+        parser.add_argument(
+            "--min-age-hours",
+            type=float,
+            default=24,
+            help="Ignore files modified more recently than this (default: 24).",
+        )
+        parser.add_argument(
+            "--derivatives",
+            action="store_true",
+            help="Also sweep thumbnails no row's stored image hash refers to (run build_image_derivatives first).",
+        )
+
+    def handle(self, *args, **options):
+        root = str(settings.MEDIA_ROOT)
+        orphans = iter_orphans(
+            min_age_seconds=timedelta(hours=options["min_age_hours"]).total_seconds(),
+            derivatives=options["derivatives"],
+            root=root,
+        )
+
+        count = 0
+        size = 0
+        batch = []
+        for relative, file_size in orphans:
+            count += 1
+            size += file_size
+            batch.append(relative)
+            if len(batch) >= options["batch_size"]:
+                self._flush(root, batch, options["delete"])
+                batch = []
+        if batch:
+            self._flush(root, batch, options["delete"])
+
+        verb = "Deleted" if options["delete"] else "Found"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {count} orphaned media files ({size} bytes)."))
+
+    def _flush(self, root, batch, delete):
+        if not delete:
+            for relative in batch:
+                self.stdout.write(f"  {relative}")
+            return
+        for relative in batch:
+            try:
+                os.remove(os.path.join(root, relative))
+            except FileNotFoundError:
+                pass
+        self.stdout.write(f"  removed {len(batch)} files")
@@ -0,0 +1,111 @@
+"""
+Find media files that no row references any more.
+
+Uploads are never deleted by the application: cleared fields (a returned
+transcript's export_file), replaced uploads and rows removed by cascades all
+leave their files behind.  ``iter_orphans`` builds the set of every name
+stored in a FileField/ImageField of core.models, reading each field with a
+``values_list`` iterator, then walks MEDIA_ROOT with ``os.scandir`` and
+yields the files outside that set.
+
+Two trees are managed elsewhere and skipped: ``blobs/`` (reference counted
+by core.storage, collected by ``collect_blobs``) and ``derivatives/``
+(thumbnails from core.images, keyed by the content hash of the original).
+Derivatives are only considered when asked for; one is live while a row
+stores its hash, so run ``build_image_derivatives`` first or the thumbnails
+of photos uploaded before hashes were stored are swept too.
+"""
+
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+
+from core.images import DERIVATIVE_DIR, UPLOAD_PRESETS, digest_field
+from core.storage import BLOB_DIR
+
+
+CHUNK_SIZE = 2000
+
+
+def file_fields():
+    """(model, field) for every FileField and ImageField of the core app."""
+    return [
+        (model, field)
+        for model in apps.get_app_config("core").get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField)
+    ]
+
+
+def _stored_names(model, field):
+    return (
+        model._default_manager.exclude(**{field.name: ""})
+        .exclude(**{f"{field.name}__isnull": True})
+        .values_list(field.name, flat=True)
+        .order_by()
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def referenced_names():
+    """Every file name stored on a row, as a path relative to MEDIA_ROOT."""
+    names = set()
+    for model, field in file_fields():
+        names.update(os.path.normpath(name).replace(os.sep, "/") for name in _stored_names(model, field))
+    return names
+
+
+def live_image_hashes():
+    """Image hashes stored on rows, i.e. the derivatives still in use."""
+    hashes = set()
+    for model, field_names in UPLOAD_PRESETS.items():
+        for field_name in field_names:
+            column = digest_field(field_name)
+            hashes.update(
+                model._default_manager.exclude(**{column: ""})
+                .values_list(column, flat=True)
+                .order_by()
+                .iterator(chunk_size=CHUNK_SIZE)
+            )
+    return hashes
+
+
+def iter_media_files(root, skip=()):
+    """Yield (relative path, DirEntry) for every file under ``root``, skipping top-level dirs in ``skip``."""
+    pending = [""]
+    while pending:
+        relative_dir = pending.pop()
+        with os.scandir(os.path.join(root, relative_dir)) as entries:
+            for entry in entries:
+                relative = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if relative not in skip:
+                        pending.append(relative)
+                elif entry.is_file(follow_symlinks=False):
+                    yield relative, entry
+
+
+def iter_orphans(min_age_seconds=0, derivatives=False, root=None):
+    """Yield (relative path, size) of unreferenced files older than ``min_age_seconds``."""
+    root = str(root or settings.MEDIA_ROOT)
+    if not os.path.isdir(root):
+        return
+    referenced = referenced_names()
+    live_hashes = live_image_hashes() if derivatives else None
+    skip = {BLOB_DIR} if derivatives else {BLOB_DIR, DERIVATIVE_DIR}
+    cutoff = time.time() - min_age_seconds
+
+    for relative, entry in iter_media_files(root, skip):
+        stat = entry.stat(follow_symlinks=False)
+        if stat.st_mtime >= cutoff:
+            # Possibly an upload whose row is not committed yet.
+            continue
+        if relative.startswith(f"{DERIVATIVE_DIR}/"):
+            if entry.name.split("-", 1)[0] in live_hashes:
+                continue
+        elif relative in referenced:
+            continue
+        yield relative, stat.st_size
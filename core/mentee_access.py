@@ -0,0 +1,126 @@
+"""
+Cached set of mentee ids each mentor may open.
+
+Mentor views and mentee exports authorise against this set instead of running
+an assignment ``exists()`` query per check.  Sets are cached per mentor and
+per day, so assignments whose ``end_date`` has passed drop out at midnight.
+Saving or deleting a MentorMenteeAssignment bumps a generation number that
+retires every cached set once the transaction commits; code that writes assignments with ``bulk_create``
+or ``update()`` must call ``invalidate_mentee_access()`` itself.
+
+The set replaces one indexed query, so it is only worth caching in an
+in-memory cache all workers share (Redis, Memcached): a database cache costs
+two queries per check, and a per-process one (LocMemCache) would not see
+other workers' invalidations.  Otherwise each request loads the set once
+(``RequestIdentity.accessible_mentee_ids`` memoizes it).
+"""
+
+import threading
+import time
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils import timezone
+
+
+GENERATION_CACHE_KEY = "core:mentee_access:generation"
+_pending_generations = threading.local()
+IN_MEMORY_CACHE_MODULES = ("django.core.cache.backends.redis", "django.core.cache.backends.memcached", "django_redis.")
+
+
+def cache_is_shared():
+    """Whether every worker process reads and writes the same default cache."""
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def cache_is_in_memory():
+    """Whether the default cache is a shared in-memory store (Redis, Memcached) rather than a database table."""
+    return type(caches["default"]).__module__.startswith(IN_MEMORY_CACHE_MODULES)
+
+
+def mentee_access_cache_enabled():
+    setting = getattr(settings, "MENTEE_ACCESS_CACHE_ENABLED", None)
+    if setting is None:
+        return cache_is_in_memory()
+    return bool(setting) and cache_is_shared()
+
+
+def cache_generation(key):
+    """Current value of the generation counter stored under ``key``."""
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_cache_generation(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def bump_cache_generation_on_commit(key):
+    """
+    Bump ``key`` when the current transaction commits, once however many rows
+    it saved or deleted; outside a transaction the bump happens at once.
+    """
+    pending = getattr(_pending_generations, "keys", None)
+    if pending is None:
+        pending = _pending_generations.keys = set()
+    pending.add(key)
+    # Every call registers a callback so a rolled-back savepoint cannot drop
+    # the bump; only the first one to run for a pending key writes the cache.
+    transaction.on_commit(partial(_bump_pending_generation, key))
+
+
+def _bump_pending_generation(key):
+    pending = _pending_generations.keys
+    if key in pending:
+        pending.discard(key)
+        bump_cache_generation(key)
+
+
+def invalidate_mentee_access():
+    bump_cache_generation_on_commit(GENERATION_CACHE_KEY)
+
+
+def seconds_until_tomorrow(now):
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(int((tomorrow - now).total_seconds()), 1)
+
+
+def accessible_mentee_ids(user):
+    """Ids of mentees ``user`` mentors through an active assignment today."""
+    if not mentee_access_cache_enabled():
+        return _load_mentee_ids(user)
+
+    # The same "today" as active_assignments_qs, so the key rolls over with it.
+    now = timezone.now()
+    # Primary keys can be reused after deletes (SQLite), so the join time
+    # pins the entry to this particular account.
+    joined = int(user.date_joined.timestamp() * 1_000_000) if user.date_joined else 0
+    key = f"core:mentee_access:{cache_generation(GENERATION_CACHE_KEY)}:{user.pk}:{joined}:{now.date().isoformat()}"
+    mentee_ids = cache.get(key)
+    if mentee_ids is None:
+        mentee_ids = _load_mentee_ids(user)
+        cache.set(key, mentee_ids, seconds_until_tomorrow(now))
+    return mentee_ids
+
+
+def _load_mentee_ids(user):
+    from core.assignments import current_assignment_filter
+    from core.models import CurrentMentorAssignment
+
+    # The end_date guard keeps access exact on days the nightly job has not run yet.
+    return frozenset(
+        CurrentMentorAssignment.objects.filter(mentor=user)
+        .filter(current_assignment_filter())
+        .values_list("mentee_id", flat=True)
+    )
@@ -0,0 +1,309 @@
+import bisect
+import logging
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Sum
+
+from core.mentee_access import cache_is_shared
+from core.models import DiaryEntry, MenteeUploadLog, ReflectiveReport, VolunteerTranscript
+from core.review_queues import FINAL_REVIEW_STATUSES, REVIEW_STATUSES, TRANSCRIPT_REVIEW_STATUSES
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUEUE_SNAPSHOT_CACHE_KEY = "core:metrics:queue_snapshot"
+REQUEST_WORKERS_CACHE_KEY = "core:metrics:request_workers"
+DEFAULT_FLUSH_SECONDS = 10
+# A stopped worker's totals stay in the sums this long, then drop out (a counter reset).
+WORKER_SNAPSHOT_SECONDS = 7 * 24 * 60 * 60
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics_enabled():
+    return getattr(settings, "METRICS_ENABLED", True)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def state(self):
+        return (tuple(self.buckets), list(self.counts), self.total, self.count)
+
+    def merge(self, state):
+        buckets, counts, total, count = state
+        if tuple(buckets) == tuple(self.buckets):
+            self.counts = [mine + theirs for mine, theirs in zip(self.counts, counts)]
+        # Otherwise written before METRICS_LATENCY_BUCKETS changed: only the +Inf bucket, sum and count add up.
+        self.total += total
+        self.count += count
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name, **labels):
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            yield f"{name}_bucket{_labels(**labels, le=_number(float(bound)))} {cumulative}"
+        yield f"{name}_bucket{_labels(**labels, le='+Inf')} {self.count}"
+        yield f"{name}_sum{_labels(**labels)} {_number(self.total)}"
+        yield f"{name}_count{_labels(**labels)} {self.count}"
+
+
+class RequestMetrics:
+    """Request latency, query and export counters, rendered in Prometheus text format.
+
+    Each worker counts in memory and, at most every METRICS_FLUSH_SECONDS,
+    stores its totals in the shared cache under its own key from a short-lived
+    thread, so the write never lands on a request's connection.  A scrape sums
+    every worker's totals, so it does not matter which worker answers, and a
+    restarted worker's earlier requests are still counted.  With a
+    per-process cache a scrape only sees the worker that answered it.
+    """
+
+    def __init__(self, worker=None):
+        self._lock = threading.Lock()
+        self._worker = worker
+        self._flushed_at = time.monotonic()
+        self._clear()
+
+    def _clear(self):
+        self.latency = {}
+        self.exports = {}
+        self.requests = {}
+        self.queries = {}
+
+    def reset(self):
+        with self._lock:
+            self._clear()
+
+    @property
+    def worker(self):
+        # Read per call: a pre-forked worker must not share its parent's key.
+        return self._worker or f"{socket.gethostname()}:{os.getpid()}"
+
+    def _buckets(self):
+        return tuple(getattr(settings, "METRICS_LATENCY_BUCKETS", DEFAULT_LATENCY_BUCKETS))
+
+    def observe_request(self, url_name, status, seconds, query_count, export_seconds=None):
+        with self._lock:
+            histogram = self.latency.get(url_name)
+            if histogram is None:
+                histogram = self.latency[url_name] = Histogram(self._buckets())
+            histogram.observe(seconds)
+            key = (url_name, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.queries[url_name] = self.queries.get(url_name, 0) + query_count
+            if export_seconds is not None:
+                export_histogram = self.exports.get(url_name)
+                if export_histogram is None:
+                    export_histogram = self.exports[url_name] = Histogram(self._buckets())
+                export_histogram.observe(export_seconds)
+            now = time.monotonic()
+            due = now - self._flushed_at >= getattr(settings, "METRICS_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS)
+            if due:
+                self._flushed_at = now
+        if due and cache_is_shared():
+            threading.Thread(target=self._flush_in_background, name="metrics-flush", daemon=True).start()
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except Exception as exc:
+            # Retried at the next due request; the totals stay in memory meanwhile.
+            logger.warning("Could not store request metrics in the shared cache: %s", exc)
+        finally:
+            connection.close()
+
+    def state(self):
+        with self._lock:
+            return {
+                "latency": {url_name: histogram.state() for url_name, histogram in self.latency.items()},
+                "exports": {url_name: histogram.state() for url_name, histogram in self.exports.items()},
+                "requests": dict(self.requests),
+                "queries": dict(self.queries),
+            }
+
+    def flush(self):
+        """Store this worker's totals in the shared cache."""
+        with self._lock:
+            self._flushed_at = time.monotonic()
+        worker = self.worker
+        cache.set(f"core:metrics:requests:{worker}", self.state(), WORKER_SNAPSHOT_SECONDS)
+        workers = cache.get(REQUEST_WORKERS_CACHE_KEY) or set()
+        if worker not in workers:
+            # Not atomic; a worker dropped by a concurrent write re-adds itself on its next flush.
+            cache.set(REQUEST_WORKERS_CACHE_KEY, workers | {worker}, None)
+
+    def _worker_states(self):
+        if not cache_is_shared():
+            return [self.state()]
+        self.flush()
+        workers = cache.get(REQUEST_WORKERS_CACHE_KEY) or set()
+        keys = {f"core:metrics:requests:{worker}": worker for worker in workers}
+        states = cache.get_many(keys)
+        expired = {keys[key] for key in keys.keys() - states.keys()}
+        if expired:
+            cache.set(REQUEST_WORKERS_CACHE_KEY, workers - expired, None)
+        return list(states.values())
+
+    def render(self):
+        latency, exports, requests, queries = {}, {}, {}, {}
+        for state in self._worker_states():
+            for merged, histograms in ((latency, state["latency"]), (exports, state["exports"])):
+                for url_name, histogram in histograms.items():
+                    merged.setdefault(url_name, Histogram(self._buckets())).merge(histogram)
+            for key, value in state["requests"].items():
+                requests[key] = requests.get(key, 0) + value
+            for url_name, value in state["queries"].items():
+                queries[url_name] = queries.get(url_name, 0) + value
+
+        lines = [
+            "# HELP lud_request_duration_seconds Request latency by URL name.",
+            "# TYPE lud_request_duration_seconds histogram",
+        ]
+        for url_name, histogram in sorted(latency.items()):
+            lines.extend(histogram.render("lud_request_duration_seconds", url_name=url_name))
+        lines += [
+            "# HELP lud_requests_total Requests by URL name and status code.",
+            "# TYPE lud_requests_total counter",
+        ]
+        lines.extend(
+            f"lud_requests_total{_labels(url_name=url_name, status=status)} {value}"
+            for (url_name, status), value in sorted(requests.items())
+        )
+        lines += [
+            "# HELP lud_db_queries_total SQL queries issued by URL name.",
+            "# TYPE lud_db_queries_total counter",
+        ]
+        lines.extend(
+            f"lud_db_queries_total{_labels(url_name=url_name)} {value}"
+            for url_name, value in sorted(queries.items())
+        )
+        lines += [
+            "# HELP lud_export_duration_seconds Time spent serializing exports by URL name.",
+            "# TYPE lud_export_duration_seconds histogram",
+        ]
+        for url_name, histogram in sorted(exports.items()):
+            lines.extend(histogram.render("lud_export_duration_seconds", url_name=url_name))
+        return lines
+
+
+request_metrics = RequestMetrics()
+
+
+# ---------------------------------------------------------------------------
+# Queue depths and import throughput (cached snapshot)
+# ---------------------------------------------------------------------------
+def collect_queue_snapshot():
+    # Unscoped depths: what reviewers still have to look at, and what the
+    # admin as final approver has waiting (see core.review_queues).
+    reports = ReflectiveReport.objects.order_by()
+    diaries = DiaryEntry.objects.order_by()
+    imports = MenteeUploadLog.objects.aggregate(
+        files=Count("id"),
+        success=Sum("success_count"),
+        errors=Sum("error_count"),
+    )
+    return {
+        "queues": {
+            ("reports", "reviewer"): reports.filter(status__in=REVIEW_STATUSES).count(),
+            ("reports", "admin"): reports.filter(status__in=FINAL_REVIEW_STATUSES).count(),
+            ("diaries", "reviewer"): diaries.filter(review_status__in=REVIEW_STATUSES).count(),
+            ("diaries", "admin"): diaries.filter(review_status__in=FINAL_REVIEW_STATUSES).count(),
+            ("transcripts", "reviewer"): VolunteerTranscript.objects.filter(
+                approval_status__in=TRANSCRIPT_REVIEW_STATUSES
+            ).count(),
+        },
+        "imports": {
+            "files": imports["files"] or 0,
+            "success": imports["success"] or 0,
+            "errors": imports["errors"] or 0,
+        },
+        "refreshed_at": time.time(),
+    }
+
+
+class QueueSnapshot:
+    """Queue-depth snapshot in the shared cache, written by ``refresh_metrics`` and only read by scrapes.
+
+    Every worker sees the same snapshot and a scrape never runs the queue
+    counts itself. Until the command has run, the queue series are left out
+    and ``lud_queue_snapshot_present`` is 0.
+    """
+
+    def refresh(self):
+        snapshot = collect_queue_snapshot()
+        cache.set(QUEUE_SNAPSHOT_CACHE_KEY, snapshot, None)
+        return snapshot
+
+    def get(self):
+        return cache.get(QUEUE_SNAPSHOT_CACHE_KEY)
+
+    def render(self):
+        snapshot = self.get()
+        lines = [
+            "# HELP lud_queue_snapshot_present Whether refresh_metrics has stored a queue-depth snapshot.",
+            "# TYPE lud_queue_snapshot_present gauge",
+            f"lud_queue_snapshot_present {0 if snapshot is None else 1}",
+        ]
+        if snapshot is None:
+            return lines
+        lines += [
+            "# HELP lud_review_queue_depth Records awaiting review, by queue and approver level.",
+            "# TYPE lud_review_queue_depth gauge",
+        ]
+        lines.extend(
+            f"lud_review_queue_depth{_labels(queue=queue, approver=approver)} {value}"
+            for (queue, approver), value in sorted(snapshot["queues"].items())
+        )
+        imports = snapshot["imports"]
+        lines += [
+            "# HELP lud_mentee_import_files_total Mentee bulk-upload files processed.",
+            "# TYPE lud_mentee_import_files_total counter",
+            f"lud_mentee_import_files_total {imports['files']}",
+            "# HELP lud_mentee_import_rows_total Mentee bulk-upload rows by result.",
+            "# TYPE lud_mentee_import_rows_total counter",
+            f"lud_mentee_import_rows_total{_labels(result='success')} {imports['success']}",
+            f"lud_mentee_import_rows_total{_labels(result='error')} {imports['errors']}",
+            "# HELP lud_queue_snapshot_age_seconds Age of the queue-depth snapshot.",
+            "# TYPE lud_queue_snapshot_age_seconds gauge",
+            f"lud_queue_snapshot_age_seconds {_number(max(time.time() - snapshot['refreshed_at'], 0.0))}",
+        ]
+        return lines
+
+
+queue_snapshot = QueueSnapshot()
+
+
+def render_metrics():
+    return "\n".join(request_metrics.render() + queue_snapshot.render()) + "\n"
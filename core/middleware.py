@@ -0,0 +1,217 @@
+import cProfile
+import json
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils.functional import SimpleLazyObject
+
+from core.identity import RequestIdentity
+from core.metrics import metrics_enabled, request_metrics
+from core.perf import (
+    QueryRecorder,
+    RequestTimer,
+    activate_timer,
+    active_timer,
+    deactivate_timer,
+    query_budget_for,
+    query_stats,
+    resolved_url_name,
+)
+from core.profiling import profile_header_key, profile_token_user_id, save_profile
+
+
+logger = logging.getLogger(__name__)
+timing_logger = logging.getLogger("core.timing")
+
+SERVER_TIMING_PHASES = (
+    ("mw", "Middleware and auth"),
+    ("view", "View"),
+    ("sql", "SQL"),
+    ("tpl", "Template render"),
+    ("ctx", "Context processors"),
+    ("export", "Export serialization"),
+    ("total", "Total"),
+)
+
+
+def server_timing_header(phases):
+    return ", ".join(
+        f'{name};dur={phases[name] * 1000:.1f};desc="{desc}"'
+        for name, desc in SERVER_TIMING_PHASES
+        if name in phases
+    )
+
+
+def _active_role(request):
+    user = getattr(request, "user", None)
+    if not getattr(user, "is_authenticated", False):
+        return "anonymous"
+    return user.role or "none"
+
+
+class IdentityMiddleware:
+    """Attach a lazy, per-request ``request.identity``; place after AuthenticationMiddleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.identity = SimpleLazyObject(lambda: RequestIdentity(request.user))
+        return self.get_response(request)
+
+
+class QueryBudgetMiddleware:
+    """Record query count and SQL time per URL name and warn on budget overruns."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def _sampled(self):
+        sample_rate = getattr(settings, "QUERY_STATS_SAMPLE_RATE", 1.0)
+        return sample_rate >= 1 or random.random() < sample_rate
+
+    def __call__(self, request):
+        if not self._sampled():
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+
+        url_name = resolved_url_name(request)
+        budget = query_budget_for(url_name)
+        over_budget = budget is not None and recorder.count > budget
+        query_stats.record(url_name, recorder.count, recorder.duration, over_budget=over_budget)
+        if over_budget:
+            logger.warning(
+                "Query budget exceeded for %s: %s queries (budget %s, %.1f ms SQL) on %s %s",
+                url_name,
+                recorder.count,
+                budget,
+                recorder.duration * 1000,
+                request.method,
+                request.path,
+            )
+        return response
+
+
+class ProfilingMiddleware:
+    """Opt-in cProfile sampling of a fraction of requests or of requests with a signed admin header."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.header_key = profile_header_key()
+
+    def _should_profile(self, request):
+        token = request.META.get(self.header_key)
+        if token:
+            return profile_token_user_id(token) is not None
+        sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+        return sample_rate > 0 and random.random() < sample_rate
+
+    def __call__(self, request):
+        if not self._should_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active in this process.
+            return self.get_response(request)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        duration = time.perf_counter() - started
+
+        try:
+            name = save_profile(profiler, resolved_url_name(request), duration)
+        except OSError:
+            logger.exception("Could not store request profile for %s", request.path)
+        else:
+            logger.info("Stored request profile %s (%.1f ms)", name, duration * 1000)
+        return response
+
+
+class ServerTimingMiddleware:
+    """Break each request into timing phases for a Server-Timing header and a JSON log line.
+
+    Place near the top of MIDDLEWARE; ServerTimingViewMiddleware must be last
+    so the view phase starts after every other process_view hook.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SERVER_TIMING_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = RequestTimer()
+        recorder = QueryRecorder()
+        token = activate_timer(timer)
+        try:
+            with connection.execute_wrapper(recorder):
+                response = self.get_response(request)
+        finally:
+            deactivate_timer(token)
+
+        total = timer.elapsed()
+        timer.add("sql", recorder.duration)
+        timer.add("mw", max(total - timer.phases.get("view", 0.0), 0.0))
+        timer.add("total", total)
+        response["Server-Timing"] = server_timing_header(timer.phases)
+        url_name = resolved_url_name(request)
+
+        if metrics_enabled():
+            request_metrics.observe_request(
+                url_name,
+                response.status_code,
+                total,
+                recorder.count,
+                export_seconds=timer.phases.get("export"),
+            )
+
+        if timing_logger.isEnabledFor(logging.INFO):
+            timing_logger.info(
+                json.dumps(
+                    {
+                        "event": "request_timing",
+                        "url_name": url_name,
+                        "role": _active_role(request),
+                        "method": request.method,
+                        "status": response.status_code,
+                        "queries": recorder.count,
+                        "phases_ms": {name: round(seconds * 1000, 2) for name, seconds in timer.phases.items()},
+                    },
+                    sort_keys=True,
+                )
+            )
+        return response
+
+
+class ServerTimingViewMiddleware:
+    """Innermost half of ServerTimingMiddleware: times the view and any deferred template rendering."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SERVER_TIMING_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._timing_view_started = time.perf_counter()
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        started = getattr(request, "_timing_view_started", None)
+        timer = active_timer()
+        if started is not None and timer is not None:
+            timer.add("view", time.perf_counter() - started)
+        return response
@@ -0,0 +1,43 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:29
+
+import core.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_workscheduleassignment'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='customuser',
+            managers=[
+                ('objects', core.models.CustomUserManager()),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='volunteerreportingassignment',
+            name='endorser',
+            field=models.ForeignKey(limit_choices_to={'role_memberships__role': 'endorser'}, on_delete=django.db.models.deletion.PROTECT, related_name='volunteer_reporting_assignments', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='volunteerreportingassignment',
+            name='volunteer',
+            field=models.OneToOneField(limit_choices_to={'role_memberships__role': 'volunteer'}, on_delete=django.db.models.deletion.CASCADE, related_name='reporting_assignment', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='UserRole',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('admin', 'Admin'), ('endorser', 'Endorser'), ('mentor', 'Mentor'), ('mentee', 'Mentee'), ('volunteer', 'Volunteer')], max_length=20)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='role_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('role', 'user')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+
+BATCH_SIZE = 1000
+
+
+def backfill_role_memberships(apps, schema_editor):
+    CustomUser = apps.get_model('core', 'CustomUser')
+    UserRole = apps.get_model('core', 'UserRole')
+    batch = []
+    users = CustomUser.objects.values_list('id', 'role', 'roles', 'is_superuser').order_by('id')
+    for user_id, role, roles, is_superuser in users.iterator(chunk_size=BATCH_SIZE):
+        held = set(roles or [])
+        if role:
+            held.add(role)
+        if is_superuser:
+            held.add('admin')
+        batch.extend(UserRole(user_id=user_id, role=name) for name in sorted(held))
+        if len(batch) >= BATCH_SIZE:
+            UserRole.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        UserRole.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def clear_role_memberships(apps, schema_editor):
+    apps.get_model('core', 'UserRole').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_userrole'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_role_memberships, clear_role_memberships),
+    ]
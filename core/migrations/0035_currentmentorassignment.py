@@ -0,0 +1,40 @@
+# Generated by Django 6.0.3 on 2026-10-19 16:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0034_backfill_user_role_memberships'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurrentMentorAssignment',
+            fields=[
+                ('assignment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='current', serialize=False, to='core.mentormenteeassignment')),
+                ('end_date', models.DateField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='mentormenteeassignment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['mentor', 'mentee'], name='core_mma_active_mentor_idx'),
+        ),
+        migrations.AddField(
+            model_name='currentmentorassignment',
+            name='mentee',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.mentee'),
+        ),
+        migrations.AddField(
+            model_name='currentmentorassignment',
+            name='mentor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='currentmentorassignment',
+            index=models.Index(fields=['mentor', 'mentee'], name='core_current_mentor_idx'),
+        ),
+    ]
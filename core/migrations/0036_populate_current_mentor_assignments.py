@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db.models import Q
+from django.utils import timezone
+
+
+BATCH_SIZE = 1000
+
+
+def populate_current_assignments(apps, schema_editor):
+    MentorMenteeAssignment = apps.get_model('core', 'MentorMenteeAssignment')
+    CurrentMentorAssignment = apps.get_model('core', 'CurrentMentorAssignment')
+    today = timezone.now().date()
+    rows = (
+        MentorMenteeAssignment.objects.filter(is_active=True)
+        .filter(Q(end_date__isnull=True) | Q(end_date__gte=today))
+        .values_list('id', 'mentor_id', 'mentee_id', 'end_date')
+    )
+    batch = []
+    for assignment_id, mentor_id, mentee_id, end_date in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(
+            CurrentMentorAssignment(assignment_id=assignment_id, mentor_id=mentor_id, mentee_id=mentee_id, end_date=end_date)
+        )
+        if len(batch) >= BATCH_SIZE:
+            CurrentMentorAssignment.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        CurrentMentorAssignment.objects.bulk_create(batch)
+
+
+def clear_current_assignments(apps, schema_editor):
+    apps.get_model('core', 'CurrentMentorAssignment').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0035_currentmentorassignment'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_current_assignments, clear_current_assignments),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.3 on 2026-10-19 16:40
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0036_populate_current_mentor_assignments'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(django.db.models.functions.text.Upper('first_name'), name='core_user_first_name_upper'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(django.db.models.functions.text.Upper('last_name'), name='core_user_last_name_upper'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(django.db.models.functions.text.Upper('username'), name='core_user_username_upper'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='core_user_email_upper'),
+        ),
+        migrations.AddIndex(
+            model_name='mentee',
+            index=models.Index(django.db.models.functions.text.Upper('full_name'), name='core_mentee_full_name_upper'),
+        ),
+        migrations.AddIndex(
+            model_name='mentee',
+            index=models.Index(django.db.models.functions.text.Upper('register_no'), name='core_mentee_register_no_upper'),
+        ),
+    ]
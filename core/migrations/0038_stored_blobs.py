@@ -0,0 +1,48 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:20
+
+import core.storage
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0037_autocomplete_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='diaryentry',
+            name='evidence',
+            field=models.FileField(blank=True, null=True, storage=core.storage.evidence_storage, upload_to='diary_entries/'),
+        ),
+        migrations.AlterField(
+            model_name='objectiveitem',
+            name='evidence',
+            field=models.FileField(blank=True, null=True, storage=core.storage.evidence_storage, upload_to='evidence/'),
+        ),
+        migrations.AlterField(
+            model_name='profileartifact',
+            name='document',
+            field=models.FileField(storage=core.storage.evidence_storage, upload_to='profile_artifacts/'),
+        ),
+        migrations.AlterField(
+            model_name='repositoryasset',
+            name='file_upload',
+            field=models.FileField(storage=core.storage.evidence_storage, upload_to='repository/'),
+        ),
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('referenced_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ref_count', 'referenced_at'], name='core_blob_gc_idx')],
+            },
+        ),
+    ]
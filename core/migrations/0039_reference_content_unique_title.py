@@ -0,0 +1,44 @@
+# Generated by Django 6.0.3 on 2026-10-19 18:08
+
+from django.db import migrations
+
+
+TITLE_MAX_LENGTH = 200
+
+
+def number_repeated_titles(apps, schema_editor):
+    """Keep the first row of each (section, title) and number the titles of later repeats."""
+    ReferenceContent = apps.get_model('core', 'ReferenceContent')
+    rows = ReferenceContent.objects.order_by('section', 'title', 'sort_order', 'id').values_list('id', 'section', 'title')
+    taken = {(section, title) for _, section, title in rows}
+    seen = set()
+    renamed = []
+    for row_id, section, title in rows:
+        if (section, title) not in seen:
+            seen.add((section, title))
+            continue
+        number = 2
+        while True:
+            suffix = f" ({number})"
+            candidate = title[:TITLE_MAX_LENGTH - len(suffix)] + suffix
+            if (section, candidate) not in taken:
+                break
+            number += 1
+        taken.add((section, candidate))
+        renamed.append(ReferenceContent(id=row_id, title=candidate))
+    ReferenceContent.objects.bulk_update(renamed, ['title'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0038_stored_blobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(number_repeated_titles, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='referencecontent',
+            unique_together={('section', 'title')},
+        ),
+    ]
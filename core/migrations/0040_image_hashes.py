@@ -0,0 +1,28 @@
+# Generated by Django 6.0.3 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0039_reference_content_unique_title'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='photo_sha256',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='profile_pic_sha256',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='reflectivereport',
+            name='photo_sha256',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
@@ -1,7 +1,9 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db.models.functions import Upper
+from django.utils import timezone
 
 from core.roles import (
     NOTIFICATION_TARGET_CHOICES,
@@ -10,9 +12,20 @@ from core.roles import (
     ROLE_KEYS,
     ROLE_LABELS,
 )
+from core.storage import evidence_storage
 
 
 # -------------------- Custom User --------------------
+class CustomUserQuerySet(models.QuerySet):
+    def with_role(self, *roles):
+        """Users holding any of ``roles``, primary or additional, via the indexed UserRole table."""
+        return self.filter(id__in=UserRole.user_ids_with_role(*roles))
+
+
+class CustomUserManager(UserManager.from_queryset(CustomUserQuerySet)):
+    pass
+
+
 class CustomUser(AbstractUser):
     ROLE_CHOICES = ROLE_CHOICES
     ROLE_KEYS = ROLE_KEYS
@@ -21,6 +34,7 @@ class CustomUser(AbstractUser):
     roles = models.JSONField(default=list, blank=True, help_text="All roles assigned to this user")
     phone = models.CharField(max_length=20, blank=True, null=True)
     profile_pic = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
+    profile_pic_sha256 = models.CharField(max_length=64, blank=True, editable=False)
     gender = models.CharField(max_length=20, blank=True, null=True)
     date_of_birth = models.DateField(blank=True, null=True)
     religion = models.CharField(max_length=50, blank=True, null=True)
@@ -33,6 +47,17 @@ class CustomUser(AbstractUser):
         'self', blank=True, symmetrical=False, related_name='assigned_endorsers'
     )
 
+    objects = CustomUserManager()
+
+    class Meta(AbstractUser.Meta):
+        # Autocomplete prefix search compares UPPER(column) ranges.
+        indexes = [
+            models.Index(Upper("first_name"), name="core_user_first_name_upper"),
+            models.Index(Upper("last_name"), name="core_user_last_name_upper"),
+            models.Index(Upper("username"), name="core_user_username_upper"),
+            models.Index(Upper("email"), name="core_user_email_upper"),
+        ]
+
     def save(self, *args, **kwargs):
         update_fields = kwargs.get("update_fields")
         roles = list(self.roles or [])
@@ -54,6 +79,22 @@ class CustomUser(AbstractUser):
 
         super().save(*args, **kwargs)
 
+        # Checked after the additions above: saving is_superuser alone can add "admin".
+        saved_fields = kwargs.get("update_fields")
+        if saved_fields is None or {"role", "roles"} & set(saved_fields):
+            self.sync_role_memberships()
+
+    def sync_role_memberships(self):
+        wanted = set(self.roles or [])
+        current = set(self.role_memberships.values_list("role", flat=True))
+        if wanted - current:
+            UserRole.objects.bulk_create(
+                [UserRole(user=self, role=role) for role in sorted(wanted - current)],
+                ignore_conflicts=True,
+            )
+        if current - wanted:
+            self.role_memberships.filter(role__in=current - wanted).delete()
+
     def has_role(self, role_name):
         return role_name in (self.roles or [])
 
@@ -75,9 +116,29 @@ class CustomUser(AbstractUser):
         try:
             return self.mentee_profile
         except Mentee.DoesNotExist:
+            # Cache the miss the way select_related would, so repeat reads skip the query.
+            CustomUser.mentee_profile.related.set_cached_value(self, None)
             return None
 
 
+class UserRole(models.Model):
+    """One row per role a user holds; mirrors ``CustomUser.roles`` for indexed role filters."""
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="role_memberships")
+    role = models.CharField(max_length=20, choices=ROLE_CHOICES)
+
+    class Meta:
+        # (role, user) leads with role so "users with role X" is an index range scan.
+        unique_together = [("role", "user")]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.role}"
+
+    @classmethod
+    def user_ids_with_role(cls, *roles):
+        return cls.objects.filter(role__in=roles).values("user_id")
+
+
 # -------------------- Activity Model --------------------
 class Activity(models.Model):
     ACTIVITY_CHOICES = [
@@ -95,6 +156,7 @@ class Activity(models.Model):
     learnings = models.TextField(blank=True)
     feedback = models.TextField(blank=True)
     photo = models.ImageField(upload_to='photos/', blank=True, null=True)
+    photo_sha256 = models.CharField(max_length=64, blank=True, editable=False)
     remark = models.TextField(blank=True, null=True)
 
     def __str__(self):
@@ -154,6 +216,18 @@ class MentorProfile(models.Model):
 
 
 
+class WorkScheduleQuerySet(models.QuerySet):
+    def with_progress(self):
+        """Annotate assignment totals per status with conditional counts, in the same query."""
+        status = WorkScheduleAssignment.Status
+        return self.annotate(
+            assignment_total=models.Count("assignments"),
+            assignment_completed=models.Count("assignments", filter=models.Q(assignments__status=status.COMPLETED)),
+            assignment_in_progress=models.Count("assignments", filter=models.Q(assignments__status=status.IN_PROGRESS)),
+            assignment_on_hold=models.Count("assignments", filter=models.Q(assignments__status=status.ON_HOLD)),
+        )
+
+
 class WorkSchedule(models.Model):
     endorser = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='schedules')
     mentors = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='mentor_schedules')
@@ -161,6 +235,8 @@ class WorkSchedule(models.Model):
     due_date = models.DateField()
     description = models.TextField()
 
+    objects = WorkScheduleQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.endorser.username} - {self.role} due {self.due_date}"
 
@@ -169,14 +245,18 @@ class WorkSchedule(models.Model):
         return self.mentors.all()
 
     def assignment_summary(self):
-        assignments = list(self.assignments.all())
-        total = len(assignments)
-        completed = sum(1 for assignment in assignments if assignment.status == WorkScheduleAssignment.Status.COMPLETED)
-        in_progress = sum(1 for assignment in assignments if assignment.status == WorkScheduleAssignment.Status.IN_PROGRESS)
+        """Assignment counts by status; free when loaded via ``WorkSchedule.objects.with_progress()``."""
+        if not hasattr(self, "assignment_total"):
+            counts = WorkSchedule.objects.filter(pk=self.pk).with_progress().values(
+                "assignment_total", "assignment_completed", "assignment_in_progress", "assignment_on_hold"
+            ).get()
+            for name, value in counts.items():
+                setattr(self, name, value)
         return {
-            "total": total,
-            "completed": completed,
-            "in_progress": in_progress,
+            "total": self.assignment_total,
+            "completed": self.assignment_completed,
+            "in_progress": self.assignment_in_progress,
+            "on_hold": self.assignment_on_hold,
         }
 
 
@@ -329,6 +409,10 @@ class Mentee(models.Model):
 
     class Meta:
         ordering = ["full_name"]
+        indexes = [
+            models.Index(Upper("full_name"), name="core_mentee_full_name_upper"),
+            models.Index(Upper("register_no"), name="core_mentee_register_no_upper"),
+        ]
 
     def __str__(self):
         if self.user:
@@ -363,17 +447,44 @@ class MentorMenteeAssignment(models.Model):
     class Meta:
         ordering = ["-start_date"]
         unique_together = [("mentor", "mentee", "start_date")]
+        indexes = [
+            models.Index(
+                fields=["mentor", "mentee"],
+                condition=models.Q(is_active=True),
+                name="core_mma_active_mentor_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.mentor} -> {self.mentee}"
 
 
+class CurrentMentorAssignment(models.Model):
+    """Active, unexpired MentorMenteeAssignment rows, maintained by core.assignments."""
+
+    assignment = models.OneToOneField(
+        MentorMenteeAssignment,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="current",
+    )
+    mentor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    mentee = models.ForeignKey(Mentee, on_delete=models.CASCADE, related_name="+")
+    end_date = models.DateField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["mentor", "mentee"], name="core_current_mentor_idx")]
+
+    def __str__(self):
+        return f"{self.mentor_id} -> {self.mentee_id}"
+
+
 class VolunteerReportingAssignment(models.Model):
     volunteer = models.OneToOneField(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="reporting_assignment",
-        limit_choices_to={"role": "volunteer"},
+        limit_choices_to={"role_memberships__role": "volunteer"},
     )
     programme = models.ForeignKey(
         Programme,
@@ -389,7 +500,7 @@ class VolunteerReportingAssignment(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.PROTECT,
         related_name="volunteer_reporting_assignments",
-        limit_choices_to={"role": "endorser"},
+        limit_choices_to={"role_memberships__role": "endorser"},
     )
     assigned_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -456,7 +567,7 @@ class ObjectiveItem(models.Model):
         null=True,
         blank=True,
     )
-    evidence = models.FileField(upload_to="evidence/", blank=True, null=True)
+    evidence = models.FileField(upload_to="evidence/", storage=evidence_storage, blank=True, null=True)
     mentee_remarks = models.TextField(blank=True)
     mentor_comments = models.TextField(blank=True)
     mentor_approved = models.BooleanField(default=False)
@@ -565,6 +676,7 @@ class ReferenceContent(models.Model):
 
     class Meta:
         ordering = ["section", "sort_order"]
+        unique_together = [("section", "title")]
 
     def __str__(self):
         return f"{self.section}: {self.title or 'Entry'}"
@@ -627,7 +739,8 @@ class MenteeAssessment(models.Model):
         return f"{self.mentee} - {self.get_year_display()} - {self.date}"
 
     def average_score(self):
-        scores = list(self.ratings.values_list("value", flat=True))
+        # Reads prefetched ratings when the queryset loaded them.
+        scores = [rating.value for rating in self.ratings.all()]
         if not scores:
             return None
         return round(sum(scores) / len(scores), 2)
@@ -724,6 +837,7 @@ class ReflectiveReport(models.Model):
     feedback = models.TextField(blank=True)
     suggestions = models.TextField(blank=True)
     photo = models.ImageField(upload_to="reflective_reports/", blank=True, null=True)
+    photo_sha256 = models.CharField(max_length=64, blank=True, editable=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Draft')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -751,7 +865,7 @@ class DiaryEntry(models.Model):
     location = models.ForeignKey(Location, on_delete=models.SET_NULL, null=True, blank=True, related_name="diary_entries")
     linked_activity = models.CharField(max_length=255, blank=True)
     narrative_entry = models.TextField()
-    evidence = models.FileField(upload_to="diary_entries/", blank=True, null=True)
+    evidence = models.FileField(upload_to="diary_entries/", storage=evidence_storage, blank=True, null=True)
     review_status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Draft')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -791,7 +905,7 @@ class VolunteerTranscript(models.Model):
 class ProfileArtifact(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="profile_artifacts")
     title = models.CharField(max_length=200)
-    document = models.FileField(upload_to="profile_artifacts/")
+    document = models.FileField(upload_to="profile_artifacts/", storage=evidence_storage)
     is_public = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -814,7 +928,7 @@ class RepositoryAsset(models.Model):
 
     title = models.CharField(max_length=200)
     category = models.CharField(max_length=100)
-    file_upload = models.FileField(upload_to="repository/")
+    file_upload = models.FileField(upload_to="repository/", storage=evidence_storage)
     tags = models.CharField(max_length=255, blank=True)
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name="uploaded_assets")
     role_visibility = models.CharField(max_length=20, choices=ROLE_VISIBILITY_CHOICES, default='all')
@@ -829,6 +943,21 @@ class RepositoryAsset(models.Model):
         return f"{self.title} ({self.get_role_visibility_display()})"
 
 
+class StoredBlob(models.Model):
+    """One file of the deduplicating evidence storage (core.storage) and how many rows use it."""
+
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    referenced_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["ref_count", "referenced_at"], name="core_blob_gc_idx")]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
 class EvidenceAttachment(models.Model):
     asset = models.ForeignKey(RepositoryAsset, on_delete=models.CASCADE, related_name="attachments")
     linked_model = models.CharField(max_length=100, help_text="e.g., MenteeAssessment, ReflectiveReport")
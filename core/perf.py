@@ -0,0 +1,168 @@
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+DEFAULT_QUERY_BUDGET = 50
+UNRESOLVED_URL_NAME = "<unresolved>"
+
+
+def query_budget_for(url_name):
+    budgets = getattr(settings, "QUERY_BUDGETS", {}) or {}
+    if url_name in budgets:
+        return budgets[url_name]
+    return getattr(settings, "QUERY_BUDGET_DEFAULT", DEFAULT_QUERY_BUDGET)
+
+
+def resolved_url_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None or not match.url_name:
+        return UNRESOLVED_URL_NAME
+    return match.url_name
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (0 <= pct <= 100); None when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class QueryRecorder:
+    """Execute wrapper that counts queries and accumulates their SQL time."""
+
+    def __init__(self, keep_sql=False):
+        self.count = 0
+        self.duration = 0.0
+        self.keep_sql = keep_sql
+        self.statements = []
+        # gather_reads installs the request's recorders on its worker threads too.
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.duration += elapsed
+                self.count += 1
+                if self.keep_sql:
+                    self.statements.append(sql)
+
+
+class ViewQueryStats:
+    """In-process aggregate of query counts and SQL time per URL name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = {}
+
+    def record(self, url_name, query_count, sql_seconds, over_budget=False):
+        with self._lock:
+            row = self._rows.get(url_name)
+            if row is None:
+                row = self._rows[url_name] = {
+                    "url_name": url_name,
+                    "samples": 0,
+                    "total_queries": 0,
+                    "max_queries": 0,
+                    "total_sql_ms": 0.0,
+                    "max_sql_ms": 0.0,
+                    "over_budget": 0,
+                }
+            sql_ms = sql_seconds * 1000
+            row["samples"] += 1
+            row["total_queries"] += query_count
+            row["max_queries"] = max(row["max_queries"], query_count)
+            row["total_sql_ms"] += sql_ms
+            row["max_sql_ms"] = max(row["max_sql_ms"], sql_ms)
+            if over_budget:
+                row["over_budget"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            rows = [dict(row) for row in self._rows.values()]
+        for row in rows:
+            row["avg_queries"] = round(row["total_queries"] / row["samples"], 1)
+            row["avg_sql_ms"] = round(row["total_sql_ms"] / row["samples"], 2)
+            row["total_sql_ms"] = round(row["total_sql_ms"], 2)
+            row["max_sql_ms"] = round(row["max_sql_ms"], 2)
+            row["budget"] = query_budget_for(row["url_name"])
+        return sorted(rows, key=lambda row: (-row["max_queries"], row["url_name"]))
+
+    def reset(self):
+        with self._lock:
+            self._rows.clear()
+
+
+query_stats = ViewQueryStats()
+
+
+class RequestTimer:
+    """Wall-clock seconds per named phase of a single request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = defaultdict(float)
+        self._open = set()
+
+    @contextmanager
+    def phase(self, name):
+        # Nested entries of the same phase (e.g. a template rendered from a
+        # template) are only counted once, by the outermost one.
+        if name in self._open:
+            yield
+            return
+        self._open.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._open.discard(name)
+            self.phases[name] += time.perf_counter() - started
+
+    def add(self, name, seconds):
+        self.phases[name] += seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+_active_timer = ContextVar("core_request_timer", default=None)
+
+
+def activate_timer(timer):
+    return _active_timer.set(timer)
+
+
+def deactivate_timer(token):
+    _active_timer.reset(token)
+
+
+def active_timer():
+    return _active_timer.get()
+
+
+@contextmanager
+def timing_phase(name):
+    """Attribute the enclosed block to ``name`` on the current request timer, if any.
+
+    Exports wrap only the step that writes finished rows into the file
+    (``workbook.save``, ``csv.writer(...).writerows``); querying and row
+    building stay in the view and SQL phases.
+    """
+    timer = _active_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.phase(name):
+        yield
@@ -0,0 +1,126 @@
+"""
+Per-mentee progress summary for the mentor dashboard.
+
+``mentor_portfolio`` covers every mentee a mentor currently has with three
+grouped aggregate queries (objectives by status, latest assessment score,
+overdue year-plan items), whatever the number of mentees.  Results are cached
+per mentor and day; saving an objective, year-plan item, assessment or rating,
+or deleting a mentee or assessment, bumps a generation number that retires
+every cached portfolio once the transaction commits, as does any change to the
+mentor's assignments.  Objectives, year-plan items and ratings have no delete
+receiver, so their cascades stay fast deletes; code deleting them directly
+must call ``invalidate_mentor_portfolios()`` itself.  Portfolios are only
+cached in a cache all workers share (see ``cache_is_shared``).
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from core.mentee_access import (
+    GENERATION_CACHE_KEY as MENTEE_ACCESS_GENERATION_CACHE_KEY,
+    accessible_mentee_ids,
+    bump_cache_generation_on_commit,
+    cache_generation,
+    cache_is_shared,
+    seconds_until_tomorrow,
+)
+from core.models import MenteeAssessment, ObjectiveItem, YearPlanItem
+
+
+GENERATION_CACHE_KEY = "core:mentor_portfolio:generation"
+COMPLETED_STATUS = "Completed"
+
+
+def invalidate_mentor_portfolios():
+    bump_cache_generation_on_commit(GENERATION_CACHE_KEY)
+
+
+def _empty_summary():
+    return {
+        "objectives_total": 0,
+        "objectives_completed": 0,
+        "objective_statuses": [],
+        "average_progress": None,
+        "last_assessment_date": None,
+        "last_assessment_score": None,
+        "overdue_year_plans": 0,
+    }
+
+
+def _add_objective_counts(summaries, mentee_ids):
+    progress = {}
+    rows = (
+        ObjectiveItem.objects.filter(mentee_id__in=mentee_ids)
+        .values("mentee_id", "status__name", "status__color", "status__ordering")
+        .annotate(total=Count("id"), progress_sum=Sum("progress_percent"), progress_count=Count("progress_percent"))
+        .order_by("mentee_id", "status__ordering", "status__name")
+    )
+    for row in rows:
+        summary = summaries[row["mentee_id"]]
+        summary["objectives_total"] += row["total"]
+        if row["status__name"] == COMPLETED_STATUS:
+            summary["objectives_completed"] += row["total"]
+        summary["objective_statuses"].append(
+            {"name": row["status__name"] or "No status", "color": row["status__color"] or "secondary", "count": row["total"]}
+        )
+        progress_sum, progress_count = progress.get(row["mentee_id"], (0, 0))
+        progress[row["mentee_id"]] = (progress_sum + (row["progress_sum"] or 0), progress_count + row["progress_count"])
+    for mentee_id, (progress_sum, progress_count) in progress.items():
+        if progress_count:
+            summaries[mentee_id]["average_progress"] = round(progress_sum / progress_count, 1)
+
+
+def _add_last_assessments(summaries, mentee_ids):
+    latest = MenteeAssessment.objects.filter(mentee_id=OuterRef("mentee_id")).order_by("-date", "-id").values("id")[:1]
+    rows = (
+        MenteeAssessment.objects.filter(mentee_id__in=mentee_ids, id=Subquery(latest))
+        .values("mentee_id", "date")
+        .annotate(average_score=Avg("ratings__value"))
+        .order_by()
+    )
+    for row in rows:
+        summary = summaries[row["mentee_id"]]
+        summary["last_assessment_date"] = row["date"]
+        if row["average_score"] is not None:
+            summary["last_assessment_score"] = round(row["average_score"], 2)
+
+
+def _add_overdue_year_plans(summaries, mentee_ids, today):
+    rows = (
+        YearPlanItem.objects.filter(mentee_id__in=mentee_ids, target_date__lt=today)
+        .exclude(status__name=COMPLETED_STATUS)
+        .values("mentee_id")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    for row in rows:
+        summaries[row["mentee_id"]]["overdue_year_plans"] = row["total"]
+
+
+def _load_portfolio(mentee_ids, today):
+    summaries = {mentee_id: _empty_summary() for mentee_id in mentee_ids}
+    if summaries:
+        _add_objective_counts(summaries, mentee_ids)
+        _add_last_assessments(summaries, mentee_ids)
+        _add_overdue_year_plans(summaries, mentee_ids, today)
+    return summaries
+
+
+def mentor_portfolio(user):
+    """Map each mentee id ``user`` currently mentors to its progress summary."""
+    now = timezone.now()
+    if not getattr(settings, "MENTOR_PORTFOLIO_CACHE_ENABLED", True) or not cache_is_shared():
+        return _load_portfolio(sorted(accessible_mentee_ids(user)), now.date())
+
+    joined = int(user.date_joined.timestamp() * 1_000_000) if user.date_joined else 0
+    key = (
+        f"core:mentor_portfolio:{cache_generation(GENERATION_CACHE_KEY)}:"
+        f"{cache_generation(MENTEE_ACCESS_GENERATION_CACHE_KEY)}:{user.pk}:{joined}:{now.date().isoformat()}"
+    )
+    summaries = cache.get(key)
+    if summaries is None:
+        summaries = _load_portfolio(sorted(accessible_mentee_ids(user)), now.date())
+        cache.set(key, summaries, seconds_until_tomorrow(now))
+    return summaries
@@ -0,0 +1,121 @@
+import io
+import os
+import pstats
+import re
+import time
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+
+
+PROFILE_TOKEN_SALT = "core.profiling"
+DEFAULT_PROFILE_HEADER = "X-Profile"
+DEFAULT_TOKEN_MAX_AGE = 60 * 60
+DEFAULT_RETENTION_DAYS = 7
+DEFAULT_MAX_FILES = 200
+PROFILE_NAME_RE = re.compile(
+    r"^(?P<stamp>\d{8}T\d{6})_(?P<url_name>[\w.<>-]+)_(?P<duration_ms>\d+)ms_(?P<token>[0-9a-f]{8})\.prof$"
+)
+
+
+def profile_dir():
+    return str(getattr(settings, "PROFILING_DIR", os.path.join(settings.BASE_DIR, "profiles")))
+
+
+def profile_header_key():
+    header = getattr(settings, "PROFILING_HEADER", DEFAULT_PROFILE_HEADER)
+    return "HTTP_" + header.upper().replace("-", "_")
+
+
+def make_profile_token(user):
+    return signing.TimestampSigner(salt=PROFILE_TOKEN_SALT).sign(str(user.pk))
+
+
+def profile_token_user_id(token):
+    """Return the admin user id embedded in a valid token, else None."""
+    max_age = getattr(settings, "PROFILING_TOKEN_MAX_AGE", DEFAULT_TOKEN_MAX_AGE)
+    try:
+        return int(signing.TimestampSigner(salt=PROFILE_TOKEN_SALT).unsign(token, max_age=max_age))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def _safe_url_name(url_name):
+    return re.sub(r"[^\w.<>-]", "-", url_name)[:80] or "-"
+
+
+def save_profile(profiler, url_name, duration_seconds):
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    name = "{stamp}_{url_name}_{duration}ms_{token}.prof".format(
+        stamp=timezone.now().strftime("%Y%m%dT%H%M%S"),
+        url_name=_safe_url_name(url_name),
+        duration=int(duration_seconds * 1000),
+        token=uuid.uuid4().hex[:8],
+    )
+    profiler.dump_stats(os.path.join(directory, name))
+    cleanup_profiles()
+    return name
+
+
+def _profile_entry(entry):
+    match = PROFILE_NAME_RE.match(entry.name)
+    if not match or not entry.is_file():
+        return None
+    stat = entry.stat()
+    return {
+        "name": entry.name,
+        "url_name": match["url_name"],
+        "duration_ms": int(match["duration_ms"]),
+        "created_at": timezone.make_aware(datetime.strptime(match["stamp"], "%Y%m%dT%H%M%S"), dt_timezone.utc),
+        "size_kb": round(stat.st_size / 1024, 1),
+        "mtime": stat.st_mtime,
+    }
+
+
+def list_profiles():
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    with os.scandir(directory) as entries:
+        profiles = [profile for profile in map(_profile_entry, entries) if profile]
+    return sorted(profiles, key=lambda profile: profile["name"], reverse=True)
+
+
+def profile_path(name):
+    """Absolute path of a stored profile, or None for names that are not ours."""
+    if not PROFILE_NAME_RE.match(name):
+        return None
+    path = os.path.join(profile_dir(), name)
+    return path if os.path.isfile(path) else None
+
+
+def cleanup_profiles():
+    """Delete profiles past the retention window or beyond the file cap; return the count removed."""
+    retention_days = getattr(settings, "PROFILING_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)
+    max_files = getattr(settings, "PROFILING_MAX_FILES", DEFAULT_MAX_FILES)
+    cutoff = time.time() - timedelta(days=retention_days).total_seconds()
+
+    profiles = list_profiles()
+    expired = [profile for profile in profiles if profile["mtime"] < cutoff]
+    kept = [profile for profile in profiles if profile["mtime"] >= cutoff]
+    expired.extend(kept[max_files:])
+
+    removed = 0
+    for profile in expired:
+        try:
+            os.remove(os.path.join(profile_dir(), profile["name"]))
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def profile_summary(path, limit=40, sort="cumulative"):
+    output = io.StringIO()
+    stats = pstats.Stats(path, stream=output)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return output.getvalue()
@@ -0,0 +1,88 @@
+"""
+Review queues shared by the approval pages and the metrics snapshot.
+
+A reviewer who leads chapters only sees records from those chapters'
+locations; any other reviewer, and the admin as final approver, sees them
+all.  The admin's queues also hold records a reviewer has already passed on
+("Reviewed") and that now wait for final approval.
+"""
+
+from core.models import Chapter, DiaryEntry, ReflectiveReport, VolunteerTranscript
+from core.roles import REVIEWER_ROLES
+
+
+# Statuses waiting in a reviewer's queue, and in the final approver's.
+REVIEW_STATUSES = ("Submitted",)
+FINAL_REVIEW_STATUSES = ("Submitted", "Reviewed")
+TRANSCRIPT_REVIEW_STATUSES = ("Pending Review",)
+
+
+def is_final_approver(user):
+    return user.role == "admin"
+
+
+def review_scope_location_ids(user):
+    if user.role in REVIEWER_ROLES and Chapter.objects.filter(leader=user).exists():
+        return list(
+            Chapter.objects.filter(leader=user)
+            .exclude(location__isnull=True)
+            .values_list("location_id", flat=True)
+            .distinct()
+        )
+    return None
+
+
+def scope_location_queryset(queryset, user, field_name="location_id"):
+    location_ids = review_scope_location_ids(user)
+    if location_ids is None:
+        return queryset
+    if not location_ids:
+        return queryset.none()
+    return queryset.filter(**{f"{field_name}__in": location_ids})
+
+
+def scoped_transcript_queryset(user, queryset=None):
+    if queryset is None:
+        queryset = VolunteerTranscript.objects.all()
+    location_ids = review_scope_location_ids(user)
+    if location_ids is None:
+        return queryset
+    if not location_ids:
+        return queryset.none()
+
+    volunteer_ids = set(
+        ReflectiveReport.objects.filter(location_id__in=location_ids).values_list("user_id", flat=True)
+    )
+    volunteer_ids.update(
+        DiaryEntry.objects.filter(location_id__in=location_ids).values_list("volunteer_id", flat=True)
+    )
+    return queryset.filter(volunteer_id__in=volunteer_ids)
+
+
+def queue_statuses(user):
+    return FINAL_REVIEW_STATUSES if is_final_approver(user) else REVIEW_STATUSES
+
+
+def report_queue_queryset(user):
+    statuses = queue_statuses(user)
+    return scope_location_queryset(
+        ReflectiveReport.objects.filter(status__in=statuses).select_related("user", "location", "programme"),
+        user,
+    )
+
+
+def diary_queue_queryset(user):
+    statuses = queue_statuses(user)
+    return scope_location_queryset(
+        DiaryEntry.objects.filter(review_status__in=statuses).select_related("volunteer", "location"),
+        user,
+    )
+
+
+def transcript_queue_queryset(user):
+    if user.role not in REVIEWER_ROLES:
+        return VolunteerTranscript.objects.none()
+    return scoped_transcript_queryset(
+        user,
+        VolunteerTranscript.objects.filter(approval_status__in=TRANSCRIPT_REVIEW_STATUSES).select_related("volunteer"),
+    )
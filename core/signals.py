@@ -0,0 +1,96 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.analytics import invalidate_cohort_analytics
+from core.assignment_graph import invalidate_assignment_graph
+from core.assignments import refresh_current_assignment
+from core.images import UPLOAD_PRESETS, build_upload_derivatives, digest_field
+from core.mentee_access import invalidate_mentee_access
+from core.models import (
+    Activity,
+    AssessmentRating,
+    CustomUser,
+    Mentee,
+    MenteeAssessment,
+    MentorMenteeAssignment,
+    ObjectiveItem,
+    ReflectiveReport,
+    StatusConfig,
+    YearPlanItem,
+)
+from core.portfolio import invalidate_mentor_portfolios
+
+
+@receiver(post_save, sender=MentorMenteeAssignment)
+def sync_current_assignment(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_current_assignment(instance)
+    invalidate_mentee_access()
+
+
+@receiver(post_delete, sender=MentorMenteeAssignment)
+def reset_mentee_access_cache(sender, **kwargs):
+    invalidate_mentee_access()
+
+
+# Deletes are caught at the mentee and the assessment: a delete receiver on
+# objectives, year-plan items or ratings would turn their cascades from one
+# DELETE per table into a SELECT and a signal per row.
+@receiver(post_save, sender=ObjectiveItem)
+@receiver(post_save, sender=YearPlanItem)
+@receiver(post_save, sender=MenteeAssessment)
+@receiver(post_delete, sender=MenteeAssessment)
+@receiver(post_save, sender=AssessmentRating)
+@receiver(post_save, sender=StatusConfig)
+@receiver(post_delete, sender=Mentee)
+def reset_mentor_portfolios(sender, **kwargs):
+    invalidate_mentor_portfolios()
+
+
+@receiver(post_save, sender=MenteeAssessment)
+@receiver(post_delete, sender=MenteeAssessment)
+@receiver(post_save, sender=AssessmentRating)
+@receiver(post_save, sender=Mentee)
+@receiver(post_delete, sender=Mentee)
+def reset_cohort_analytics(sender, **kwargs):
+    invalidate_cohort_analytics()
+
+
+@receiver(m2m_changed, sender=CustomUser.mentors.through)
+def reset_assignment_graph(sender, action, **kwargs):
+    if action.startswith("post_"):
+        invalidate_assignment_graph()
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def reset_assignment_graph_for_user(sender, update_fields=None, **kwargs):
+    # Logins only touch last_login, which the graph does not show.
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    invalidate_assignment_graph()
+
+
+@receiver(pre_save, sender=CustomUser)
+@receiver(pre_save, sender=Activity)
+@receiver(pre_save, sender=ReflectiveReport)
+def note_uploaded_images(sender, instance, **kwargs):
+    # A file that is not committed yet is being uploaded by this save.
+    instance._uploaded_images = [
+        name for name in UPLOAD_PRESETS[sender]
+        if getattr(instance, name) and not getattr(instance, name)._committed
+    ]
+    for name in UPLOAD_PRESETS[sender]:
+        if name in instance._uploaded_images or not getattr(instance, name):
+            # Set again once the new upload's derivatives are built.
+            setattr(instance, digest_field(name), "")
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_save, sender=Activity)
+@receiver(post_save, sender=ReflectiveReport)
+def build_image_derivatives(sender, instance, **kwargs):
+    uploaded = getattr(instance, "_uploaded_images", None)
+    if uploaded:
+        build_upload_derivatives(instance, uploaded)
+        instance._uploaded_images = []
@@ -0,0 +1,178 @@
+"""
+Content-addressed storage for evidence and repository files.
+
+Certificates, report PDFs and event photos are uploaded again and again
+across repository assets, profile artifacts, work diary entries and
+objective evidence.  DeduplicatingStorage hashes each upload while streaming
+it to a temporary file and stores it once as ``blobs/<hh>/<sha256><ext>``;
+a second upload of the same bytes only bumps the blob's reference count
+(core.models.StoredBlob).  File names stored on rows are the blob names, so
+reads are plain filesystem reads under MEDIA_ROOT.
+
+Django never deletes files when rows are deleted or a file is replaced,
+so counts only ever drift upwards.  ``collect_garbage`` (the
+``collect_blobs`` command) first recounts references from every field
+that uses this storage and then deletes blobs that nothing references.
+"""
+
+import hashlib
+import os
+import tempfile
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+
+BLOB_DIR = "blobs"
+TEMP_PREFIX = ".upload-"
+DEFAULT_MIN_AGE = timedelta(hours=24)
+
+
+def evidence_storage():
+    """Storage of the evidence/repository file fields (the ``evidence`` STORAGES alias)."""
+    return storages["evidence"]
+
+
+def _blob_model():
+    return apps.get_model("core", "StoredBlob")
+
+
+class DeduplicatingStorage(FileSystemStorage):
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        blob_root = self.path(BLOB_DIR)
+        os.makedirs(blob_root, exist_ok=True)
+
+        sha = hashlib.sha256()
+        size = 0
+        handle, temp_path = tempfile.mkstemp(dir=blob_root, prefix=TEMP_PREFIX)
+        try:
+            with os.fdopen(handle, "wb") as temp:
+                for chunk in content.chunks():
+                    sha.update(chunk)
+                    temp.write(chunk)
+                    size += len(chunk)
+            digest = sha.hexdigest()
+            name = f"{BLOB_DIR}/{digest[:2]}/{digest}{extension}"
+            path = self.path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            try:
+                # Atomic, and keeps the temporary file; fails if the blob is already stored.
+                os.link(temp_path, path)
+            except FileExistsError:
+                pass
+
+            self._add_reference(name, size)
+            if not os.path.exists(path):
+                # collect_garbage removed the blob between the link and the reference;
+                # the fresh referenced_at keeps it out of the next collections.
+                os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name
+
+    def _add_reference(self, name, size):
+        blobs = _blob_model().objects
+        now = timezone.now()
+        if blobs.filter(name=name).update(ref_count=F("ref_count") + 1, referenced_at=now):
+            return
+        try:
+            with transaction.atomic():
+                blobs.create(name=name, size=size, ref_count=1, referenced_at=now)
+        except IntegrityError:
+            blobs.filter(name=name).update(ref_count=F("ref_count") + 1, referenced_at=now)
+
+    def delete(self, name):
+        if not name or not name.startswith(f"{BLOB_DIR}/"):
+            # Files written before this storage was enabled are not shared.
+            return super().delete(name)
+        # Other rows may still use the blob; collect_garbage removes it once unreferenced.
+        _blob_model().objects.filter(name=name, ref_count__gt=0).update(ref_count=F("ref_count") - 1)
+
+
+def referencing_fields():
+    """(model, field name) for every file field stored in the evidence storage."""
+    storage = evidence_storage()
+    return [
+        (model, field.name)
+        for model in apps.get_app_config("core").get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField) and field.storage is storage
+    ]
+
+
+def recount_references():
+    """Set every blob's ref_count from the rows that point at it; return how many changed."""
+    counts = Counter()
+    for model, field_name in referencing_fields():
+        rows = (
+            model.objects.filter(**{f"{field_name}__startswith": f"{BLOB_DIR}/"})
+            .values_list(field_name)
+            .annotate(references=Count("pk"))
+            .order_by()
+        )
+        for name, references in rows:
+            counts[name] += references
+
+    Blob = _blob_model()
+    storage = evidence_storage()
+    changed = []
+    for blob in Blob.objects.only("name", "ref_count").iterator():
+        references = counts.pop(blob.name, 0)
+        if blob.ref_count != references:
+            blob.ref_count = references
+            changed.append(blob)
+    Blob.objects.bulk_update(changed, ["ref_count"], batch_size=500)
+
+    # Rows pointing at blobs the table does not know (e.g. restored from a backup).
+    missing = [
+        Blob(name=name, size=storage.size(name) if storage.exists(name) else 0, ref_count=references)
+        for name, references in counts.items()
+    ]
+    Blob.objects.bulk_create(missing, batch_size=500, ignore_conflicts=True)
+    return len(changed) + len(missing)
+
+
+def collect_garbage(min_age=DEFAULT_MIN_AGE, dry_run=False):
+    """Recount references, then delete blobs unreferenced for ``min_age``; return (blobs, bytes).
+
+    The grace period keeps blobs whose row is still being saved, and
+    leftover temporary uploads are only removed once they are as old.
+    With ``dry_run`` the recount is rolled back and nothing is deleted.
+    """
+    cutoff = timezone.now() - min_age
+    storage = evidence_storage()
+    Blob = _blob_model()
+
+    with transaction.atomic():
+        recount_references()
+        garbage = list(
+            Blob.objects.select_for_update()
+            .filter(ref_count=0, referenced_at__lt=cutoff)
+            .values_list("pk", "name", "size")
+        )
+        if dry_run:
+            transaction.set_rollback(True)
+        else:
+            Blob.objects.filter(pk__in=[pk for pk, _, _ in garbage]).delete()
+            # Before commit: an upload of the same bytes waits on these rows,
+            # then finds the file gone and restores it (see DeduplicatingStorage._save).
+            for _, name, _ in garbage:
+                if storage.exists(name):
+                    os.remove(storage.path(name))
+
+    if not dry_run:
+        blob_root = storage.path(BLOB_DIR)
+        if os.path.isdir(blob_root):
+            for entry in os.scandir(blob_root):
+                if entry.name.startswith(TEMP_PREFIX) and entry.stat().st_mtime < cutoff.timestamp():
+                    os.remove(entry.path)
+    return len(garbage), sum(size for _, _, size in garbage)
@@ -0,0 +1,28 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from core.images import derivative_url
+
+
+register = template.Library()
+
+
+@register.filter
+def thumbnail(field_file, preset="thumb"):
+    """``{{ user.profile_pic|thumbnail:"avatar" }}`` -> URL of the JPEG derivative."""
+    return derivative_url(field_file, preset)
+
+
+@register.simple_tag
+def picture(field_file, preset="thumb", **attrs):
+    """``{% picture activity.photo "thumb" alt="..." %}`` -> <picture> with a WebP source and JPEG fallback."""
+    if not field_file:
+        return ""
+    attrs.setdefault("loading", "lazy")
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}"><img src="{}"{}></picture>',
+        derivative_url(field_file, preset, "webp"),
+        derivative_url(field_file, preset),
+        flatatt(attrs),
+    )
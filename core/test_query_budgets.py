@@ -0,0 +1,550 @@
+"""
+Query-count regression checks for every named route in core/urls.py.
+
+Each role walks every route against a synthetic dataset at 10x and then
+100x scale. Every response must have the expected status: 200 for roles a
+view admits, the redirect to the role's home for roles it turns away, and
+the exceptions listed below. A view must issue the same number of queries
+at both scales and stay within its configured query budget; when it does
+not, the failure lists the SQL statements whose frequency grew with the
+data.
+
+Every photo and file field is filled, with one upload per field shared by
+all rows of a model, so pages render thumbnails and download links.
+"""
+
+import logging
+import re
+import shutil
+import tempfile
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from allauth.socialaccount.models import SocialApp
+from django.contrib.sites.models import Site
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from core import urls as core_urls
+from core.models import (
+    Activity,
+    AssessmentRating,
+    Chapter,
+    CustomUser,
+    DiaryEntry,
+    DomainIndicator,
+    EvidenceAttachment,
+    Location,
+    Mentee,
+    MenteeAssessment,
+    MenteeUploadLog,
+    MentorMenteeAssignment,
+    MoodCategory,
+    Notification,
+    ObjectiveItem,
+    ProfileArtifact,
+    Programme,
+    RatingDomain,
+    RatingScaleDefinition,
+    ReflectiveReport,
+    RepositoryAsset,
+    School,
+    SessionType,
+    StatusConfig,
+    UserRole,
+    VolunteerReportingAssignment,
+    VolunteerTranscript,
+    WorkSchedule,
+    WorkScheduleAssignment,
+    YearPlanItem,
+)
+from core.assignments import rebuild_current_assignments
+from core.perf import query_budget_for
+from core.roles import role_home_url_name
+
+
+SCALES = (10, 100)
+
+# Views whose query count still grows with row count, with the reason. Add an
+# entry only for growth that is inherent to the view, and remove it once the
+# view is fixed so the harness starts guarding it.
+KNOWN_QUERY_SCALING = {}
+
+# Routes that only accept POST answer a GET from an admitted role with 405.
+POST_ONLY_ROUTES = {
+    "add_remark",
+    "admin_config_import",
+    "admin_config_inline_edit",
+    "admin_notification_delete",
+    "apply_endorser_assignments",
+    "generate_transcript",
+    "review_reflective_report",
+    "review_transcript",
+    "review_work_diary",
+    "switch_role",
+    "toggle_repository_asset_status",
+    "update_user_roles",
+    "update_work_item_status",
+}
+
+# Any other status than 200 (or 405 above) for an admitted role, keyed by
+# route or by (route, role), with the reason.
+EXPECTED_STATUS = {
+    "add_user": (302, "form posts only; GET returns to manage_user"),
+    "bulk_upload_users": (302, "form posts only; GET returns to manage_user"),
+    "edit_user": (302, "form posts only; GET returns to manage_user"),
+    "admin_config_edit": (302, "form posts only; GET returns to the config list"),
+    "new_activity": (302, "form posts only; GET returns to dip_yclp"),
+    "delete_user": (302, "deletes on GET, then returns to manage_user"),
+    "role-redirect": (302, "sends every role to its home page"),
+    "endorser_profile": (302, "alias of the shared profile page"),
+    "endorser_edit_profile": (302, "alias of the shared profile edit page"),
+    "mentor_profile": (302, "alias of the shared profile page, or role-redirect"),
+    "admin_profile_detail": (404, "the dataset stores no request profiles"),
+    ("autocomplete", "endorser"): (302, "the mentors source is admin-only"),
+    ("work_schedule_assignees", "admin"): (404, "the dataset's work item belongs to the endorser"),
+}
+
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_STRING_RE = re.compile(r"'[^']*'")
+_IN_LIST_RE = re.compile(r"IN \((\?, )*\?\)")
+
+
+def _normalize_sql(sql):
+    return _IN_LIST_RE.sub("IN (?)", _NUMBER_RE.sub("?", _STRING_RE.sub("?", sql)))
+
+
+class SyntheticDataset:
+    """Role users plus per-unit rows that can be grown to a target scale."""
+
+    def __init__(self):
+        today = timezone.now().date()
+        self.today = today
+        self.units = 0
+
+        google = SocialApp.objects.create(provider="google", name="Google", client_id="budget", secret="budget")
+        google.sites.add(Site.objects.get_current())
+
+        self.admin = self._user("admin", is_staff=True)
+        self.endorser = self._user("endorser")
+        self.mentor = self._user("mentor", profile_pic=self._photo("mentor.png"))
+        self.mentee_user = self._user("mentee")
+        self.volunteer = self._user("volunteer", profile_pic=self._photo("volunteer.png"))
+
+        self.school = School.objects.create(name="Budget School")
+        self.location = Location.objects.create(name="Budget Location", code="BUD-LOC")
+        self.programme = Programme.objects.create(name="Budget Programme", code="BUD")
+        self.chapter = Chapter.objects.create(
+            name="Budget Chapter", school=self.school, location=self.location, leader=self.mentor
+        )
+        self.status = StatusConfig.objects.create(name="Budget Status", ordering=1)
+        self.session_type = SessionType.objects.create(name="Budget Session")
+        MoodCategory.objects.create(name="Budget Mood", sort_order=1)
+        self.domains = [
+            RatingDomain.objects.create(year=1, name=f"Budget Domain {index}", source="tracker", sort_order=index)
+            for index in range(1, 4)
+        ]
+        for domain in self.domains:
+            DomainIndicator.objects.create(domain=domain, description="Indicator", sort_order=1)
+            RatingScaleDefinition.objects.bulk_create(
+                RatingScaleDefinition(domain=domain, score=score, description=f"Score {score}")
+                for score in range(1, 6)
+            )
+        self.indicator = DomainIndicator.objects.filter(domain=self.domains[0]).first()
+
+        self.mentee = Mentee.objects.create(
+            user=self.mentee_user,
+            full_name="Budget Mentee",
+            current_year=1,
+            school=self.school,
+            chapter=self.chapter,
+            location=self.location,
+            programme_fk=self.programme,
+        )
+        MentorMenteeAssignment.objects.create(mentor=self.mentor, mentee=self.mentee, start_date=today)
+        self.endorser.mentors.add(self.mentor)
+        VolunteerReportingAssignment.objects.create(
+            volunteer=self.volunteer,
+            programme=self.programme,
+            location=self.location,
+            endorser=self.endorser,
+            assigned_by=self.admin,
+        )
+
+        self.objective = ObjectiveItem.objects.create(
+            mentee=self.mentee, objective_title="Objective", status=self.status, evidence=self._file("objective.pdf")
+        )
+        self.year_plan = YearPlanItem.objects.create(mentee=self.mentee, year=1, milestone="Milestone", status=self.status)
+        self.report = ReflectiveReport.objects.create(
+            user=self.volunteer,
+            programme=self.programme,
+            location=self.location,
+            activity_name="Report",
+            duration=Decimal("1.50"),
+            date=today,
+            status="Submitted",
+            photo=self._photo("report.png"),
+        )
+        self.diary = DiaryEntry.objects.create(
+            volunteer=self.volunteer,
+            date=today,
+            duration=Decimal("2.00"),
+            location=self.location,
+            narrative_entry="Diary",
+            review_status="Submitted",
+            evidence=self._file("diary.pdf"),
+        )
+        self.transcript = VolunteerTranscript.objects.create(
+            volunteer=self.volunteer,
+            template_choice="Volunteer Service Summary",
+            generated_summary="Summary",
+            approval_status="Pending Review",
+            export_file=self._file("transcript.pdf"),
+        )
+        self.activity = Activity.objects.create(
+            user=self.mentor, date=today, duration=Decimal("1.00"), activity="YCLP-Class", photo=self._photo("activity.png")
+        )
+        self.artifact = ProfileArtifact.objects.create(user=self.volunteer, title="Artifact", document=self._file("artifact.pdf"))
+        self.asset = RepositoryAsset.objects.create(
+            title="Asset", category="Guides", file_upload=self._file("asset.pdf"), uploaded_by=self.admin
+        )
+        self.notification = Notification.objects.create(message="Hello", target_group="all", created_by=self.admin)
+        schedule = WorkSchedule.objects.create(
+            endorser=self.endorser, role="Review", due_date=today, description="Work item"
+        )
+        schedule.mentors.add(self.mentor)
+        self.work_assignment = WorkScheduleAssignment.objects.create(work_schedule=schedule, assignee=self.mentor)
+
+    def _photo(self, name):
+        output = BytesIO()
+        Image.new("RGB", (400, 300), "teal").save(output, "PNG")
+        return SimpleUploadedFile(name, output.getvalue(), content_type="image/png")
+
+    def _file(self, name):
+        return SimpleUploadedFile(name, f"%PDF-1.4 {name}".encode(), content_type="application/pdf")
+
+    def _user(self, role, suffix="", **extra):
+        username = f"{role}{suffix}@budget.example.com"
+        return CustomUser.objects.create_user(
+            username=username,
+            email=username,
+            password=None,
+            first_name=role.title(),
+            last_name=suffix or "User",
+            role=role,
+            roles=[role],
+            **extra,
+        )
+
+    def disposable_user(self):
+        return self._user("volunteer", suffix=f"-disposable-{CustomUser.objects.count()}")
+
+    def _bulk_users(self, role, start, stop):
+        users = CustomUser.objects.bulk_create(
+            CustomUser(
+                username=f"{role}-{index}@budget.example.com",
+                email=f"{role}-{index}@budget.example.com",
+                password="!",
+                first_name=role.title(),
+                last_name=str(index),
+                role=role,
+                roles=[role],
+                profile_pic=self.mentor.profile_pic.name,
+                profile_pic_sha256=self.mentor.profile_pic_sha256,
+            )
+            for index in range(start, stop)
+        )
+        UserRole.objects.bulk_create(UserRole(user=user, role=role) for user in users)
+        return users
+
+    def grow_to(self, scale):
+        start, stop = self.units, scale
+        if stop <= start:
+            return
+        today = self.today
+        span = range(start, stop)
+
+        mentors = self._bulk_users("mentor", start, stop)
+        self._bulk_users("volunteer", start, stop)
+        self.endorser.mentors.add(*mentors)
+
+        mentees = Mentee.objects.bulk_create(
+            Mentee(full_name=f"Mentee {index}", current_year=1, school=self.school, chapter=self.chapter)
+            for index in span
+        )
+        MentorMenteeAssignment.objects.bulk_create(
+            MentorMenteeAssignment(mentor=self.mentor, mentee=mentee, start_date=today) for mentee in mentees
+        )
+        rebuild_current_assignments()
+
+        ObjectiveItem.objects.bulk_create(
+            ObjectiveItem(
+                mentee=self.mentee,
+                objective_title=f"Objective {index}",
+                status=self.status,
+                progress_percent=index % 101,
+                evidence=self.objective.evidence.name,
+            )
+            for index in span
+        )
+        YearPlanItem.objects.bulk_create(
+            YearPlanItem(mentee=self.mentee, year=1, milestone=f"Milestone {index}", status=self.status)
+            for index in span
+        )
+        assessments = MenteeAssessment.objects.bulk_create(
+            MenteeAssessment(
+                mentee=self.mentee,
+                mentor=self.mentor,
+                year=1,
+                session_type=self.session_type,
+                date=today - timedelta(days=index),
+            )
+            for index in span
+        )
+        AssessmentRating.objects.bulk_create(
+            AssessmentRating(assessment=assessment, domain=domain, value=(assessment.id % 5) + 1)
+            for assessment in assessments
+            for domain in self.domains
+        )
+        DomainIndicator.objects.bulk_create(
+            DomainIndicator(domain=self.domains[1], description=f"Indicator {index}", sort_order=index + 10)
+            for index in span
+        )
+
+        Activity.objects.bulk_create(
+            Activity(
+                user=user,
+                date=today - timedelta(days=index),
+                duration=Decimal("1.00"),
+                activity="YCLP-Class",
+                photo=self.activity.photo.name,
+                photo_sha256=self.activity.photo_sha256,
+            )
+            for index in span
+            for user in (self.mentor, self.volunteer)
+        )
+        reports = ReflectiveReport.objects.bulk_create(
+            ReflectiveReport(
+                user=self.volunteer,
+                programme=self.programme,
+                location=self.location,
+                activity_name=f"Report {index}",
+                duration=Decimal("1.00"),
+                date=today - timedelta(days=index),
+                status="Submitted",
+                photo=self.report.photo.name,
+                photo_sha256=self.report.photo_sha256,
+            )
+            for index in span
+        )
+        DiaryEntry.objects.bulk_create(
+            DiaryEntry(
+                volunteer=self.volunteer,
+                date=today - timedelta(days=index),
+                duration=Decimal("1.00"),
+                location=self.location,
+                narrative_entry=f"Diary {index}",
+                review_status="Submitted",
+                evidence=self.diary.evidence.name,
+            )
+            for index in span
+        )
+        VolunteerTranscript.objects.bulk_create(
+            VolunteerTranscript(
+                volunteer=self.volunteer,
+                template_choice="Volunteer Service Summary",
+                generated_summary=f"Summary {index}",
+                approval_status="Pending Review",
+                export_file=self.transcript.export_file.name,
+            )
+            for index in span
+        )
+        ProfileArtifact.objects.bulk_create(
+            ProfileArtifact(user=self.volunteer, title=f"Artifact {index}", document=self.artifact.document.name)
+            for index in span
+        )
+        assets = RepositoryAsset.objects.bulk_create(
+            RepositoryAsset(title=f"Asset {index}", category="Guides", file_upload=self.asset.file_upload.name, uploaded_by=self.admin)
+            for index in span
+        )
+        EvidenceAttachment.objects.bulk_create(
+            EvidenceAttachment(asset=asset, linked_model="ReflectiveReport", linked_id=report.id, uploaded_by=self.volunteer)
+            for asset, report in zip(assets, reports)
+        )
+        Notification.objects.bulk_create(
+            Notification(message=f"Notice {index}", target_group=("all", "mentor", "volunteer")[index % 3], created_by=self.admin)
+            for index in span
+        )
+        MenteeUploadLog.objects.bulk_create(
+            MenteeUploadLog(file_name=f"upload-{index}.csv", uploaded_by=self.admin, total_rows=10, success_count=10)
+            for index in span
+        )
+
+        schedules = WorkSchedule.objects.bulk_create(
+            WorkSchedule(endorser=creator, role=f"Task {index}", due_date=today, description="Work item")
+            for index in span
+            for creator in (self.endorser, self.admin)
+        )
+        WorkScheduleAssignment.objects.bulk_create(
+            WorkScheduleAssignment(work_schedule=schedule, assignee=self.mentor) for schedule in schedules
+        )
+        WorkSchedule.mentors.through.objects.bulk_create(
+            WorkSchedule.mentors.through(workschedule_id=schedule.id, customuser_id=self.mentor.id)
+            for schedule in schedules
+        )
+
+        self.units = stop
+
+    def route_kwargs(self):
+        return {
+            "mentee_id": lambda: self.mentee.id,
+            "objective_id": lambda: self.objective.id,
+            "year_plan_id": lambda: self.year_plan.id,
+            "asset_id": lambda: self.asset.id,
+            "transcript_id": lambda: self.transcript.id,
+            "report_id": lambda: self.report.id,
+            "diary_id": lambda: self.diary.id,
+            "user_id": lambda: self.volunteer.id,
+            "config_key": lambda: "domain-indicators",
+            "item_id": lambda: self.indicator.id,
+            "notification_id": lambda: self.notification.id,
+            "assignment_id": lambda: self.work_assignment.id,
+            "schedule_id": lambda: self.work_assignment.work_schedule_id,
+            "source": lambda: "mentors",
+            "mentor_id": lambda: self.mentor.id,
+            "name": lambda: "20260101T000000_missing_0ms_00000000.prof",
+        }
+
+    def route_overrides(self):
+        # Routes that mutate on GET get a fresh target for every request.
+        return {
+            "delete_user": {"user_id": lambda: self.disposable_user().id},
+        }
+
+    def route_query_params(self):
+        return {}
+
+
+def named_routes():
+    return [pattern for pattern in core_urls.urlpatterns if getattr(pattern, "name", None)]
+
+
+# The test client connects from 127.0.0.1; admit it so /metrics is measured.
+@override_settings(METRICS_ALLOWED_IPS=("127.0.0.1",))
+class RouteQueryBudgetTests(TestCase):
+    def setUp(self):
+        # Over-budget warnings are what the assertions below report.
+        budget_logger = logging.getLogger("core.middleware")
+        self.addCleanup(budget_logger.setLevel, budget_logger.level)
+        budget_logger.setLevel(logging.ERROR)
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.dataset = SyntheticDataset()
+
+    def _route_url(self, pattern):
+        kwargs_factories = dict(self.dataset.route_kwargs())
+        kwargs_factories.update(self.dataset.route_overrides().get(pattern.name, {}))
+        kwargs = {name: kwargs_factories[name]() for name in pattern.pattern.converters}
+        return reverse(pattern.name, kwargs=kwargs)
+
+    def _measure(self, pattern):
+        params = self.dataset.route_query_params().get(pattern.name, {})
+        # The first request warms per-process caches (content types, sites).
+        self.client.get(self._route_url(pattern), params)
+        url = self._route_url(pattern)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, params)
+        return response, [query["sql"] for query in captured.captured_queries]
+
+    def _expected_status(self, pattern, user):
+        """(status, redirect target or None) the route should answer ``user`` with."""
+        allowed_roles = getattr(pattern.callback, "allowed_roles", None)
+        if allowed_roles is not None and user.role not in allowed_roles:
+            # permission_denied_view sends signed-in users to their home page.
+            return 302, reverse(role_home_url_name(user.role))
+        override = EXPECTED_STATUS.get((pattern.name, user.role), EXPECTED_STATUS.get(pattern.name))
+        if override is not None:
+            return override[0], None
+        if pattern.name in POST_ONLY_ROUTES:
+            return 405, None
+        return 200, None
+
+    def _walk(self, user):
+        self.client.force_login(user)
+        measurements = {}
+        for scale in SCALES:
+            self.dataset.grow_to(scale)
+            for pattern in named_routes():
+                measurements.setdefault(pattern.name, []).append(self._measure(pattern))
+        return measurements
+
+    def _scaling_message(self, url_name, small, large):
+        small_counts = Counter(_normalize_sql(sql) for sql in small)
+        large_counts = Counter(_normalize_sql(sql) for sql in large)
+        grown = [
+            (large_counts[sql] - small_counts.get(sql, 0), sql)
+            for sql in large_counts
+            if large_counts[sql] > small_counts.get(sql, 0)
+        ]
+        grown.sort(reverse=True)
+        lines = [
+            f"{url_name} issued {len(small)} queries at {SCALES[0]}x and {len(large)} at {SCALES[1]}x data.",
+            "Statements that grew with row count:",
+        ]
+        lines.extend(f"  +{delta}: {sql[:400]}" for delta, sql in grown[:5])
+        return "\n".join(lines)
+
+    def _assert_routes_constant(self, user):
+        measurements = self._walk(user)
+        patterns = {pattern.name: pattern for pattern in named_routes()}
+        for url_name, ((small_response, small), (response, large)) in measurements.items():
+            with self.subTest(role=user.role, url_name=url_name):
+                status, location = self._expected_status(patterns[url_name], user)
+                for measured in (small_response, response):
+                    self.assertEqual(measured.status_code, status, f"{url_name} answered {user.role} with {measured.status_code}")
+                    if location is not None:
+                        self.assertEqual(measured["Location"], location)
+                if url_name in KNOWN_QUERY_SCALING:
+                    continue
+                self.assertEqual(len(small), len(large), self._scaling_message(url_name, small, large))
+                budget = query_budget_for(url_name)
+                if budget is not None:
+                    self.assertLessEqual(
+                        len(large),
+                        budget,
+                        f"{url_name} issued {len(large)} queries (budget {budget}):\n" + "\n".join(large),
+                    )
+
+    def test_admin_routes_have_constant_query_counts(self):
+        self._assert_routes_constant(self.dataset.admin)
+
+    def test_endorser_routes_have_constant_query_counts(self):
+        self._assert_routes_constant(self.dataset.endorser)
+
+    def test_mentor_routes_have_constant_query_counts(self):
+        self._assert_routes_constant(self.dataset.mentor)
+
+    def test_mentee_routes_have_constant_query_counts(self):
+        self._assert_routes_constant(self.dataset.mentee_user)
+
+    def test_volunteer_routes_have_constant_query_counts(self):
+        self._assert_routes_constant(self.dataset.volunteer)
+
+    def test_pages_render_photo_derivatives(self):
+        self.dataset.grow_to(SCALES[0])
+        self.client.force_login(self.dataset.mentor)
+
+        response = self.client.get(reverse("my-activities"))
+
+        self.assertContains(response, f"derivatives/{self.dataset.activity.photo_sha256[:2]}/")
+        self.assertContains(response, 'type="image/webp"')
@@ -1,14 +1,49 @@
 import csv
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
 from io import BytesIO, StringIO
+from unittest.mock import patch
 from datetime import timedelta
 
 import openpyxl
+from PIL import Image
+from django.conf import settings
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.core.management import CommandError, call_command
+from asgiref.sync import async_to_sync
+from django.db import IntegrityError, connection, transaction
+from django.template import Context, Template
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import resolve, reverse
 from django.utils import timezone
 
-from .forms import DiaryEntryForm, MenteeAssessmentForm, ReflectiveReportForm
+from .analytics import cohort_analytics
+from .autocomplete import search
+from .concurrency import gather_reads
+from .config_data import SNAPSHOT_MODELS
+from .images import derivative_url
+from .management.commands.benchmark import Command as BenchmarkCommand
+from .metrics import QUEUE_SNAPSHOT_CACHE_KEY, RequestMetrics, queue_snapshot, request_metrics
+from .perf import QueryRecorder, RequestTimer, query_stats
+from .profiling import list_profiles, make_profile_token
+from .storage import DeduplicatingStorage, collect_garbage
+from .identity import RequestIdentity
+from .portfolio import GENERATION_CACHE_KEY as PORTFOLIO_GENERATION_CACHE_KEY, mentor_portfolio
+from .views.admin import CONFIG_REGISTRY
+from .forms import (
+    DiaryEntryForm,
+    MenteeAssessmentForm,
+    ReferenceContentForm,
+    ReflectiveReportForm,
+    VolunteerReportingAssignmentForm,
+)
 from .models import (
     Activity,
     AssessmentRating,
@@ -22,12 +57,14 @@ from .models import (
     RatingDomain,
     RatingScaleDefinition,
     SessionType,
+    TemplateConfig,
     ReflectiveReport,
     DiaryEntry,
     WorkSchedule,
     WorkScheduleAssignment,
     VolunteerTranscript,
     ProfileArtifact,
+    StoredBlob,
     RepositoryAsset,
     EvidenceAttachment,
     Programme,
@@ -35,9 +72,28 @@ from .models import (
     AcademicCycle,
     Notification,
     VolunteerReportingAssignment,
+    MenteeUploadLog,
+    UserRole,
+    CurrentMentorAssignment,
+    ObjectiveItem,
+    StatusConfig,
+    YearPlanItem,
+    School,
+    Chapter,
+    ReferenceContent,
 )
 
 
+def app_queries(captured):
+    """SQL in ``captured`` other than the shared cache table's reads, writes and savepoints."""
+    cache_table = settings.CACHES["default"].get("LOCATION") or "\0"
+    return [
+        query["sql"]
+        for query in captured.captured_queries
+        if cache_table not in query["sql"] and "SAVEPOINT" not in query["sql"]
+    ]
+
+
 class AdminConfigViewTests(TestCase):
     def setUp(self):
         self.admin_user = CustomUser.objects.create_user(
@@ -55,6 +111,54 @@ class AdminConfigViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Rating Scales")
 
+    def _chapters(self, school, count):
+        Chapter.objects.bulk_create(Chapter(name=f"Chapter {school.name} {index}", school=school) for index in range(count))
+
+    def _list_queries(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse("admin_config_list", args=["chapters"]))
+        self.assertEqual(response.status_code, 200)
+        return len(captured)
+
+    def test_config_list_queries_do_not_grow_with_rows(self):
+        self.client.force_login(self.admin_user)
+        self._chapters(School.objects.create(name="Few"), 2)
+        self._list_queries()
+
+        few = self._list_queries()
+        self._chapters(School.objects.create(name="Many"), 30)
+        many = self._list_queries()
+
+        self.assertEqual(few, many)
+
+    def test_config_list_serializes_rows_for_the_shared_edit_form(self):
+        self.client.force_login(self.admin_user)
+        school = School.objects.create(name="Serialized")
+        self._chapters(school, 1)
+
+        response = self.client.get(reverse("admin_config_list", args=["chapters"]))
+
+        row = response.context["rows"][0]
+        self.assertEqual(row["fields"]["school"], school.id)
+        self.assertEqual(row["fields"]["is_active"], True)
+        self.assertEqual(response.content.decode().count('id="configEditForm"'), 1)
+
+    def test_inline_edit_returns_updated_row_or_errors(self):
+        self.client.force_login(self.admin_user)
+        school = School.objects.create(name="Inline")
+        self._chapters(school, 1)
+        chapter = Chapter.objects.get(school=school)
+        url = reverse("admin_config_inline_edit", args=["chapters", chapter.id])
+
+        saved = self.client.post(url, {"name": "Renamed", "school": school.id, "is_active": "on"})
+        rejected = self.client.post(url, {"name": "", "school": school.id})
+
+        self.assertEqual(saved.json()["row"]["label"], "Renamed - Inline")
+        self.assertEqual(rejected.status_code, 400)
+        self.assertIn("name", rejected.json()["errors"])
+        chapter.refresh_from_db()
+        self.assertEqual(chapter.name, "Renamed")
+
 
 class PermissionDeniedRedirectTests(TestCase):
     def setUp(self):
@@ -273,6 +377,11 @@ class RoleSwitchTests(TestCase):
 
 class WorkspaceWorkflowTests(TestCase):
     def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
         self.admin_user = CustomUser.objects.create_user(
             username="workspace-admin@example.com",
             email="workspace-admin@example.com",
@@ -1026,6 +1135,23 @@ class MentorAssessmentViewTests(TestCase):
         self.assertContains(response, "Participates consistently")
         self.assertContains(response, "Excellent leadership")
 
+    def test_assessment_is_saved_only_with_every_rating(self):
+        session_type = SessionType.objects.create(name="Check-in")
+        ratings = {f"rating_{domain.id}": "4" for domain in RatingDomain.objects.filter(year=1, is_active=True)}
+        payload = {"year": 1, "session_type": session_type.id, "date": timezone.now().date().isoformat(), **ratings}
+        url = reverse("mentor_assessment_create", args=[self.mentee.id])
+        self.client.force_login(self.mentor)
+
+        incomplete = self.client.post(url, {**payload, f"rating_{self.domain.id}": ""})
+        self.assertFalse(MenteeAssessment.objects.exists())
+        response = self.client.post(url, payload)
+
+        self.assertContains(incomplete, "Please provide ratings for all domains.")
+        self.assertRedirects(response, reverse("mentor_assessment_list", args=[self.mentee.id]))
+        assessment = MenteeAssessment.objects.get()
+        self.assertEqual(assessment.mentor, self.mentor)
+        self.assertEqual(assessment.ratings.count(), len(ratings))
+
 
 class ProgressExportTests(TestCase):
     def setUp(self):
@@ -1238,3 +1364,1632 @@ class SRSModelsTests(TestCase):
         )
         self.assertEqual(EvidenceAttachment.objects.count(), 1)
 
+
+class QueryBudgetMiddlewareTests(TestCase):
+    def setUp(self):
+        query_stats.reset()
+        self.admin_user = CustomUser.objects.create_user(
+            username="admin-queries@example.com",
+            email="admin-queries@example.com",
+            password="testpass123",
+            role="admin",
+        )
+        self.mentor = CustomUser.objects.create_user(
+            username="mentor-queries@example.com",
+            email="mentor-queries@example.com",
+            password="testpass123",
+            role="mentor",
+        )
+
+    def tearDown(self):
+        query_stats.reset()
+
+    def test_requests_are_aggregated_per_url_name(self):
+        self.client.force_login(self.admin_user)
+
+        self.client.get(reverse("admin_dashboard"))
+        self.client.get(reverse("admin_dashboard"))
+
+        rows = {row["url_name"]: row for row in query_stats.snapshot()}
+        self.assertEqual(rows["admin_dashboard"]["samples"], 2)
+        self.assertGreater(rows["admin_dashboard"]["max_queries"], 0)
+
+    @override_settings(QUERY_BUDGETS={"admin_dashboard": 1})
+    def test_budget_overrun_is_logged_and_reported(self):
+        self.client.force_login(self.admin_user)
+
+        with self.assertLogs("core.middleware", level="WARNING") as logs:
+            self.client.get(reverse("admin_dashboard"))
+        response = self.client.get(reverse("admin_query_report"))
+
+        self.assertIn("admin_dashboard", logs.output[0])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "admin_dashboard")
+        self.assertEqual(response.context["over_budget_views"], 1)
+
+    def test_query_report_is_admin_only(self):
+        self.client.force_login(self.mentor)
+
+        response = self.client.get(reverse("admin_query_report"))
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_admin_can_reset_query_report(self):
+        self.client.force_login(self.admin_user)
+        self.client.get(reverse("admin_dashboard"))
+
+        response = self.client.post(reverse("admin_query_report"))
+
+        self.assertRedirects(response, reverse("admin_query_report"), fetch_redirect_response=False)
+        self.assertEqual([row["url_name"] for row in query_stats.snapshot()], ["admin_query_report"])
+
+
+class GenerateLoadDataCommandTests(TestCase):
+    def setUp(self):
+        call_command("seed_config_data", stdout=StringIO())
+
+    def _generate(self, **options):
+        call_command("generate_load_data", scale=1, batch_size=500, stdout=StringIO(), **options)
+        return list(MenteeAssessment.objects.order_by("id").values_list("date", "ratings__value")[:50])
+
+    def test_creates_every_role_with_working_password(self):
+        self._generate(password="load-pass")
+
+        for role in ("admin", "endorser", "mentor", "volunteer", "mentee"):
+            self.assertTrue(CustomUser.objects.filter(role=role, username__endswith="@load.example.com").exists())
+        self.assertEqual(Mentee.objects.count(), MentorMenteeAssignment.objects.count())
+        self.assertTrue(AssessmentRating.objects.exists())
+        self.assertTrue(CustomUser.objects.get(username="mentor-0@load.example.com").check_password("load-pass"))
+
+    def test_same_seed_is_deterministic_and_rerun_requires_flush(self):
+        first = self._generate()
+
+        with self.assertRaises(CommandError):
+            self._generate()
+        second = self._generate(flush=True)
+
+        self.assertEqual(first, second)
+
+
+class BenchmarkCommandTests(TestCase):
+    def setUp(self):
+        call_command("seed_config_data", stdout=StringIO())
+        call_command("generate_load_data", scale=1, stdout=StringIO())
+
+    def test_writes_per_step_latency_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "bench.json")
+
+            call_command("benchmark", iterations=2, warmup=0, output=output, stdout=StringIO())
+
+            with open(output, encoding="utf-8") as handle:
+                report = json.load(handle)
+
+        steps = {(row["journey"], row["step"]): row for row in report["steps"]}
+        self.assertEqual(len(steps), 8)
+        self.assertIn(("reviewer", "approve_diary"), steps)
+        for row in steps.values():
+            self.assertEqual(row["requests"], 2)
+            self.assertEqual(row["errors"], 0)
+            self.assertGreater(row["queries"]["max"], 0)
+            self.assertIn("p99", row["latency_ms"])
+            self.assertIsNone(row["peak_alloc_kb"])
+
+    def test_unexpected_responses_and_exhausted_queues_count_as_errors(self):
+        submitted = DiaryEntry.objects.filter(review_status="Submitted").count()
+        prepare = BenchmarkCommand._prepare
+
+        def prepare_then_revoke_mentors(command, *args):
+            prepare(command, *args)
+            # Mentors lose their mentees, so their pages redirect home with a 302.
+            MentorMenteeAssignment.objects.all().delete()
+
+        with tempfile.TemporaryDirectory() as directory, patch.object(
+            BenchmarkCommand, "_prepare", prepare_then_revoke_mentors
+        ):
+            output = os.path.join(directory, "bench.json")
+
+            call_command(
+                "benchmark", iterations=submitted + 2, warmup=0, journeys="reviewer,mentor", output=output, stdout=StringIO()
+            )
+
+            with open(output, encoding="utf-8") as handle:
+                report = json.load(handle)
+
+        steps = {row["step"]: row for row in report["steps"]}
+        self.assertEqual(steps["approve_diary"]["requests"] + steps["approve_diary"]["errors"], submitted + 2)
+        self.assertEqual(steps["approve_diary"]["errors"], 2)
+        self.assertFalse(DiaryEntry.objects.filter(review_status="Submitted").exists())
+        self.assertEqual(steps["create_assessment"]["errors"], submitted + 2)
+
+    def test_trace_memory_records_each_steps_peak_allocation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "bench.json")
+
+            with self.assertRaises(CommandError):
+                call_command("benchmark", iterations=1, concurrency=2, trace_memory=True, output=output, stdout=StringIO())
+            call_command("benchmark", iterations=1, warmup=0, journeys="admin", trace_memory=True, output=output, stdout=StringIO())
+
+            with open(output, encoding="utf-8") as handle:
+                report = json.load(handle)
+
+        self.assertTrue(report["trace_memory"])
+        peaks = {row["step"]: row["peak_alloc_kb"] for row in report["steps"]}
+        self.assertEqual(set(peaks), {"dashboard", "export_work_diaries"})
+        self.assertTrue(all(peak > 0 for peak in peaks.values()))
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir, ignore_errors=True)
+        self.admin = CustomUser.objects.create_user(
+            username="profiling-admin@example.com",
+            email="profiling-admin@example.com",
+            password="testpass123",
+            role="admin",
+            roles=["admin"],
+        )
+        self.client.force_login(self.admin)
+
+    def _settings(self, **overrides):
+        values = {"PROFILING_ENABLED": True, "PROFILING_SAMPLE_RATE": 0.0, "PROFILING_DIR": self.profile_dir}
+        values.update(overrides)
+        return override_settings(**values)
+
+    def test_signed_header_profiles_request(self):
+        with self._settings():
+            self.client.get(reverse("admin_dashboard"), HTTP_X_PROFILE=make_profile_token(self.admin))
+
+            profiles = list_profiles()
+
+        self.assertEqual(len(profiles), 1)
+        self.assertEqual(profiles[0]["url_name"], "admin_dashboard")
+        self.assertTrue(profiles[0]["name"].endswith(".prof"))
+
+    def test_unsigned_or_tampered_requests_are_not_profiled(self):
+        with self._settings():
+            self.client.get(reverse("admin_dashboard"))
+            self.client.get(reverse("admin_dashboard"), HTTP_X_PROFILE="1:forged:token")
+
+            self.assertEqual(list_profiles(), [])
+
+    def test_sample_rate_profiles_requests_without_header(self):
+        with self._settings(PROFILING_SAMPLE_RATE=1.0):
+            self.client.get(reverse("admin_dashboard"))
+
+            self.assertEqual(len(list_profiles()), 1)
+
+    def test_admin_pages_list_and_render_profiles(self):
+        with self._settings(PROFILING_SAMPLE_RATE=1.0):
+            self.client.get(reverse("admin_dashboard"))
+        with self._settings():
+            name = list_profiles()[0]["name"]
+
+            list_response = self.client.get(reverse("admin_profile_list"))
+            detail_response = self.client.get(reverse("admin_profile_detail", args=[name]))
+            missing_response = self.client.get(reverse("admin_profile_detail", args=["..settings.py"]))
+
+        self.assertContains(list_response, name)
+        self.assertContains(detail_response, "function calls")
+        self.assertEqual(missing_response.status_code, 404)
+
+    def test_retention_removes_expired_profiles(self):
+        with self._settings(PROFILING_SAMPLE_RATE=1.0):
+            self.client.get(reverse("admin_dashboard"))
+        with self._settings(PROFILING_RETENTION_DAYS=1):
+            expired = os.path.join(self.profile_dir, list_profiles()[0]["name"])
+            old = time.time() - 3 * 24 * 60 * 60
+            os.utime(expired, (old, old))
+
+            response = self.client.post(reverse("admin_profile_list"), {"action": "cleanup"})
+
+            self.assertRedirects(response, reverse("admin_profile_list"))
+            self.assertEqual(list_profiles(), [])
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            username="timing-admin@example.com",
+            email="timing-admin@example.com",
+            password="testpass123",
+            role="admin",
+            roles=["admin"],
+        )
+        self.client.force_login(self.admin)
+
+    def _phases(self, response):
+        return {part.strip().split(";")[0] for part in response["Server-Timing"].split(",")}
+
+    def test_dashboard_reports_request_phases(self):
+        with self.assertLogs("core.timing", "INFO") as logs:
+            response = self.client.get(reverse("admin_dashboard"))
+
+        self.assertTrue({"mw", "view", "sql", "tpl", "ctx", "total"} <= self._phases(response))
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(entry["url_name"], "admin_dashboard")
+        self.assertEqual(entry["role"], "admin")
+        self.assertEqual(entry["status"], 200)
+        self.assertGreater(entry["queries"], 0)
+        self.assertIn("tpl", entry["phases_ms"])
+
+    def test_export_reports_serialization_phase(self):
+        response = self.client.get(reverse("export_work_diaries"))
+
+        self.assertIn("export", self._phases(response))
+        self.assertNotIn("tpl", self._phases(response))
+
+    def test_csv_export_times_only_the_write(self):
+        mentee = Mentee.objects.create(full_name="Timed Mentee", current_year=1)
+        phases = []
+        original = RequestTimer.phase
+
+        def record_queries(timer, name):
+            phases.append((name, len(connection.queries)))
+            return original(timer, name)
+
+        with self.settings(DEBUG=True), patch.object(RequestTimer, "phase", record_queries):
+            response = self.client.get(reverse("export_mentee_progress", args=[mentee.id]))
+            rendered = response.content.decode()
+
+        self.assertIn("export", self._phases(response))
+        self.assertIn("Objectives", rendered)
+        export_started = dict(phases)["export"]
+        # Every query ran before serialization started.
+        self.assertEqual(export_started, len(connection.queries))
+
+    @override_settings(SERVER_TIMING_ENABLED=False)
+    def test_disabled_setting_omits_header(self):
+        response = self.client.get(reverse("admin_dashboard"))
+
+        self.assertNotIn("Server-Timing", response)
+
+
+@override_settings(METRICS_TOKEN="scrape-token")
+class MetricsEndpointTests(TestCase):
+    def setUp(self):
+        request_metrics.reset()
+        cache.delete(QUEUE_SNAPSHOT_CACHE_KEY)
+        self.admin = CustomUser.objects.create_user(
+            username="metrics-admin@example.com",
+            email="metrics-admin@example.com",
+            password="testpass123",
+            role="admin",
+            roles=["admin"],
+        )
+        self.volunteer = CustomUser.objects.create_user(
+            username="metrics-volunteer@example.com",
+            email="metrics-volunteer@example.com",
+            password="testpass123",
+            role="volunteer",
+            roles=["volunteer"],
+        )
+
+    def _submit_diary(self):
+        return DiaryEntry.objects.create(
+            volunteer=self.volunteer,
+            date=timezone.now().date(),
+            duration=1,
+            narrative_entry="Queued",
+            review_status="Submitted",
+        )
+
+    def _scrape(self):
+        return self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-token").content.decode()
+
+    def test_reports_request_latency_queries_and_exports(self):
+        self.client.force_login(self.admin)
+        self.client.get(reverse("admin_dashboard"))
+        self.client.get(reverse("export_work_diaries"))
+
+        body = self._scrape()
+
+        self.assertIn('lud_request_duration_seconds_count{url_name="admin_dashboard"} 1', body)
+        self.assertIn('lud_requests_total{url_name="admin_dashboard",status="200"} 1', body)
+        self.assertIn('lud_db_queries_total{url_name="admin_dashboard"}', body)
+        self.assertIn('lud_export_duration_seconds_count{url_name="export_work_diaries"} 1', body)
+
+    def test_scrape_sums_every_workers_totals(self):
+        other_worker = RequestMetrics(worker="other-host:1")
+        other_worker.observe_request("admin_dashboard", 200, 0.02, 5)
+        other_worker.flush()
+        self.client.force_login(self.admin)
+        self.client.get(reverse("admin_dashboard"))
+
+        body = self._scrape()
+
+        self.assertIn('lud_request_duration_seconds_count{url_name="admin_dashboard"} 2', body)
+        self.assertIn('lud_requests_total{url_name="admin_dashboard",status="200"} 2', body)
+
+    @override_settings(METRICS_FLUSH_SECONDS=0)
+    def test_due_flush_runs_off_the_request_connection(self):
+        worker = RequestMetrics(worker="other-host:1")
+        with patch.object(RequestMetrics, "_flush_in_background") as flush_in_background:
+            with CaptureQueriesContext(connection) as captured:
+                worker.observe_request("admin_dashboard", 200, 0.02, 5)
+                for thread in threading.enumerate():
+                    if thread.name == "metrics-flush":
+                        thread.join()
+
+        self.assertEqual(flush_in_background.call_count, 1)
+        self.assertEqual(len(captured), 0)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_per_process_cache_reports_only_this_worker(self):
+        other_worker = RequestMetrics(worker="other-host:1")
+        other_worker.observe_request("admin_dashboard", 200, 0.02, 5)
+        other_worker.flush()
+
+        self.assertNotIn('url_name="admin_dashboard"', self._scrape())
+
+    def test_queue_depths_come_from_cached_snapshot(self):
+        self._submit_diary()
+        MenteeUploadLog.objects.create(file_name="mentees.csv", uploaded_by=self.admin, total_rows=5, success_count=4, error_count=1)
+
+        missing = self._scrape()
+        call_command("refresh_metrics", stdout=StringIO())
+        first = self._scrape()
+        self._submit_diary()
+        with CaptureQueriesContext(connection) as captured:
+            cached = self._scrape()
+        queue_snapshot.refresh()
+        refreshed = self._scrape()
+
+        self.assertIn("lud_queue_snapshot_present 0", missing)
+        self.assertNotIn("lud_review_queue_depth{", missing)
+        self.assertIn("lud_queue_snapshot_present 1", first)
+        self.assertFalse(any("core_diaryentry" in query["sql"] for query in captured.captured_queries))
+        self.assertIn('lud_review_queue_depth{queue="diaries",approver="reviewer"} 1', first)
+        self.assertIn('lud_mentee_import_rows_total{result="error"} 1', first)
+        self.assertIn('lud_review_queue_depth{queue="diaries",approver="reviewer"} 1', cached)
+        self.assertIn('lud_review_queue_depth{queue="diaries",approver="reviewer"} 2', refreshed)
+
+    def test_endpoint_needs_the_token_or_an_allowed_address(self):
+        url = reverse("metrics")
+
+        local = self.client.get(url, REMOTE_ADDR="127.0.0.1")
+        wrong = self.client.get(url, HTTP_AUTHORIZATION="Bearer other-token")
+        with self.settings(METRICS_ALLOWED_IPS=("192.0.2.10",)):
+            allowed = self.client.get(url, REMOTE_ADDR="192.0.2.10")
+
+        self.assertEqual((local.status_code, wrong.status_code), (404, 404))
+        self.assertEqual(allowed.status_code, 200)
+
+
+class AsyncDashboardTests(TestCase):
+    def setUp(self):
+        self.volunteer = CustomUser.objects.create_user(
+            username="async-volunteer@example.com",
+            email="async-volunteer@example.com",
+            password="testpass123",
+            role="volunteer",
+            roles=["volunteer"],
+        )
+
+    def test_dashboard_counts_render_from_async_view(self):
+        DiaryEntry.objects.create(
+            volunteer=self.volunteer,
+            date=timezone.now().date(),
+            duration=2,
+            narrative_entry="Async diary",
+            review_status="Submitted",
+        )
+        self.client.force_login(self.volunteer)
+
+        response = self.client.get(reverse("volunteer_dashboard"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["diary_count"], 1)
+        self.assertEqual(response.context["submitted_diary_count"], 1)
+        self.assertEqual([diary.narrative_entry for diary in response.context["recent_diaries"]], ["Async diary"])
+
+    def test_reads_run_sequentially_inside_a_transaction(self):
+        with override_settings(DASHBOARD_CONCURRENT_READS=True):
+            results = async_to_sync(gather_reads)(volunteers=CustomUser.objects.filter(role="volunteer").count)
+
+        self.assertEqual(results, {"volunteers": 1})
+
+
+@override_settings(DASHBOARD_CONCURRENT_READS=True)
+class ConcurrentDashboardReadTests(TransactionTestCase):
+    serialized_rollback = True
+
+    def test_reads_fan_out_to_worker_threads(self):
+        CustomUser.objects.create_user(username="fan-out@example.com", password="testpass123", role="mentor")
+
+        results = async_to_sync(gather_reads)(
+            mentors=CustomUser.objects.filter(role="mentor").count,
+            thread=lambda: threading.current_thread().name,
+        )
+
+        self.assertEqual(results["mentors"], 1)
+        self.assertTrue(results["thread"].startswith("dashboard-read"))
+
+    def test_worker_queries_reach_the_requests_recorders(self):
+        recorder = QueryRecorder(keep_sql=True)
+
+        with connection.execute_wrapper(recorder):
+            async_to_sync(gather_reads)(
+                mentors=CustomUser.objects.filter(role="mentor").count,
+                endorsers=CustomUser.objects.filter(role="endorser").count,
+            )
+
+        self.assertEqual(recorder.count, 2)
+        self.assertTrue(all("COUNT(*)" in sql for sql in recorder.statements))
+
+    def test_admin_dashboard_renders_with_concurrent_reads(self):
+        admin = CustomUser.objects.create_user(
+            username="fan-out-admin@example.com", password="testpass123", role="admin", roles=["admin"]
+        )
+        CustomUser.objects.create_user(username="fan-out-endorser@example.com", password="testpass123", role="endorser")
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse("admin_dashboard"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["total_endorsers"], 1)
+        self.assertEqual(response.context["unassigned_endorsers"], 1)
+
+
+class RequestIdentityTests(TestCase):
+    def setUp(self):
+        self.mentor = CustomUser.objects.create_user(
+            username="identity-mentor@example.com",
+            email="identity-mentor@example.com",
+            password="testpass123",
+            role="mentor",
+            roles=["mentor", "volunteer"],
+        )
+        self.mentee = Mentee.objects.create(full_name="Identity Mentee", current_year=1)
+        self.other_mentee = Mentee.objects.create(full_name="Other Mentee", current_year=1)
+        MentorMenteeAssignment.objects.create(
+            mentor=self.mentor,
+            mentee=self.mentee,
+            start_date=timezone.now().date(),
+            is_active=True,
+        )
+
+    def test_roles_and_mentee_access_resolve_once(self):
+        identity = RequestIdentity(self.mentor)
+
+        with CaptureQueriesContext(connection) as captured:
+            allowed = identity.can_access_mentee(self.mentee)
+            denied = identity.can_access_mentee(self.other_mentee)
+
+        self.assertEqual(len(app_queries(captured)), 1)
+        self.assertTrue(allowed)
+        self.assertFalse(denied)
+        self.assertEqual(identity.roles, {"mentor", "volunteer"})
+        self.assertTrue(identity.has_any_role(["volunteer"]))
+        self.assertFalse(identity.has_any_role(["admin"]))
+
+    def test_missing_mentee_profile_is_looked_up_once(self):
+        identity = RequestIdentity(self.mentor)
+
+        with self.assertNumQueries(1):
+            self.assertIsNone(identity.mentee)
+            self.assertIsNone(self.mentor.mentee_profile_safe)
+
+    def test_views_and_context_processor_share_request_identity(self):
+        self.client.force_login(self.mentor)
+
+        response = self.client.get(reverse("mentor_objective_list", args=[self.mentee.id]))
+
+        identity = response.wsgi_request.identity
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["base_template"], identity.layout["base_template"])
+        self.assertIn(self.mentee.id, identity.accessible_mentee_ids)
+
+
+class UserRoleMembershipTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username="multi-role@example.com",
+            email="multi-role@example.com",
+            password="testpass123",
+            role="mentor",
+            roles=["mentor", "volunteer"],
+        )
+
+    def memberships(self):
+        return set(UserRole.objects.filter(user=self.user).values_list("role", flat=True))
+
+    def test_save_keeps_memberships_in_sync_with_roles(self):
+        self.assertEqual(self.memberships(), {"mentor", "volunteer"})
+
+        self.user.roles = ["mentor", "endorser"]
+        self.user.save()
+
+        self.assertEqual(self.memberships(), {"mentor", "endorser"})
+
+    def test_partial_save_syncs_roles_it_adds(self):
+        self.user.is_superuser = True
+        self.user.save(update_fields=["is_superuser"])
+
+        self.user.refresh_from_db()
+        self.assertIn("admin", self.user.roles)
+        self.assertEqual(self.memberships(), {"mentor", "volunteer", "admin"})
+
+    def test_role_filters_include_additional_roles(self):
+        volunteers = CustomUser.objects.with_role("volunteer")
+        form = VolunteerReportingAssignmentForm()
+
+        self.assertIn(self.user, volunteers)
+        self.assertNotIn(self.user, CustomUser.objects.with_role("endorser"))
+        self.assertIn(self.user, form.fields["volunteer"].queryset)
+
+
+@override_settings(MENTEE_ACCESS_CACHE_ENABLED=True)
+class MenteeAccessCacheTests(TestCase):
+    def setUp(self):
+        self.mentor = CustomUser.objects.create_user(
+            username="access-mentor@example.com",
+            email="access-mentor@example.com",
+            password="testpass123",
+            role="mentor",
+        )
+        self.mentee = Mentee.objects.create(full_name="Cached Mentee", current_year=1)
+        self.assignment = MentorMenteeAssignment.objects.create(
+            mentor=self.mentor,
+            mentee=self.mentee,
+            start_date=timezone.now().date(),
+            is_active=True,
+        )
+
+    def test_mentee_ids_are_reused_across_requests(self):
+        first = RequestIdentity(self.mentor).accessible_mentee_ids
+
+        with CaptureQueriesContext(connection) as captured:
+            second = RequestIdentity(self.mentor).accessible_mentee_ids
+
+        self.assertEqual(app_queries(captured), [])
+        self.assertEqual(first, {self.mentee.id})
+        self.assertEqual(second, first)
+
+    def test_assignment_changes_invalidate_cached_access(self):
+        other = Mentee.objects.create(full_name="Newly Assigned", current_year=1)
+        self.assertEqual(RequestIdentity(self.mentor).accessible_mentee_ids, {self.mentee.id})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MentorMenteeAssignment.objects.create(mentor=self.mentor, mentee=other, start_date=timezone.now().date())
+            self.assignment.delete()
+        self.client.force_login(self.mentor)
+        response = self.client.get(reverse("export_mentee_progress", args=[self.mentee.id]))
+
+        self.assertEqual(RequestIdentity(self.mentor).accessible_mentee_ids, {other.id})
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_per_process_cache_is_not_used(self):
+        RequestIdentity(self.mentor).accessible_mentee_ids
+        # As if another worker ended the assignment: no signal reaches this process.
+        CurrentMentorAssignment.objects.filter(mentee=self.mentee).delete()
+
+        self.assertEqual(RequestIdentity(self.mentor).accessible_mentee_ids, frozenset())
+
+    @override_settings(MENTEE_ACCESS_CACHE_ENABLED=None)
+    def test_database_cache_is_not_used_by_default(self):
+        with CaptureQueriesContext(connection) as captured:
+            RequestIdentity(self.mentor).accessible_mentee_ids
+
+        self.assertEqual(len(captured), 1)
+        self.assertNotIn("lud_cache", captured.captured_queries[0]["sql"])
+
+
+class MaintainAssignmentsCommandTests(TestCase):
+    def setUp(self):
+        self.mentor = CustomUser.objects.create_user(
+            username="maintain-mentor@example.com",
+            email="maintain-mentor@example.com",
+            password="testpass123",
+            role="mentor",
+        )
+        today = timezone.now().date()
+        self.current = MentorMenteeAssignment.objects.create(
+            mentor=self.mentor,
+            mentee=Mentee.objects.create(full_name="Current Mentee", current_year=1),
+            start_date=today - timedelta(days=30),
+        )
+        self.ending = MentorMenteeAssignment.objects.create(
+            mentor=self.mentor,
+            mentee=Mentee.objects.create(full_name="Ending Mentee", current_year=1),
+            start_date=today - timedelta(days=30),
+            end_date=today,
+        )
+        self.tomorrow = (today + timedelta(days=1)).isoformat()
+
+    def test_expires_ended_assignments_and_rebuilds_current_table(self):
+        self.assertEqual(CurrentMentorAssignment.objects.count(), 2)
+
+        call_command("maintain_assignments", "--date", self.tomorrow, stdout=StringIO())
+
+        self.ending.refresh_from_db()
+        self.assertFalse(self.ending.is_active)
+        self.assertEqual(
+            list(CurrentMentorAssignment.objects.values_list("assignment_id", flat=True)),
+            [self.current.id],
+        )
+
+    def test_dry_run_reports_without_writing(self):
+        out = StringIO()
+
+        call_command("maintain_assignments", "--date", self.tomorrow, "--dry-run", stdout=out)
+
+        self.ending.refresh_from_db()
+        self.assertTrue(self.ending.is_active)
+        self.assertEqual(CurrentMentorAssignment.objects.count(), 2)
+        self.assertIn("Would expire 1 assignment(s)", out.getvalue())
+
+
+class MentorPortfolioTests(TestCase):
+    def setUp(self):
+        today = timezone.now().date()
+        self.mentor = CustomUser.objects.create_user(
+            username="portfolio-mentor@example.com",
+            email="portfolio-mentor@example.com",
+            password="testpass123",
+            role="mentor",
+        )
+        self.mentee = Mentee.objects.create(full_name="Portfolio Mentee", current_year=1)
+        self.idle_mentee = Mentee.objects.create(full_name="Idle Mentee", current_year=1)
+        for mentee in (self.mentee, self.idle_mentee):
+            MentorMenteeAssignment.objects.create(mentor=self.mentor, mentee=mentee, start_date=today)
+        completed, _ = StatusConfig.objects.get_or_create(name="Completed", defaults={"color": "success"})
+        in_progress, _ = StatusConfig.objects.get_or_create(name="In Progress", defaults={"color": "primary"})
+        ObjectiveItem.objects.create(mentee=self.mentee, objective_title="Done", status=completed, progress_percent=100)
+        self.open_objective = ObjectiveItem.objects.create(
+            mentee=self.mentee, objective_title="Open", status=in_progress, progress_percent=40
+        )
+        YearPlanItem.objects.create(mentee=self.mentee, year=1, milestone="Late", status=in_progress, target_date=today - timedelta(days=3))
+        YearPlanItem.objects.create(mentee=self.mentee, year=1, milestone="Finished", status=completed, target_date=today - timedelta(days=3))
+        YearPlanItem.objects.create(mentee=self.mentee, year=1, milestone="Upcoming", target_date=today + timedelta(days=3))
+        session_type = SessionType.objects.create(name="Portfolio Session")
+        domain = RatingDomain.objects.create(year=1, name="Portfolio Domain", source="objective")
+        other_domain = RatingDomain.objects.create(year=1, name="Portfolio Domain 2", source="objective")
+        older = MenteeAssessment.objects.create(mentee=self.mentee, year=1, session_type=session_type, date=today - timedelta(days=30))
+        AssessmentRating.objects.create(assessment=older, domain=domain, value=1)
+        self.latest = MenteeAssessment.objects.create(mentee=self.mentee, year=1, session_type=session_type, date=today - timedelta(days=2))
+        AssessmentRating.objects.create(assessment=self.latest, domain=domain, value=4)
+        AssessmentRating.objects.create(assessment=self.latest, domain=other_domain, value=5)
+
+    def test_summarises_every_assigned_mentee(self):
+        portfolio = mentor_portfolio(self.mentor)
+
+        summary = portfolio[self.mentee.id]
+        self.assertEqual(summary["objectives_total"], 2)
+        self.assertEqual(summary["objectives_completed"], 1)
+        self.assertEqual(summary["average_progress"], 70)
+        self.assertEqual(summary["last_assessment_date"], self.latest.date)
+        self.assertEqual(summary["last_assessment_score"], 4.5)
+        self.assertEqual(summary["overdue_year_plans"], 1)
+        self.assertEqual(portfolio[self.idle_mentee.id]["objectives_total"], 0)
+        self.assertIsNone(portfolio[self.idle_mentee.id]["last_assessment_date"])
+
+    def test_portfolio_is_cached_until_records_change(self):
+        mentor_portfolio(self.mentor)
+
+        with CaptureQueriesContext(connection) as captured:
+            mentor_portfolio(self.mentor)
+        self.assertEqual(app_queries(captured), [])
+
+        self.open_objective.progress_percent = 80
+        with self.captureOnCommitCallbacks(execute=True):
+            self.open_objective.save()
+        self.assertEqual(mentor_portfolio(self.mentor)[self.mentee.id]["average_progress"], 90)
+
+    def test_one_transaction_retires_portfolios_once(self):
+        with patch("core.mentee_access.bump_cache_generation") as bump:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    for progress in (50, 60, 70):
+                        self.open_objective.progress_percent = progress
+                        self.open_objective.save()
+                    self.mentee.delete()
+                    self.assertNotIn(((PORTFOLIO_GENERATION_CACHE_KEY,),), bump.call_args_list)
+
+        self.assertEqual(bump.call_args_list.count(((PORTFOLIO_GENERATION_CACHE_KEY,),)), 1)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_per_process_cache_is_not_used(self):
+        mentor_portfolio(self.mentor)
+        # A write whose invalidation only reached another worker.
+        ObjectiveItem.objects.filter(pk=self.open_objective.pk).update(progress_percent=80)
+
+        self.assertEqual(mentor_portfolio(self.mentor)[self.mentee.id]["average_progress"], 90)
+
+    def test_dashboard_shows_portfolio_columns(self):
+        self.client.force_login(self.mentor)
+
+        response = self.client.get(reverse("dashboard"))
+
+        self.assertContains(response, "1/2 completed")
+        self.assertContains(response, "1 overdue")
+
+
+class CohortAnalyticsTests(TestCase):
+    def setUp(self):
+        today = timezone.now().date()
+        self.admin_user = CustomUser.objects.create_user(
+            username="analytics-admin@example.com",
+            email="analytics-admin@example.com",
+            password="testpass123",
+            role="admin",
+        )
+        self.school = School.objects.create(name="Analytics School")
+        other_school = School.objects.create(name="Other Analytics School")
+        self.domain = RatingDomain.objects.create(year=1, name="Analytics Domain", source="objective")
+        session_type = SessionType.objects.create(name="Analytics Session")
+        self.mentee = Mentee.objects.create(full_name="Cohort Mentee", current_year=1, school=self.school)
+        outsider = Mentee.objects.create(full_name="Other Mentee", current_year=1, school=other_school)
+        for mentee, days_ago, value in ((self.mentee, 20, 2), (self.mentee, 10, 4), (self.mentee, 1, 3), (outsider, 5, 5)):
+            assessment = MenteeAssessment.objects.create(
+                mentee=mentee, year=1, session_type=session_type, date=today - timedelta(days=days_ago)
+            )
+            AssessmentRating.objects.create(assessment=assessment, domain=self.domain, value=value)
+        self.cohort = {"school": self.school.id}
+
+    def test_computes_domain_means_distributions_and_session_deltas(self):
+        analytics = cohort_analytics(self.cohort)
+
+        self.assertEqual((analytics["mentees"], analytics["assessments"], analytics["ratings"]), (1, 3, 3))
+        domain = analytics["domains"][0]
+        self.assertEqual(domain["name"], "Analytics Domain")
+        self.assertEqual(domain["mean"], 3.0)
+        self.assertEqual(domain["distribution"], [0, 1, 1, 1, 0])
+        self.assertEqual(domain["session_pairs"], 2)
+        self.assertEqual(domain["mean_delta"], 0.5)
+        self.assertEqual((domain["improved"], domain["declined"]), (1, 1))
+
+    def test_results_are_cached_until_ratings_change(self):
+        cohort_analytics(self.cohort)
+
+        with CaptureQueriesContext(connection) as captured:
+            cohort_analytics(self.cohort)
+        self.assertEqual(app_queries(captured), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MenteeAssessment.objects.filter(mentee=self.mentee).first().delete()
+        self.assertEqual(cohort_analytics(self.cohort)["ratings"], 2)
+
+    def test_deleting_an_assessment_removes_its_ratings_in_one_query(self):
+        assessment = MenteeAssessment.objects.filter(mentee=self.mentee).first()
+
+        with CaptureQueriesContext(connection) as captured:
+            assessment.delete()
+
+        rating_queries = [sql for sql in app_queries(captured) if "core_assessmentrating" in sql]
+        self.assertEqual(len(rating_queries), 1)
+        self.assertTrue(rating_queries[0].startswith("DELETE"))
+
+    def test_ratings_outside_the_scale_are_ignored(self):
+        session_type = SessionType.objects.get(name="Analytics Session")
+        other_domain = RatingDomain.objects.create(year=1, name="Later Domain", source="objective", sort_order=1)
+        AssessmentRating.objects.create(
+            assessment=MenteeAssessment.objects.filter(mentee=self.mentee).first(), domain=other_domain, value=1
+        )
+        for value in (0, 6):
+            assessment = MenteeAssessment.objects.create(
+                mentee=self.mentee, year=1, session_type=session_type, date=timezone.now().date()
+            )
+            AssessmentRating.objects.create(assessment=assessment, domain=self.domain, value=value)
+
+        analytics = cohort_analytics(self.cohort)
+
+        self.assertEqual(analytics["ratings"], 4)
+        distributions = {domain["name"]: domain["distribution"] for domain in analytics["domains"]}
+        self.assertEqual(distributions, {"Analytics Domain": [0, 1, 1, 1, 0], "Later Domain": [1, 0, 0, 0, 0]})
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_per_process_cache_is_not_used(self):
+        cohort_analytics(self.cohort)
+        # A write whose invalidation only reached another worker.
+        AssessmentRating.objects.filter(assessment__mentee=self.mentee).update(value=5)
+
+        self.assertEqual(cohort_analytics(self.cohort)["domains"][0]["mean"], 5.0)
+
+    def test_admin_page_and_json_endpoint_filter_by_cohort(self):
+        self.client.force_login(self.admin_user)
+
+        page = self.client.get(reverse("admin_cohort_analytics"), {"school": self.school.id})
+        payload = self.client.get(reverse("admin_cohort_analytics_json"), {"school": self.school.id}).json()
+        everyone = self.client.get(reverse("admin_cohort_analytics_json")).json()
+        invalid = self.client.get(reverse("admin_cohort_analytics_json"), {"year": "9"})
+
+        self.assertContains(page, "Analytics Domain")
+        self.assertEqual(payload["cohort"]["school"], self.school.id)
+        self.assertEqual(payload["mentees"], 1)
+        self.assertEqual(everyone["mentees"], 2)
+        self.assertEqual(invalid.status_code, 400)
+
+
+class CohortProgressExportTests(TestCase):
+    def setUp(self):
+        self.mentor = CustomUser.objects.create_user(
+            username="cohort-export-mentor@example.com",
+            email="cohort-export-mentor@example.com",
+            password="testpass123",
+            role="mentor",
+        )
+        self.admin_user = CustomUser.objects.create_user(
+            username="cohort-export-admin@example.com",
+            email="cohort-export-admin@example.com",
+            password="testpass123",
+            role="admin",
+        )
+        self.school = School.objects.create(name="Export School")
+        self.domain = RatingDomain.objects.create(year=1, name="Export Domain", source="objective")
+        session_type = SessionType.objects.create(name="Export Session")
+        self.mentees = [
+            Mentee.objects.create(full_name=f"Export Mentee {index}", current_year=1, school=self.school)
+            for index in range(3)
+        ]
+        self.outsider = Mentee.objects.create(full_name="Unassigned Mentee", current_year=1)
+        for mentee in self.mentees[:2]:
+            MentorMenteeAssignment.objects.create(mentor=self.mentor, mentee=mentee, start_date=timezone.now().date())
+        for mentee in self.mentees:
+            ObjectiveItem.objects.create(mentee=mentee, objective_title=f"{mentee.full_name} objective")
+            YearPlanItem.objects.create(mentee=mentee, year=1, milestone=f"{mentee.full_name} milestone")
+            assessment = MenteeAssessment.objects.create(
+                mentee=mentee, year=1, session_type=session_type, date=timezone.now().date()
+            )
+            AssessmentRating.objects.create(assessment=assessment, domain=self.domain, value=4)
+
+    def _workbook(self, response):
+        return openpyxl.load_workbook(filename=BytesIO(b"".join(response.streaming_content)))
+
+    def test_mentor_export_covers_only_assigned_mentees(self):
+        self.client.force_login(self.mentor)
+
+        response = self.client.get(reverse("export_cohort_progress_excel"), {"mentor": self.admin_user.id})
+
+        workbook = self._workbook(response)
+        self.assertEqual(workbook.sheetnames, ["Mentees", "Objectives", "Year Plans", "Assessments"])
+        self.assertEqual([row[1] for row in workbook["Mentees"].iter_rows(min_row=2, values_only=True)], ["Export Mentee 0", "Export Mentee 1"])
+        self.assertEqual(workbook["Assessments"]["L1"].value, "Year 1 - Export Domain")
+        self.assertEqual(workbook["Assessments"]["L2"].value, 4)
+
+    def test_school_export_uses_fixed_queries_per_batch(self):
+        self.client.force_login(self.admin_user)
+        url = reverse("export_cohort_progress_excel")
+        self.client.get(url, {"school": self.school.id})
+
+        with self.assertNumQueries(8):
+            response = self.client.get(url, {"school": self.school.id})
+
+        workbook = self._workbook(response)
+        self.assertEqual(workbook["Objectives"].max_row, 4)
+        self.assertEqual(workbook["Year Plans"].max_row, 4)
+
+
+class EndorserMentorGraphTests(TestCase):
+    def setUp(self):
+        self.admin_user = CustomUser.objects.create_user(
+            username="graph-admin@example.com",
+            email="graph-admin@example.com",
+            password="testpass123",
+            role="admin",
+        )
+        self.endorser = CustomUser.objects.create_user(
+            username="graph-endorser@example.com",
+            email="graph-endorser@example.com",
+            password="testpass123",
+            role="endorser",
+        )
+        self.mentors = [
+            CustomUser.objects.create_user(
+                username=f"graph-mentor-{index}@example.com",
+                email=f"graph-mentor-{index}@example.com",
+                password="testpass123",
+                role="mentor",
+            )
+            for index in range(3)
+        ]
+        self.endorser.mentors.add(*self.mentors[:2])
+        self.client.force_login(self.admin_user)
+
+    def _apply(self, **changes):
+        return self.client.post(
+            reverse("apply_endorser_assignments"),
+            data=json.dumps(changes),
+            content_type="application/json",
+        )
+
+    def test_bulk_endpoint_applies_additions_and_removals(self):
+        response = self._apply(
+            add={str(self.endorser.id): [self.mentors[1].id, self.mentors[2].id]},
+            remove={str(self.endorser.id): [self.mentors[0].id]},
+        )
+
+        self.assertEqual(response.json()["added"], 1)
+        self.assertEqual(response.json()["removed"], 1)
+        self.assertEqual(set(self.endorser.mentors.values_list("id", flat=True)), {self.mentors[1].id, self.mentors[2].id})
+
+    def test_bulk_endpoint_keeps_concurrent_changes(self):
+        # Two pages loaded with mentors 0 and 1; one removes mentor 0, the other adds mentor 2.
+        self._apply(remove={str(self.endorser.id): [self.mentors[0].id]})
+        response = self._apply(add={str(self.endorser.id): [self.mentors[2].id]})
+
+        self.assertEqual(response.json()["removed"], 0)
+        self.assertEqual(set(self.endorser.mentors.values_list("id", flat=True)), {self.mentors[1].id, self.mentors[2].id})
+
+    def test_bulk_endpoint_rejects_users_without_the_role(self):
+        response = self._apply(add={str(self.endorser.id): [self.admin_user.id]})
+        conflicting = self._apply(
+            add={str(self.endorser.id): [self.mentors[2].id]},
+            remove={str(self.endorser.id): [self.mentors[2].id]},
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(conflicting.status_code, 400)
+        self.assertEqual(self.endorser.mentors.count(), 2)
+
+    def test_mapping_endpoint_revalidates_with_etag(self):
+        url = reverse("endorser_mentor_graph")
+        first = self.client.get(url)
+        etag = first["ETag"]
+
+        unchanged = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        with self.captureOnCommitCallbacks(execute=True):
+            self._apply(remove={str(self.endorser.id): [self.mentors[0].id]})
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        endorser = next(row for row in first.json()["endorsers"] if row["id"] == self.endorser.id)
+        self.assertEqual([mentor["id"] for mentor in endorser["mentors"]], [self.mentors[0].id, self.mentors[1].id])
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_mapping_endpoint_has_no_etag_with_a_per_process_cache(self):
+        response = self.client.get(reverse("endorser_mentor_graph"))
+
+        self.assertFalse(response.has_header("ETag"))
+
+    def test_manage_page_counts_come_from_annotations(self):
+        response = self.client.get(reverse("manage_assignment"))
+
+        self.assertEqual(response.context["unassigned_endorser_count"], 0)
+        self.assertEqual(response.context["unassigned_mentors"], [self.mentors[2]])
+        self.assertEqual(response.context["endorsers_with_counts"][0]["mentor_count"], 2)
+
+
+class WorkScheduleBroadcastTests(TestCase):
+    def setUp(self):
+        self.admin_user = CustomUser.objects.create_user(
+            username="broadcast-admin@example.com",
+            email="broadcast-admin@example.com",
+            password="testpass123",
+            role="admin",
+        )
+        self.client.force_login(self.admin_user)
+
+    def _users(self, prefix, count):
+        users = CustomUser.objects.bulk_create(
+            CustomUser(
+                username=f"{prefix}-{index}@example.com",
+                email=f"{prefix}-{index}@example.com",
+                role=("mentor", "volunteer")[index % 2],
+                roles=[("mentor", "volunteer")[index % 2]],
+            )
+            for index in range(count)
+        )
+        UserRole.objects.bulk_create(UserRole(user=user, role=user.role) for user in users)
+        return users
+
+    def _broadcast(self, title, users):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(
+                reverse("manage_work_items"),
+                {
+                    "assignees": [str(user.id) for user in users],
+                    "role": title,
+                    "due_date": timezone.now().date().isoformat(),
+                    "description": "Broadcast work item.",
+                },
+            )
+        self.assertEqual(response.status_code, 302)
+        return len(captured)
+
+    def test_broadcast_uses_constant_queries_and_one_notification_per_role(self):
+        small = self._broadcast("Small Broadcast", self._users("small", 3))
+        large = self._broadcast("Large Broadcast", self._users("large", 40))
+
+        schedule = WorkSchedule.objects.get(role="Large Broadcast")
+        self.assertEqual(small, large)
+        self.assertEqual(schedule.mentors.count(), 40)
+        self.assertEqual(schedule.assignments.count(), 40)
+        self.assertEqual(
+            sorted(Notification.objects.filter(message__contains="Large Broadcast").values_list("target_group", flat=True)),
+            ["mentor", "volunteer"],
+        )
+
+    def test_resync_keeps_existing_assignment_progress(self):
+        users = self._users("resync", 4)
+        self._broadcast("Resync Item", users)
+        schedule = WorkSchedule.objects.get(role="Resync Item")
+        schedule.assignments.filter(assignee=users[0]).update(status=WorkScheduleAssignment.Status.COMPLETED)
+
+        response = self.client.post(
+            reverse("manage_work_items"),
+            {
+                "schedule_id": str(schedule.id),
+                "assignees": [str(user.id) for user in users[:2]],
+                "role": "Resync Item",
+                "due_date": timezone.now().date().isoformat(),
+                "description": "Broadcast work item.",
+            },
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(set(schedule.mentors.values_list("id", flat=True)), {users[0].id, users[1].id})
+        self.assertEqual(schedule.assignments.get(assignee=users[0]).status, WorkScheduleAssignment.Status.COMPLETED)
+        self.assertEqual(schedule.assignments.count(), 2)
+
+
+class WorkScheduleRollupTests(TestCase):
+    def setUp(self):
+        self.endorser = CustomUser.objects.create_user(
+            username="rollup-endorser@example.com",
+            email="rollup-endorser@example.com",
+            password="testpass123",
+            role="endorser",
+        )
+        self.schedule = WorkSchedule.objects.create(
+            endorser=self.endorser, role="Rollup Item", due_date=timezone.now().date(), description="Rollup"
+        )
+        statuses = ["completed", "completed", "in_progress", "on_hold"] + ["assigned"] * 56
+        users = CustomUser.objects.bulk_create(
+            CustomUser(username=f"rollup-{index}@example.com", email=f"rollup-{index}@example.com", role="mentor")
+            for index in range(len(statuses))
+        )
+        WorkScheduleAssignment.objects.bulk_create(
+            WorkScheduleAssignment(work_schedule=self.schedule, assignee=user, status=status)
+            for user, status in zip(users, statuses)
+        )
+        self.client.force_login(self.endorser)
+
+    def test_with_progress_annotates_status_counts(self):
+        schedule = WorkSchedule.objects.with_progress().get(id=self.schedule.id)
+
+        with self.assertNumQueries(0):
+            summary = schedule.assignment_summary()
+
+        self.assertEqual(summary, {"total": 60, "completed": 2, "in_progress": 1, "on_hold": 1})
+        self.assertEqual(self.schedule.assignment_summary(), summary)
+
+    def test_work_schedule_page_renders_an_assignee_preview(self):
+        response = self.client.get(reverse("manage_work_items"))
+
+        schedule = response.context["created_schedules"][0]
+        self.assertEqual(len(schedule.assignee_preview), 5)
+        self.assertContains(response, "2 of 60 completed")
+        self.assertContains(response, reverse("work_schedule_assignees", args=[self.schedule.id]))
+
+    def test_work_schedule_page_loads_select2_once_after_jquery(self):
+        html = self.client.get(reverse("manage_work_items")).content.decode()
+
+        self.assertEqual(html.count("select2.min.js"), 1)
+        self.assertLess(html.index("jquery-3.7.1.min.js"), html.index("select2.min.js"))
+
+    def test_assignee_endpoint_pages_through_assignees(self):
+        url = reverse("work_schedule_assignees", args=[self.schedule.id])
+
+        first = self.client.get(url).json()
+        second = self.client.get(url, {"page": 2}).json()
+
+        self.assertEqual((first["total"], first["num_pages"], first["has_next"]), (60, 2, True))
+        self.assertEqual(len(first["assignees"]) + len(second["assignees"]), 60)
+        self.assertFalse(second["has_next"])
+
+    def test_assignee_endpoint_is_limited_to_the_schedule_owner(self):
+        other = CustomUser.objects.create_user(
+            username="rollup-other@example.com",
+            email="rollup-other@example.com",
+            password="testpass123",
+            role="endorser",
+        )
+        self.client.force_login(other)
+
+        response = self.client.get(reverse("work_schedule_assignees", args=[self.schedule.id]))
+
+        self.assertEqual(response.status_code, 404)
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        self.admin_user = CustomUser.objects.create_user(
+            username="complete-admin@example.com",
+            email="complete-admin@example.com",
+            password="testpass123",
+            role="admin",
+        )
+        self.endorser = CustomUser.objects.create_user(
+            username="complete-endorser@example.com",
+            email="complete-endorser@example.com",
+            password="testpass123",
+            role="endorser",
+            first_name="Anita",
+        )
+        self.mentors = [
+            CustomUser.objects.create_user(
+                username=f"complete-mentor-{index}@example.com",
+                email=f"complete-mentor-{index}@example.com",
+                password="testpass123",
+                role="mentor",
+                first_name=f"Anand{index}",
+            )
+            for index in range(3)
+        ]
+
+    def test_prefix_search_is_case_insensitive_and_filtered_by_role(self):
+        results, more = search("mentors", self.admin_user, "anand")
+
+        self.assertEqual([pk for pk, _ in results], [mentor.id for mentor in self.mentors])
+        self.assertFalse(more)
+        self.assertEqual(search("mentors", self.admin_user, "ANITA")[0], [])
+
+    def test_endpoint_limits_results_and_reports_more(self):
+        self.client.force_login(self.admin_user)
+
+        response = self.client.get(reverse("autocomplete", args=["mentors"]), {"q": "An", "limit": 2})
+
+        self.assertEqual(len(response.json()["results"]), 2)
+        self.assertTrue(response.json()["pagination"]["more"])
+
+    def test_endorser_cannot_query_admin_sources(self):
+        self.client.force_login(self.endorser)
+
+        allowed = self.client.get(reverse("autocomplete", args=["work-item-assignees"]), {"q": "anand"})
+        denied = self.client.get(reverse("autocomplete", args=["mentors"]), {"q": "anand"})
+        unknown = self.client.get(reverse("autocomplete", args=["nobody"]), {"q": "anand"})
+
+        self.assertEqual(len(allowed.json()["results"]), 3)
+        self.assertEqual(denied.status_code, 302)
+        self.assertEqual(unknown.status_code, 404)
+
+    def test_widget_renders_only_selected_choices_and_validates_against_queryset(self):
+        volunteer = CustomUser.objects.create_user(
+            username="complete-volunteer@example.com",
+            email="complete-volunteer@example.com",
+            password="testpass123",
+            role="volunteer",
+        )
+        form = VolunteerReportingAssignmentForm(initial={"endorser": self.endorser.id})
+        valid = VolunteerReportingAssignmentForm({"volunteer": volunteer.id, "endorser": self.endorser.id})
+        invalid = VolunteerReportingAssignmentForm({"volunteer": self.mentors[0].id, "endorser": self.endorser.id})
+
+        rendered = str(form["endorser"])
+        self.assertIn(reverse("autocomplete", args=["endorsers"]), rendered)
+        self.assertEqual(rendered.count("<option"), 2)
+        self.assertNotIn(self.mentors[0].email, str(form["volunteer"]))
+        self.assertNotIn("volunteer", valid.errors)
+        self.assertIn("volunteer", invalid.errors)
+
+
+class SeedConfigDataCommandTests(TestCase):
+    def _seed(self, *args):
+        stdout = StringIO()
+        with CaptureQueriesContext(connection) as captured:
+            call_command("seed_config_data", *args, stdout=stdout)
+        return stdout.getvalue(), len(app_queries(captured))
+
+    def test_rerun_is_idempotent_and_refreshes_seeded_fields(self):
+        self._seed()
+        counts = [model.objects.count() for model in (Chapter, DomainIndicator, RatingScaleDefinition, TemplateConfig)]
+        indicator = DomainIndicator.objects.order_by("id").first()
+        DomainIndicator.objects.filter(pk=indicator.pk).update(description="Edited")
+        SessionType.objects.filter(name="Summer Camp").update(is_active=False)
+
+        self._seed()
+
+        self.assertEqual([model.objects.count() for model in (Chapter, DomainIndicator, RatingScaleDefinition, TemplateConfig)], counts)
+        indicator.refresh_from_db()
+        self.assertNotEqual(indicator.description, "Edited")
+        self.assertFalse(SessionType.objects.get(name="Summer Camp").is_active)
+
+    def test_queries_are_per_section_not_per_row(self):
+        _, first = self._seed()
+        output, rerun = self._seed("--timing")
+
+        self.assertLess(first, 60)
+        self.assertLess(rerun, 60)
+        self.assertIn("Domain Indicators: 36 (", output)
+        self.assertIn("Total:", output)
+
+
+class ConfigSnapshotTests(TestCase):
+    def setUp(self):
+        call_command("seed_config_data", stdout=StringIO())
+        self.admin_user = CustomUser.objects.create_user(
+            username="snapshot-admin@example.com",
+            email="snapshot-admin@example.com",
+            password="testpass123",
+            role="admin",
+        )
+        self.chapter = Chapter.objects.order_by("id").first()
+        self.chapter.leader = self.admin_user
+        self.chapter.location = Location.objects.get(code="LUD-PUN")
+        self.chapter.save()
+
+    def _export(self):
+        stdout = StringIO()
+        call_command("export_config", stdout=stdout)
+        return stdout.getvalue()
+
+    def _import(self, snapshot):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", encoding="utf-8", delete=False) as handle:
+            handle.write(snapshot)
+        self.addCleanup(os.remove, handle.name)
+        call_command("import_config", handle.name, stdout=StringIO())
+
+    def test_snapshot_covers_every_config_page(self):
+        self.assertEqual({key for key, _ in SNAPSHOT_MODELS}, set(CONFIG_REGISTRY))
+        self.assertEqual({model for _, model in SNAPSHOT_MODELS}, {config["model"] for config in CONFIG_REGISTRY.values()})
+
+    def test_round_trip_restores_rows_by_natural_key(self):
+        snapshot = self._export()
+        counts = [model.objects.count() for model in (Chapter, DomainIndicator, RatingScaleDefinition, TemplateConfig)]
+        StatusConfig.objects.filter(name="Approved").update(color="dark")
+        School.objects.filter(pk=self.chapter.school_id).delete()
+        RatingDomain.objects.filter(year=2).delete()
+
+        self._import(snapshot)
+
+        self.assertEqual([model.objects.count() for model in (Chapter, DomainIndicator, RatingScaleDefinition, TemplateConfig)], counts)
+        self.assertEqual(StatusConfig.objects.get(name="Approved").color, "success")
+        chapter = Chapter.objects.get(name=self.chapter.name)
+        self.assertEqual((chapter.leader, chapter.location.code), (self.admin_user, "LUD-PUN"))
+        self.assertEqual(DomainIndicator.objects.filter(domain__year=2).count(), 10)
+
+    def test_rejects_other_versions(self):
+        header, rest = self._export().split("\n", 1)
+        payload = json.loads(header)
+        payload["version"] += 1
+
+        with self.assertRaisesMessage(CommandError, "Unsupported snapshot version"):
+            self._import(json.dumps(payload) + "\n" + rest)
+
+    def test_admin_export_streams_and_import_applies_upload(self):
+        self.client.force_login(self.admin_user)
+
+        response = self.client.get(reverse("admin_config_export"))
+        snapshot = b"".join(response.streaming_content)
+        Location.objects.filter(code="LUD-DEL").delete()
+        imported = self.client.post(
+            reverse("admin_config_import"),
+            {"snapshot": SimpleUploadedFile("config.jsonl", snapshot, content_type="application/x-ndjson")},
+        )
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertRedirects(imported, reverse("admin_config_home"), fetch_redirect_response=False)
+        self.assertTrue(Location.objects.filter(code="LUD-DEL").exists())
+
+    def _edit(self, snapshot, model, change):
+        lines = snapshot.splitlines()
+        for index, line in enumerate(lines):
+            record = json.loads(line)
+            if record.get("model") == model:
+                change(record["fields"])
+                lines[index] = json.dumps(record)
+                return lines, index + 1
+        raise AssertionError(f"No {model} rows")
+
+    def test_bad_rows_fail_with_their_line_number(self):
+        snapshot = self._export()
+        other = Location.objects.exclude(code="LUD-PUN").first()
+        cases = [
+            (self._edit(snapshot, "rating-domains", lambda fields: fields.update(year="second")), "year"),
+            (self._edit(snapshot, "locations", lambda fields: fields.update(name=other.name)), "already has"),
+            (self._edit(snapshot, "chapters", lambda fields: fields.update(school="Christ CBSE")), "natural key"),
+        ]
+        lines = snapshot.splitlines()
+        reference = next(index for index, line in enumerate(lines) if json.loads(line).get("model") == "reference-content")
+        cases.append(((lines[:reference + 1] + [lines[reference]] + lines[reference + 1:], reference + 2), "repeats"))
+        cases.append(((lines[:1] + ["[1, 2]"] + lines[1:], 2), "not a JSON object"))
+
+        for (lines, number), message in cases:
+            with self.subTest(message=message), self.assertRaisesMessage(CommandError, f"Line {number}"):
+                try:
+                    self._import("\n".join(lines) + "\n")
+                except CommandError as exc:
+                    self.assertIn(message, str(exc))
+                    raise
+        self.assertEqual(Location.objects.filter(name=other.name).count(), 1)
+
+    def test_reference_content_title_is_unique_per_section(self):
+        existing = ReferenceContent.objects.first()
+        copy = {"section": existing.section, "title": existing.title, "content": "Copy", "sort_order": 0}
+
+        self.assertFalse(ReferenceContentForm(data=copy).is_valid())
+        self.assertTrue(ReferenceContentForm(data={**copy, "section": "Elsewhere"}).is_valid())
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ReferenceContent.objects.create(**copy)
+
+    def test_upload_that_is_not_utf8_is_reported(self):
+        self.client.force_login(self.admin_user)
+        header, _ = self._export().split("\n", 1)
+
+        response = self.client.post(
+            reverse("admin_config_import"),
+            {"snapshot": SimpleUploadedFile("config.jsonl", header.encode() + b"\n\xff\xfe\n")},
+            follow=True,
+        )
+
+        self.assertContains(response, "Line 2 is not UTF-8 text.")
+
+    def test_unknown_leader_keeps_the_current_leader(self):
+        records = [json.loads(line) for line in self._export().splitlines()]
+        for record in records:
+            if record.get("model") == "chapters" and record["fields"]["name"] == self.chapter.name:
+                record["fields"]["leader"] = ["nobody@example.com"]
+
+        self._import("".join(json.dumps(record) + "\n" for record in records))
+
+        self.chapter.refresh_from_db()
+        self.assertEqual(self.chapter.leader, self.admin_user)
+
+
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username="photo-mentor@example.com",
+            email="photo-mentor@example.com",
+            password="testpass123",
+            role="mentor",
+        )
+
+    def _photo(self, name="photo.png", size=(1600, 1200), color="teal"):
+        output = BytesIO()
+        Image.new("RGB", size, color).save(output, "PNG")
+        return SimpleUploadedFile(name, output.getvalue(), content_type="image/png")
+
+    def _activity(self, photo):
+        return Activity.objects.create(user=self.user, date=timezone.now().date(), duration=1, photo=photo)
+
+    def _open(self, url):
+        return Image.open(os.path.join(self.media_root, url.removeprefix(settings.MEDIA_URL)))
+
+    def test_upload_builds_thumbnails_in_both_formats(self):
+        activity = self._activity(self._photo())
+
+        derivatives = sorted(
+            name for _, _, names in os.walk(os.path.join(self.media_root, "derivatives")) for name in names
+        )
+
+        self.assertEqual([name.rsplit(".", 1)[1] for name in derivatives], ["jpg", "webp"])
+        with self._open(derivative_url(activity.photo, "thumb")) as thumb:
+            self.assertEqual((thumb.format, thumb.size), ("JPEG", (160, 160)))
+
+    def test_derivatives_are_shared_by_content(self):
+        first = self._activity(self._photo("first.png"))
+        second = self._activity(self._photo("second.png"))
+
+        self.assertEqual(first.photo_sha256, Activity.objects.get(pk=second.pk).photo_sha256)
+        self.assertEqual(derivative_url(first.photo, "thumb"), derivative_url(second.photo, "thumb"))
+        with self._open(derivative_url(second.photo, "thumb", "webp")) as image:
+            self.assertEqual((image.format, image.size), ("WEBP", (160, 160)))
+
+    def test_rendering_urls_touches_neither_database_nor_storage(self):
+        self._activity(self._photo())
+        activity = Activity.objects.get()
+
+        with CaptureQueriesContext(connection) as captured, patch(
+            "django.core.files.storage.FileSystemStorage.exists", side_effect=AssertionError("storage checked")
+        ):
+            thumb = derivative_url(activity.photo, "thumb")
+            fallback = derivative_url(activity.photo, "avatar")
+
+        self.assertEqual(len(captured), 0)
+        self.assertIn(activity.photo_sha256, thumb)
+        self.assertEqual(fallback, activity.photo.url)
+
+    def test_photos_without_a_hash_link_the_original_until_backfilled(self):
+        activity = self._activity(self._photo())
+        Activity.objects.filter(pk=activity.pk).update(photo_sha256="")
+        shutil.rmtree(os.path.join(self.media_root, "derivatives"))
+        legacy = Activity.objects.get(pk=activity.pk)
+
+        before = derivative_url(legacy.photo, "thumb")
+        call_command("build_image_derivatives", stdout=StringIO())
+        after = derivative_url(Activity.objects.get(pk=activity.pk).photo, "thumb")
+
+        self.assertEqual(before, legacy.photo.url)
+        with self._open(after) as thumb:
+            self.assertEqual((thumb.format, thumb.size), ("JPEG", (160, 160)))
+
+    def test_unreadable_image_falls_back_to_original(self):
+        with self.assertLogs("core.images", "WARNING"):
+            activity = self._activity(SimpleUploadedFile("broken.png", b"not an image", content_type="image/png"))
+
+            url = derivative_url(activity.photo, "thumb")
+
+        self.assertEqual(url, activity.photo.url)
+
+    def test_reused_name_does_not_serve_the_previous_thumbnail(self):
+        first = self._activity(self._photo("reused.png", color="teal"))
+        old_url = derivative_url(first.photo, "thumb")
+        # sweep_media removed the orphan, and the storage hands its name to the next upload.
+        first.photo.storage.delete(first.photo.name)
+        second = self._activity(self._photo("reused.png", size=(800, 600), color="red"))
+
+        self.assertEqual(second.photo.name, first.photo.name)
+        self.assertNotEqual(derivative_url(second.photo, "thumb"), old_url)
+        with self._open(derivative_url(second.photo, "thumb")) as thumb:
+            red, green, _ = thumb.convert("RGB").getpixel((80, 80))
+        self.assertGreater(red, 200)
+        self.assertLess(green, 50)
+
+    def test_picture_tag_offers_webp_with_jpeg_fallback(self):
+        activity = self._activity(self._photo())
+
+        html = Template('{% load images %}{% picture activity.photo "thumb" alt="Activity" %}').render(
+            Context({"activity": activity})
+        )
+
+        self.assertIn('type="image/webp"', html)
+        self.assertIn(derivative_url(activity.photo, "thumb"), html)
+        self.assertIn('loading="lazy"', html)
+
+
+class DeduplicatingStorageTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.user = CustomUser.objects.create_user(
+            username="blob-volunteer@example.com",
+            email="blob-volunteer@example.com",
+            password="testpass123",
+            role="volunteer",
+        )
+
+    def _asset(self, name, content=b"%PDF-1.4 certificate"):
+        return RepositoryAsset.objects.create(
+            title=name,
+            category="Evidence",
+            uploaded_by=self.user,
+            file_upload=SimpleUploadedFile(name, content, content_type="application/pdf"),
+        )
+
+    def _blob_files(self):
+        return [name for _, _, names in os.walk(os.path.join(self.media_root, "blobs")) for name in names]
+
+    def _collect(self, *args):
+        stdout = StringIO()
+        call_command("collect_blobs", "--min-age-hours", "0", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self._asset("certificate.pdf")
+        second = self._asset("certificate-copy.PDF")
+        artifact = ProfileArtifact.objects.create(
+            user=self.user,
+            title="Certificate",
+            document=SimpleUploadedFile("cert.pdf", b"%PDF-1.4 certificate"),
+        )
+
+        self.assertEqual({first.file_upload.name, second.file_upload.name, artifact.document.name}, {first.file_upload.name})
+        self.assertEqual(len(self._blob_files()), 1)
+        self.assertEqual(StoredBlob.objects.get().ref_count, 3)
+        with first.file_upload.open("rb") as handle:
+            self.assertEqual(handle.read(), b"%PDF-1.4 certificate")
+
+    def test_collect_deletes_only_unreferenced_blobs(self):
+        kept = self._asset("kept.pdf", b"kept")
+        dropped = self._asset("dropped.pdf", b"dropped")
+        dropped.delete()
+
+        dry_run = self._collect("--dry-run")
+        self.assertEqual(len(self._blob_files()), 2)
+        output = self._collect()
+
+        self.assertIn("Would delete 1 unreferenced blobs", dry_run)
+        self.assertIn("Deleted 1 unreferenced blobs", output)
+        self.assertEqual(list(StoredBlob.objects.values_list("name", "ref_count")), [(kept.file_upload.name, 1)])
+        self.assertTrue(kept.file_upload.storage.exists(kept.file_upload.name))
+        self.assertEqual(len(self._blob_files()), 1)
+
+    def test_recent_blobs_survive_collection(self):
+        self._asset("fresh.pdf").delete()
+
+        call_command("collect_blobs", stdout=StringIO())
+
+        self.assertEqual(len(self._blob_files()), 1)
+        self.assertEqual(StoredBlob.objects.get().ref_count, 0)
+
+    def test_upload_restores_a_blob_collected_while_it_was_saved(self):
+        self._asset("first.pdf").delete()
+        StoredBlob.objects.update(referenced_at=timezone.now() - timedelta(hours=2))
+        add_reference = DeduplicatingStorage._add_reference
+
+        def collect_then_add_reference(storage, name, size):
+            # collect_blobs removes the unreferenced blob after _save saw it on disk.
+            collect_garbage(min_age=timedelta(hours=1))
+            self.assertFalse(storage.exists(name))
+            add_reference(storage, name, size)
+
+        with patch.object(DeduplicatingStorage, "_add_reference", collect_then_add_reference):
+            again = self._asset("again.pdf")
+
+        with again.file_upload.open("rb") as handle:
+            self.assertEqual(handle.read(), b"%PDF-1.4 certificate")
+        self.assertEqual(len(self._blob_files()), 1)
+        self.assertEqual(StoredBlob.objects.get().name, again.file_upload.name)
+
+
+class SweepMediaCommandTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        cache.clear()
+        user = CustomUser.objects.create_user(
+            username="sweep-mentor@example.com",
+            email="sweep-mentor@example.com",
+            password="testpass123",
+            role="mentor",
+        )
+        output = BytesIO()
+        Image.new("RGB", (400, 300), "navy").save(output, "PNG")
+        self.activity = Activity.objects.create(
+            user=user,
+            date=timezone.now().date(),
+            duration=1,
+            photo=SimpleUploadedFile("live.png", output.getvalue(), content_type="image/png"),
+        )
+        self.orphans = ["photos/replaced.png", "profile_pics/deleted-user.jpg", f"derivatives/ff/{'f' * 64}-160x160c.jpg"]
+        for relative in [*self.orphans, "blobs/ab/unreferenced.pdf"]:
+            self._write(relative)
+
+    def _write(self, relative):
+        path = os.path.join(self.media_root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as handle:
+            handle.write(b"orphan")
+
+    def _exists(self, relative):
+        return os.path.exists(os.path.join(self.media_root, relative))
+
+    def _sweep(self, *args):
+        stdout = StringIO()
+        call_command("sweep_media", "--min-age-hours", "0", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_report_lists_unreferenced_files_without_deleting(self):
+        output = self._sweep()
+
+        self.assertIn("photos/replaced.png", output)
+        self.assertIn("profile_pics/deleted-user.jpg", output)
+        self.assertNotIn(self.activity.photo.name, output)
+        self.assertNotIn("derivatives/", output)
+        self.assertNotIn("blobs/", output)
+        self.assertTrue(all(self._exists(relative) for relative in self.orphans))
+
+    def test_delete_removes_orphans_and_dead_derivatives_in_batches(self):
+        output = self._sweep("--delete", "--derivatives", "--batch-size", "2")
+
+        self.assertIn("Deleted 3 orphaned media files", output)
+        self.assertEqual(output.count("removed"), 2)
+        self.assertFalse(any(self._exists(relative) for relative in self.orphans))
+        self.assertTrue(self._exists(self.activity.photo.name))
+        self.assertTrue(self._exists("blobs/ab/unreferenced.pdf"))
+        self.assertTrue(self.activity.photo.storage.exists(derivative_url(self.activity.photo, "thumb").removeprefix(settings.MEDIA_URL)))
+
+    def test_recent_files_are_left_alone(self):
+        output = StringIO()
+
+        call_command("sweep_media", "--delete", stdout=output)
+
+        self.assertIn("Deleted 0 orphaned media files", output.getvalue())
@@ -23,6 +23,7 @@ urlpatterns = [
     path('mentor/mentees/<int:mentee_id>/assessments/new/', views.mentor_assessment_create_view, name='mentor_assessment_create'),
     path('mentees/<int:mentee_id>/export/', views.export_mentee_progress_csv, name='export_mentee_progress'),
     path('mentees/<int:mentee_id>/export-excel/', views.export_mentee_progress_excel, name='export_mentee_progress_excel'),
+    path('mentees/export-excel/', views.export_cohort_progress_excel, name='export_cohort_progress_excel'),
     path('dip-yclp/', views.dip_yclp_view, name='dip_yclp'),
     path('dip-mentee/', views.dip_mentee_view, name='dip_mentee'),
     path('profile/', views.profile_view, name='profile'),
@@ -51,8 +52,11 @@ urlpatterns = [
     path("volunteers/<int:user_id>/profile/internal/", views.volunteer_internal_profile_view, name="volunteer_internal_profile"),
     path("admin-dashboard/", views.admin_dashboard_view, name="admin_dashboard"),
     path("admin-config/", views.admin_config_home_view, name="admin_config_home"),
+    path("admin-config/export/", views.admin_config_export_view, name="admin_config_export"),
+    path("admin-config/import/", views.admin_config_import_view, name="admin_config_import"),
     path("admin-config/<str:config_key>/", views.admin_config_list_view, name="admin_config_list"),
     path("admin-config/<str:config_key>/<int:item_id>/edit/", views.admin_config_edit_view, name="admin_config_edit"),
+    path("admin-config/<str:config_key>/<int:item_id>/inline-edit/", views.admin_config_inline_edit_view, name="admin_config_inline_edit"),
     path("admin-config/<str:config_key>/<int:item_id>/delete/", views.admin_config_delete_view, name="admin_config_delete"),
     path("manage-user/", views.manage_user_view, name="manage_user"),
     path("user-role-manager/", views.user_role_manager_view, name="user_role_manager"),
@@ -73,6 +77,7 @@ urlpatterns = [
     path('endorser-dashboard/', views.endorser_dashboard, name='endorser_dashboard'),
     path('endorser/work-schedule/', views.endorser_work_schedule, name='endorser_work_schedule'),
     path('work-items/', views.assigned_work_items_view, name='assigned_work_items'),
+    path('work-items/schedules/<int:schedule_id>/assignees/', views.work_schedule_assignees_view, name='work_schedule_assignees'),
     path('work-items/<int:assignment_id>/status/', views.update_work_item_status_view, name='update_work_item_status'),
     path('endorser/profile/', views.endorser_profile, name='endorser_profile'),
     path('endorser/profile/edit/', views.endorser_edit_profile, name='endorser_edit_profile'),
@@ -82,13 +87,19 @@ urlpatterns = [
     path('mentees/upload-log/', views.mentee_upload_log_view, name='mentee_upload_log'),
     path('admin-notifications/', views.admin_notification_view, name='admin_notifications'),
     path('admin-notifications/<int:notification_id>/delete/', views.admin_notification_delete_view, name='admin_notification_delete'),
-    path('get-assigned-mentors/', views.get_assigned_mentors, name='get_assigned_mentors'),
-    path('assign-mentors/', views.assign_mentors, name='assign_mentors'),
-    path('unassign-mentor/', views.unassign_mentor, name='unassign_mentor'),
+    path('autocomplete/<str:source>/', views.autocomplete_view, name='autocomplete'),
+    path('endorser-mentor-graph/', views.endorser_mentor_graph, name='endorser_mentor_graph'),
+    path('endorser-mentor-graph/apply/', views.apply_endorser_assignments, name='apply_endorser_assignments'),
     path('activity-log/', views.activity_log, name='activity_log'),
     path('mentor/<int:mentor_id>/activity/', views.mentor_activity_list, name='mentor_activity'),
     path('add-remark/', views.add_remark, name='add_remark'),
     path('mentor-profile/', views.mentor_profile, name='mentor_profile'),
+    path('admin-diagnostics/queries/', views.query_report_view, name='admin_query_report'),
+    path('admin-diagnostics/profiles/', views.profile_list_view, name='admin_profile_list'),
+    path('admin-diagnostics/profiles/<str:name>/', views.profile_detail_view, name='admin_profile_detail'),
+    path('admin-analytics/cohorts/', views.cohort_analytics_view, name='admin_cohort_analytics'),
+    path('admin-analytics/cohorts/json/', views.cohort_analytics_json_view, name='admin_cohort_analytics_json'),
+    path('metrics', views.metrics_view, name='metrics'),
     
 
 
@@ -2,34 +2,38 @@ from core.views.admin import (
     add_user_view,
     admin_config_delete_view,
     admin_config_edit_view,
+    admin_config_export_view,
     admin_config_home_view,
+    admin_config_import_view,
+    admin_config_inline_edit_view,
     admin_config_list_view,
     admin_dashboard_view,
     admin_notification_delete_view,
     admin_notification_view,
-    assign_mentors,
+    apply_endorser_assignments,
     bulk_upload_mentees_view,
     bulk_upload_users_view,
     delete_user_view,
     download_mentee_template,
     download_user_template,
     edit_user_view,
+    endorser_mentor_graph,
     export_user_activities_excel,
     export_reflective_reports_excel,
     export_work_diaries_excel,
-    get_assigned_mentors,
     manage_assignment,
     manage_mentee_assignments_view,
     manage_volunteer_reporting_assignments_view,
     manage_user_view,
     mentee_upload_log_view,
-    unassign_mentor,
-    update_assigned_mentors,
     update_user_roles_view,
     user_role_manager_view,
     view_user,
 )
+from core.views.analytics import cohort_analytics_json_view, cohort_analytics_view
+from core.views.autocomplete import autocomplete_view
 from core.views.auth import login_view, permission_denied_view, role_redirect_view, switch_role_view
+from core.views.diagnostics import metrics_view, profile_detail_view, profile_list_view, query_report_view
 from core.views.dip import dip_home, dip_mentee_view, dip_yclp_view, new_activity
 from core.views.endorser import (
     activity_log,
@@ -42,8 +46,10 @@ from core.views.endorser import (
     manage_work_items_view,
     mentor_activity_list,
     update_work_item_status_view,
+    work_schedule_assignees_view,
 )
 from core.views.mentee import (
+    export_cohort_progress_excel,
     export_mentee_progress_csv,
     export_mentee_progress_excel,
     mentee_assessment_list_view,
@@ -101,16 +107,22 @@ __all__ = [
     "add_user_view",
     "admin_config_delete_view",
     "admin_config_edit_view",
+    "admin_config_export_view",
     "admin_config_home_view",
+    "admin_config_import_view",
+    "admin_config_inline_edit_view",
     "admin_config_list_view",
     "admin_dashboard_view",
     "admin_notification_delete_view",
     "admin_notification_view",
+    "apply_endorser_assignments",
     "approval_dashboard_view",
     "approval_queue_view",
-    "assign_mentors",
+    "autocomplete_view",
     "bulk_upload_mentees_view",
     "bulk_upload_users_view",
+    "cohort_analytics_json_view",
+    "cohort_analytics_view",
     "dashboard_view",
     "delete_user_view",
     "dip_home",
@@ -121,15 +133,16 @@ __all__ = [
     "edit_user_view",
     "endorser_dashboard",
     "endorser_edit_profile",
+    "endorser_mentor_graph",
     "endorser_profile",
     "endorser_work_schedule",
+    "export_cohort_progress_excel",
     "export_mentee_progress_csv",
     "export_mentee_progress_excel",
     "export_user_activities_excel",
     "export_reflective_reports_excel",
     "export_work_diaries_excel",
     "generate_transcript_view",
-    "get_assigned_mentors",
     "login_view",
     "manage_assignment",
     "manage_mentee_assignments_view",
@@ -157,6 +170,10 @@ __all__ = [
     "permission_denied_view",
     "profile_edit",
     "profile_view",
+    "query_report_view",
+    "profile_list_view",
+    "profile_detail_view",
+    "metrics_view",
     "reflective_report_list_view",
     "reflective_report_view",
     "repository_view",
@@ -168,8 +185,6 @@ __all__ = [
     "settings_view",
     "toggle_repository_asset_status_view",
     "transcript_view",
-    "unassign_mentor",
-    "update_assigned_mentors",
     "update_work_item_status_view",
     "update_user_roles_view",
     "user_role_manager_view",
@@ -179,6 +194,7 @@ __all__ = [
     "volunteer_public_profile_view",
     "work_diary_list_view",
     "work_diary_view",
+    "work_schedule_assignees_view",
     "workflow_guide_view",
     "year_plan_create_view",
     "year_plan_edit_view",
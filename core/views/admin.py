@@ -1,14 +1,26 @@
 import csv
-import traceback
+import json
 
 import openpyxl
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.forms.models import model_to_dict
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.utils.safestring import mark_safe
-from django.views.decorators.http import require_POST
-
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
+
+from core.assignment_graph import (
+    apply_assignments,
+    endorser_mentor_mapping,
+    endorsers_with_counts,
+    graph_etag,
+    mentors_with_counts,
+)
+from core.concurrency import gather_reads, render_async
+from core.config_data import SnapshotError, apply_snapshot, iter_snapshot
 from core.decorators import role_required
 from core.forms import (
     AcademicCycleForm,
@@ -55,6 +67,7 @@ from core.models import (
     VolunteerTranscript,
     VolunteerReportingAssignment,
 )
+from core.perf import timing_phase
 from core.roles import ROLE_CHOICES, ROLE_KEYS
 from core.views.common import User
 
@@ -164,54 +177,37 @@ def delete_user_view(request, user_id):
 
 
 @role_required(allowed_roles=["admin"])
-def admin_dashboard_view(request):
-    total_mentors = CustomUser.objects.filter(role="mentor").count()
-    total_endorsers = CustomUser.objects.filter(role="endorser").count()
-    total_mentees = Mentee.objects.filter(is_active=True).count()
-    total_assignments = MentorMenteeAssignment.objects.count()
-    total_schools = School.objects.count()
-    total_chapters = Chapter.objects.filter(is_active=True).count()
-    total_locations = Location.objects.filter(is_active=True).count()
-    total_programmes = Programme.objects.filter(is_active=True).count()
-    active_cycle = AcademicCycle.objects.filter(is_active=True).first()
-    total_assessments = MenteeAssessment.objects.count()
-    total_users = CustomUser.objects.exclude(role="admin").count()
-    total_volunteers = CustomUser.objects.filter(role="volunteer").count()
-    volunteer_reporting_assignments = VolunteerReportingAssignment.objects.count()
-    approved_reports = ReflectiveReport.objects.filter(status="Approved").count()
-    approved_transcripts = VolunteerTranscript.objects.filter(approval_status="Approved").count()
-    repository_assets = RepositoryAsset.objects.count()
-    assigned_endorsers = CustomUser.objects.filter(role="endorser", mentors__isnull=False).distinct().count()
-    assigned_mentors = CustomUser.objects.filter(role="mentor", assigned_endorsers__isnull=False).distinct().count()
-    recent_notifications = Notification.objects.order_by("-created_at")[:5]
-    recent_uploads = MenteeUploadLog.objects.order_by("-created_at")[:5]
+async def admin_dashboard_view(request):
+    counts = await gather_reads(
+        total_mentors=CustomUser.objects.with_role("mentor").count,
+        total_endorsers=CustomUser.objects.with_role("endorser").count,
+        total_mentees=Mentee.objects.filter(is_active=True).count,
+        total_assignments=MentorMenteeAssignment.objects.count,
+        total_schools=School.objects.count,
+        total_chapters=Chapter.objects.filter(is_active=True).count,
+        total_locations=Location.objects.filter(is_active=True).count,
+        total_programmes=Programme.objects.filter(is_active=True).count,
+        active_cycle=AcademicCycle.objects.filter(is_active=True).first,
+        total_assessments=MenteeAssessment.objects.count,
+        total_users=CustomUser.objects.exclude(role="admin").count,
+        total_volunteers=CustomUser.objects.with_role("volunteer").count,
+        volunteer_reporting_assignments=VolunteerReportingAssignment.objects.count,
+        approved_reports=ReflectiveReport.objects.filter(status="Approved").count,
+        approved_transcripts=VolunteerTranscript.objects.filter(approval_status="Approved").count,
+        repository_assets=RepositoryAsset.objects.count,
+        assigned_endorsers=CustomUser.objects.with_role("endorser").filter(mentors__isnull=False).distinct().count,
+        assigned_mentors=CustomUser.objects.with_role("mentor").filter(assigned_endorsers__isnull=False).distinct().count,
+        recent_notifications=lambda: list(Notification.objects.order_by("-created_at")[:5]),
+        recent_uploads=lambda: list(MenteeUploadLog.objects.order_by("-created_at")[:5]),
+    )
     context = {
-        "total_mentors": total_mentors,
-        "total_endorsers": total_endorsers,
-        "total_mentees": total_mentees,
-        "total_assignments": total_assignments,
-        "total_schools": total_schools,
-        "total_chapters": total_chapters,
-        "total_locations": total_locations,
-        "total_programmes": total_programmes,
-        "active_cycle": active_cycle,
-        "total_assessments": total_assessments,
-        "total_users": total_users,
-        "total_volunteers": total_volunteers,
-        "volunteer_reporting_assignments": volunteer_reporting_assignments,
-        "unmapped_volunteers": max(total_volunteers - volunteer_reporting_assignments, 0),
-        "approved_reports": approved_reports,
-        "approved_transcripts": approved_transcripts,
-        "repository_assets": repository_assets,
-        "assigned_endorsers": assigned_endorsers,
-        "unassigned_endorsers": total_endorsers - assigned_endorsers,
-        "assigned_mentors": assigned_mentors,
-        "unassigned_mentors": total_mentors - assigned_mentors,
-        "recent_notifications": recent_notifications,
-        "recent_uploads": recent_uploads,
+        **counts,
+        "unmapped_volunteers": max(counts["total_volunteers"] - counts["volunteer_reporting_assignments"], 0),
+        "unassigned_endorsers": counts["total_endorsers"] - counts["assigned_endorsers"],
+        "unassigned_mentors": counts["total_mentors"] - counts["assigned_mentors"],
         "active_page": "dashboard",
     }
-    return render(request, ADMIN_DASHBOARD_TEMPLATE, context)
+    return await render_async(request, ADMIN_DASHBOARD_TEMPLATE, context)
 
 
 @role_required(allowed_roles=["admin"])
@@ -223,6 +219,49 @@ def admin_config_home_view(request):
     return render(request, ADMIN_CONFIG_HOME_TEMPLATE, {"config_items": config_items, "active_page": "config"})
 
 
+def _config_items(model_class, form):
+    """Rows of a config table with the foreign keys the form and ``__str__`` touch joined in."""
+    related = [
+        field.name
+        for field in model_class._meta.concrete_fields
+        if field.is_relation and field.name in form.fields
+    ]
+    return model_class.objects.select_related(*related)
+
+
+def _config_row(form, item):
+    """JSON-ready values for the shared edit form, prepared the way a bound form would render them."""
+    values = model_to_dict(item, fields=list(form.fields))
+    return {
+        "id": item.pk,
+        "label": str(item),
+        "fields": {name: field.prepare_value(values.get(name)) for name, field in form.fields.items()},
+    }
+
+
+@role_required(allowed_roles=["admin"])
+def admin_config_export_view(request):
+    response = StreamingHttpResponse(iter_snapshot(), content_type="application/x-ndjson")
+    response["Content-Disposition"] = f'attachment; filename="lud-config-{timezone.now():%Y%m%d-%H%M}.jsonl"'
+    return response
+
+
+@role_required(allowed_roles=["admin"])
+@require_POST
+def admin_config_import_view(request):
+    snapshot = request.FILES.get("snapshot")
+    if not snapshot:
+        messages.error(request, "Choose a configuration snapshot to import.")
+        return redirect("admin_config_home")
+    try:
+        counts = apply_snapshot(snapshot)
+    except SnapshotError as exc:
+        messages.error(request, f"Import failed: {exc}")
+    else:
+        messages.success(request, f"Imported {sum(counts.values())} configuration rows.")
+    return redirect("admin_config_home")
+
+
 @role_required(allowed_roles=["admin"])
 def admin_config_list_view(request, config_key):
     config = CONFIG_REGISTRY.get(config_key)
@@ -232,7 +271,6 @@ def admin_config_list_view(request, config_key):
     model_class = config["model"]
     form_class = config["form"]
     title = config["title"]
-    items = model_class.objects.all()
 
     if request.method == "POST":
         form = form_class(request.POST)
@@ -243,12 +281,23 @@ def admin_config_list_view(request, config_key):
     else:
         form = form_class()
 
-    items_with_forms = [(item, form_class(instance=item)) for item in items]
+    # One unbound form serves every row: the page fills it from the serialized
+    # rows, so choice querysets are evaluated once per page, not once per row.
+    edit_form = form_class(auto_id="edit_%s")
+    items = list(_config_items(model_class, edit_form))
 
     return render(
         request,
         ADMIN_CONFIG_LIST_TEMPLATE,
-        {"items": items, "items_with_forms": items_with_forms, "form": form, "title": title, "config_key": config_key, "active_page": "config"},
+        {
+            "items": items,
+            "rows": [_config_row(edit_form, item) for item in items],
+            "form": form,
+            "edit_form": edit_form,
+            "title": title,
+            "config_key": config_key,
+            "active_page": "config",
+        },
     )
 
 
@@ -274,6 +323,25 @@ def admin_config_edit_view(request, config_key, item_id):
     return redirect("admin_config_list", config_key=config_key)
 
 
+@role_required(allowed_roles=["admin"])
+@require_POST
+def admin_config_inline_edit_view(request, config_key, item_id):
+    """Save one row from the list page's shared edit form; reply with the updated row or the form errors."""
+    config = CONFIG_REGISTRY.get(config_key)
+    if not config:
+        return JsonResponse({"status": "error", "message": "Config not found."}, status=404)
+
+    form_class = config["form"]
+    item = get_object_or_404(config["model"], id=item_id)
+    form = form_class(request.POST, instance=item)
+    if not form.is_valid():
+        return JsonResponse({"status": "error", "errors": form.errors.get_json_data()}, status=400)
+
+    item = form.save()
+    item = _config_items(config["model"], form).get(pk=item.pk)
+    return JsonResponse({"status": "success", "row": _config_row(form, item)}, encoder=DjangoJSONEncoder)
+
+
 @role_required(allowed_roles=["admin"])
 def admin_config_delete_view(request, config_key, item_id):
     config = CONFIG_REGISTRY.get(config_key)
@@ -345,7 +413,7 @@ def manage_volunteer_reporting_assignments_view(request):
 
 @role_required(allowed_roles=["admin"])
 def manage_user_view(request):
-    users = User.objects.exclude(role="admin").order_by("id")
+    users = User.objects.exclude(role="admin").select_related("mentee_profile").order_by("id")
     return render(
         request,
         ADMIN_USERS_MANAGE_TEMPLATE,
@@ -477,7 +545,8 @@ def export_user_activities_excel(request, user_id):
 
     response = HttpResponse(content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
     response["Content-Disposition"] = f'attachment; filename="{viewed_user.username}_activities.xlsx"'
-    workbook.save(response)
+    with timing_phase("export"):
+        workbook.save(response)
     return response
 
 
@@ -569,96 +638,44 @@ def bulk_upload_users_view(request):
 
 @role_required(allowed_roles=["admin"])
 def manage_assignment(request):
-    all_endorsers = CustomUser.objects.filter(role="endorser")
-    all_mentors = CustomUser.objects.filter(role="mentor")
-    unassigned_endorsers = all_endorsers.filter(mentors__isnull=True)
-    unassigned_mentors = all_mentors.exclude(assigned_endorsers__isnull=False)
-    endorsers_with_counts = [
-        {"endorser": endorser, "mentor_count": endorser.mentors.count(), "mentors": endorser.mentors.all()}
-        for endorser in all_endorsers
-    ]
+    endorsers = endorsers_with_counts()
+    mentors = mentors_with_counts()
     context = {
-        "endorsers_with_counts": endorsers_with_counts,
-        "unassigned_endorsers": unassigned_endorsers,
-        "unassigned_mentors": unassigned_mentors,
-        "total_endorsers": all_endorsers.count(),
-        "total_mentors": all_mentors.count(),
+        "endorsers_with_counts": [
+            {"endorser": endorser, "mentor_count": endorser.mentor_count} for endorser in endorsers
+        ],
+        "unassigned_endorser_count": sum(1 for endorser in endorsers if not endorser.mentor_count),
+        "unassigned_mentors": [mentor for mentor in mentors if not mentor.endorser_count],
+        "total_endorsers": len(endorsers),
+        "total_mentors": len(mentors),
     }
     context["active_page"] = "endorser_assign"
     return render(request, ADMIN_ASSIGNMENTS_MENTOR_TEMPLATE, context)
 
 
 @role_required(allowed_roles=["admin"])
-@require_POST
-def assign_mentors(request):
-    try:
-        endorser_id = request.POST.get("endorser_id")
-        mentor_ids = request.POST.getlist("mentor_ids[]")
-        if not endorser_id or not mentor_ids:
-            return JsonResponse({"status": "failed", "message": "Missing data"})
-
-        endorser = User.objects.get(id=endorser_id)
-        mentors = User.objects.filter(id__in=mentor_ids)
-        endorser.mentors.add(*mentors)
-        return JsonResponse({"status": "success", "message": "Mentors assigned successfully"})
-    except Exception as exc:
-        print("Assign error:", exc)
-        return JsonResponse({"status": "failed", "message": str(exc)})
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=graph_etag)
+def endorser_mentor_graph(request):
+    return JsonResponse({"status": "success", "endorsers": endorser_mentor_mapping()})
 
 
 @role_required(allowed_roles=["admin"])
 @require_POST
-def unassign_mentor(request):
-    endorser_id = request.POST.get("endorser_id")
-    mentor_ids = request.POST.getlist("mentor_ids[]")
-
-    try:
-        endorser = CustomUser.objects.get(id=endorser_id)
-        mentors = CustomUser.objects.filter(id__in=mentor_ids)
-        for mentor in mentors:
-            endorser.mentors.remove(mentor)
-        return JsonResponse({"status": "success"})
-    except Exception as exc:
-        return JsonResponse({"status": "error", "message": str(exc)})
-
-
-@role_required(allowed_roles=["admin"])
-def get_assigned_mentors(request):
-    if request.method != "GET":
-        return JsonResponse({"status": "error", "message": "Invalid method"}, status=405)
-
-    endorser_id = request.GET.get("endorser_id")
-    if not endorser_id:
-        return JsonResponse({"status": "error", "message": "endorser_id missing"}, status=400)
-
-    try:
-        endorser = CustomUser.objects.get(id=endorser_id)
-        mentors_qs = endorser.mentors.all().values("id", "first_name", "last_name", "email")
-        return JsonResponse({"status": "success", "mentors": list(mentors_qs)})
-    except CustomUser.DoesNotExist:
-        return JsonResponse({"status": "error", "message": f"Endorser with id={endorser_id} not found"}, status=404)
-    except Exception as exc:
-        return JsonResponse({"status": "error", "message": str(exc), "trace": traceback.format_exc()}, status=500)
-
-
-@role_required(allowed_roles=["admin"])
-@require_POST
-def update_assigned_mentors(request):
-    endorser_id = request.POST.get("endorser_id")
-    mentor_ids = request.POST.getlist("mentor_ids[]")
-
+def apply_endorser_assignments(request):
+    """Body: {"add": {"<endorser id>": [<mentor ids>], ...}, "remove": {...}}."""
     try:
-        endorser = CustomUser.objects.get(id=endorser_id)
-        endorser.mentors.set(mentor_ids)
-        return JsonResponse({"status": "success"})
-    except Exception as exc:
-        return JsonResponse({"status": "error", "message": str(exc)})
+        changes = json.loads(request.body)
+        added, removed = apply_assignments(add=changes.get("add"), remove=changes.get("remove"))
+    except (KeyError, TypeError, ValueError, AttributeError) as exc:
+        return JsonResponse({"status": "error", "message": str(exc)}, status=400)
+    return JsonResponse({"status": "success", "added": added, "removed": removed})
 
 
 # -------------------- Notification Management (FR-30/31) --------------------
 @role_required(allowed_roles=["admin"])
 def admin_notification_view(request):
-    notifications = Notification.objects.order_by("-created_at")[:50]
+    notifications = Notification.objects.select_related("created_by").order_by("-created_at")[:50]
     if request.method == "POST":
         form = NotificationForm(request.POST)
         if form.is_valid():
@@ -743,7 +760,7 @@ def bulk_upload_mentees_view(request):
     locations_map = {loc.code.lower(): loc for loc in Location.objects.all()}
     chapters_map = {(ch.name.lower(), ch.school.name.lower()): ch for ch in Chapter.objects.select_related("school").all()}
     programmes_map = {p.name.lower(): p for p in Programme.objects.all()}
-    mentors_map = {u.email.lower(): u for u in CustomUser.objects.filter(role="mentor")}
+    mentors_map = {u.email.lower(): u for u in CustomUser.objects.with_role("mentor")}
 
     added_count = 0
     errors = []
@@ -833,7 +850,7 @@ def bulk_upload_mentees_view(request):
 
 @role_required(allowed_roles=["admin"])
 def mentee_upload_log_view(request):
-    logs = MenteeUploadLog.objects.order_by("-created_at")[:50]
+    logs = MenteeUploadLog.objects.select_related("uploaded_by").order_by("-created_at")[:50]
     return render(request, ADMIN_MENTEE_UPLOAD_LOG_TEMPLATE, {"logs": logs, "active_page": "upload_logs"})
 
 
@@ -863,7 +880,8 @@ def export_reflective_reports_excel(request):
         
     response = HttpResponse(content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
     response["Content-Disposition"] = 'attachment; filename="reflective_reports_export.xlsx"'
-    workbook.save(response)
+    with timing_phase("export"):
+        workbook.save(response)
     return response
 
 
@@ -889,5 +907,6 @@ def export_work_diaries_excel(request):
         
     response = HttpResponse(content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
     response["Content-Disposition"] = 'attachment; filename="work_diaries_export.xlsx"'
-    workbook.save(response)
+    with timing_phase("export"):
+        workbook.save(response)
     return response
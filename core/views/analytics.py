@@ -0,0 +1,35 @@
+from django.http import JsonResponse
+from django.shortcuts import render
+
+from core.analytics import COHORT_FILTERS, cohort_analytics
+from core.decorators import role_required
+from core.forms import CohortFilterForm
+
+
+ADMIN_COHORT_ANALYTICS_TEMPLATE = "core/admin/analytics/cohorts.html"
+
+
+def _cohort_from_request(request):
+    form = CohortFilterForm(request.GET or None)
+    if form.is_valid():
+        return form, form.cohort()
+    return form, dict.fromkeys(COHORT_FILTERS)
+
+
+@role_required(allowed_roles=["admin"])
+def cohort_analytics_view(request):
+    form, cohort = _cohort_from_request(request)
+    context = {
+        "form": form,
+        "analytics": cohort_analytics(cohort),
+        "active_page": "cohort_analytics",
+    }
+    return render(request, ADMIN_COHORT_ANALYTICS_TEMPLATE, context)
+
+
+@role_required(allowed_roles=["admin"])
+def cohort_analytics_json_view(request):
+    form, cohort = _cohort_from_request(request)
+    if form.is_bound and not form.is_valid():
+        return JsonResponse({"status": "error", "errors": form.errors}, status=400)
+    return JsonResponse(cohort_analytics(cohort))
@@ -0,0 +1,19 @@
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, JsonResponse
+
+from core.autocomplete import AUTOCOMPLETE_SOURCES, DEFAULT_LIMIT, search
+from core.decorators import role_required
+
+
+@role_required(allowed_roles=["admin", "endorser"])
+def autocomplete_view(request, source):
+    """Select2-style results: ``{"results": [{"id", "text"}], "pagination": {"more"}}``."""
+    config = AUTOCOMPLETE_SOURCES.get(source)
+    if config is None:
+        raise Http404("Unknown autocomplete source.")
+    if not request.identity.has_any_role(config["roles"]):
+        raise PermissionDenied("You are not allowed to search this list.")
+
+    limit = request.GET.get("limit", "")
+    results, more = search(source, request.user, request.GET.get("q", ""), int(limit) if limit.isdigit() else DEFAULT_LIMIT)
+    return JsonResponse({"results": [{"id": pk, "text": label} for pk, label in results], "pagination": {"more": more}})
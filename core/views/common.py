@@ -1,8 +1,8 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Q
-from django.utils import timezone
 
-from core.models import Mentee, MentorMenteeAssignment, RatingDomain, VolunteerReportingAssignment
+from core.assignments import current_assignment_filter
+from core.mentee_access import accessible_mentee_ids
+from core.models import MentorMenteeAssignment, RatingDomain, VolunteerReportingAssignment
 from core.roles import role_layout
 
 
@@ -36,15 +36,17 @@ def user_notification_groups(user):
 
 
 def active_assignments_qs(mentor):
-    today = timezone.now().date()
+    # mentor + is_active=True is served by the core_mma_active_mentor_idx partial index.
     return MentorMenteeAssignment.objects.filter(
         mentor=mentor,
         is_active=True,
-    ).filter(Q(end_date__isnull=True) | Q(end_date__gte=today))
+    ).filter(current_assignment_filter())
 
 
 def get_mentee_for_user(user):
-    return Mentee.objects.filter(user=user).first()
+    if not getattr(user, "is_authenticated", False):
+        return None
+    return user.mentee_profile_safe
 
 
 def volunteer_reporting_assignment_for(user):
@@ -60,7 +62,7 @@ def volunteer_reporting_assignment_for(user):
 def mentor_can_access_mentee(user, mentee):
     if user.is_superuser or getattr(user, "role", None) == "admin":
         return True
-    return active_assignments_qs(user).filter(mentee=mentee).exists()
+    return mentee.id in accessible_mentee_ids(user)
 
 
 def domains_for_year(year):
@@ -0,0 +1,102 @@
+import hmac
+
+from django.conf import settings
+from django.contrib import messages
+from django.http import FileResponse, Http404, HttpResponse
+from django.shortcuts import redirect, render
+
+from core.decorators import role_required
+from core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, metrics_enabled, render_metrics
+from core.perf import query_stats
+from core.profiling import (
+    DEFAULT_PROFILE_HEADER,
+    cleanup_profiles,
+    list_profiles,
+    make_profile_token,
+    profile_path,
+    profile_summary,
+)
+
+
+ADMIN_QUERY_REPORT_TEMPLATE = "core/admin/diagnostics/query_report.html"
+ADMIN_PROFILE_LIST_TEMPLATE = "core/admin/diagnostics/profile_list.html"
+ADMIN_PROFILE_DETAIL_TEMPLATE = "core/admin/diagnostics/profile_detail.html"
+PROFILE_SORT_KEYS = ("cumulative", "tottime", "ncalls")
+
+
+@role_required(allowed_roles=["admin"])
+def query_report_view(request):
+    if request.method == "POST":
+        query_stats.reset()
+        messages.success(request, "Query statistics cleared.")
+        return redirect("admin_query_report")
+
+    rows = query_stats.snapshot()
+    context = {
+        "rows": rows,
+        "over_budget_views": sum(1 for row in rows if row["over_budget"]),
+        "active_page": "query_report",
+    }
+    return render(request, ADMIN_QUERY_REPORT_TEMPLATE, context)
+
+
+@role_required(allowed_roles=["admin"])
+def profile_list_view(request):
+    profile_token = None
+    if request.method == "POST":
+        action = request.POST.get("action")
+        if action == "cleanup":
+            removed = cleanup_profiles()
+            messages.success(request, f"Removed {removed} expired profile(s).")
+            return redirect("admin_profile_list")
+        if action == "token":
+            profile_token = make_profile_token(request.user)
+
+    context = {
+        "profiles": list_profiles(),
+        "profiling_enabled": getattr(settings, "PROFILING_ENABLED", False),
+        "sample_rate": getattr(settings, "PROFILING_SAMPLE_RATE", 0.0),
+        "profile_header": getattr(settings, "PROFILING_HEADER", DEFAULT_PROFILE_HEADER),
+        "profile_token": profile_token,
+        "active_page": "profiles",
+    }
+    return render(request, ADMIN_PROFILE_LIST_TEMPLATE, context)
+
+
+@role_required(allowed_roles=["admin"])
+def profile_detail_view(request, name):
+    path = profile_path(name)
+    if path is None:
+        raise Http404("Profile not found.")
+    if request.GET.get("download"):
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=name)
+
+    sort = request.GET.get("sort", "cumulative")
+    if sort not in PROFILE_SORT_KEYS:
+        sort = "cumulative"
+    context = {
+        "name": name,
+        "sort": sort,
+        "sort_keys": PROFILE_SORT_KEYS,
+        "summary": profile_summary(path, sort=sort),
+        "active_page": "profiles",
+    }
+    return render(request, ADMIN_PROFILE_DETAIL_TEMPLATE, context)
+
+
+def _metrics_authorized(request):
+    # A reverse proxy on the same host connects from 127.0.0.1, so loopback is
+    # not trusted by default: scrapers send METRICS_TOKEN, or their address is
+    # listed explicitly.
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if token:
+        scheme, _, credentials = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+        if scheme.lower() == "bearer" and hmac.compare_digest(credentials.encode(), token.encode()):
+            return True
+    return request.META.get("REMOTE_ADDR") in getattr(settings, "METRICS_ALLOWED_IPS", ())
+
+
+def metrics_view(request):
+    if not metrics_enabled() or not _metrics_authorized(request):
+        raise Http404("Metrics are not available.")
+    return HttpResponse(render_metrics(), content_type=METRICS_CONTENT_TYPE)
@@ -1,15 +1,18 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
-from django.db.models import Q
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Prefetch, Q
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_POST
 
+from core.concurrency import gather_reads, render_async
 from core.decorators import role_required
 from core.forms import WorkScheduleAssignmentUpdateForm, WorkScheduleForm
 from core.models import Activity, Notification, WorkSchedule, WorkScheduleAssignment
-from core.views.common import User, role_layout_context
+from core.views.common import User
 
 
 ENDORSER_DASHBOARD_TEMPLATE = "core/endorser/dashboard.html"
@@ -21,56 +24,74 @@ ENDORSER_MENTOR_ACTIVITY_TEMPLATE = "core/endorser/mentor_activity_list.html"
 ASSIGNED_WORK_ITEMS_TEMPLATE = "core/shared/work_items.html"
 WORK_ITEMS_MANAGE_TEMPLATE = "core/endorser/work_schedule.html"
 WORK_ITEM_ASSIGNEE_ROLES = ["endorser", "mentor", "mentee", "volunteer"]
+WORK_ITEM_ASSIGNEE_PREVIEW = 5
+WORK_ITEM_ASSIGNEE_PAGE_SIZE = 50
 
 
-def _sync_work_schedule_assignments(schedule, assignees):
-    assignees = list(assignees)
-    assignee_ids = {assignee.id for assignee in assignees}
-    schedule.mentors.set(assignees)
-
-    existing_assignments = {
-        assignment.assignee_id: assignment
-        for assignment in schedule.assignments.all()
-    }
+def _assignee_rows():
+    return WorkScheduleAssignment.objects.select_related("assignee").order_by(
+        "assignee__first_name", "assignee__username", "id"
+    )
 
-    for assignee in assignees:
-        if assignee.id not in existing_assignments:
-            WorkScheduleAssignment.objects.create(
-                work_schedule=schedule,
-                assignee=assignee,
-            )
 
-    schedule.assignments.exclude(assignee_id__in=assignee_ids).delete()
+def _sync_work_schedule_assignments(schedule, assignees):
+    """Make ``schedule``'s assignees exactly ``assignees`` in a constant number of queries."""
+    wanted = {assignee.id for assignee in assignees}
+    ScheduleMember = WorkSchedule.mentors.through
+
+    with transaction.atomic():
+        members = set(ScheduleMember.objects.filter(workschedule_id=schedule.id).values_list("customuser_id", flat=True))
+        assigned = set(schedule.assignments.values_list("assignee_id", flat=True))
+
+        ScheduleMember.objects.bulk_create(
+            [ScheduleMember(workschedule_id=schedule.id, customuser_id=user_id) for user_id in sorted(wanted - members)],
+            ignore_conflicts=True,
+        )
+        WorkScheduleAssignment.objects.bulk_create(
+            [WorkScheduleAssignment(work_schedule=schedule, assignee_id=user_id) for user_id in sorted(wanted - assigned)],
+            ignore_conflicts=True,
+        )
+        if members - wanted:
+            ScheduleMember.objects.filter(workschedule_id=schedule.id, customuser_id__in=members - wanted).delete()
+        if assigned - wanted:
+            schedule.assignments.filter(assignee_id__in=assigned - wanted).delete()
 
 
 @role_required(allowed_roles=["endorser"])
-def endorser_dashboard(request):
-    assigned_mentors = request.user.mentors.all().order_by("first_name", "last_name", "username")
+async def endorser_dashboard(request):
+    endorser = request.user
+    assigned_mentors = endorser.mentors.all()
     mentor_activities = Activity.objects.filter(user__in=assigned_mentors)
-    notifications_count = Notification.objects.filter(
-        Q(target_group="endorser") | Q(target_group="all")
-    ).count()
-    context = {
-        "assigned_mentors": assigned_mentors[:5],
-        "assigned_mentor_count": assigned_mentors.count(),
-        "mentor_activity_count": mentor_activities.count(),
-        "remarked_activity_count": mentor_activities.exclude(Q(remark__isnull=True) | Q(remark="")).count(),
-        "schedule_count": request.user.schedules.count(),
-        "open_work_item_count": WorkScheduleAssignment.objects.filter(
-            work_schedule__endorser=request.user,
+    context = await gather_reads(
+        assigned_mentors=lambda: list(assigned_mentors.order_by("first_name", "last_name", "username")[:5]),
+        assigned_mentor_count=assigned_mentors.count,
+        mentor_activity_count=mentor_activities.count,
+        remarked_activity_count=mentor_activities.exclude(Q(remark__isnull=True) | Q(remark="")).count,
+        schedule_count=endorser.schedules.count,
+        open_work_item_count=WorkScheduleAssignment.objects.filter(
+            work_schedule__endorser=endorser,
             status__in=[WorkScheduleAssignment.Status.ASSIGNED, WorkScheduleAssignment.Status.IN_PROGRESS, WorkScheduleAssignment.Status.ON_HOLD],
-        ).count(),
-        "notification_count": notifications_count,
-        "active_page": "dashboard",
-    }
-    return render(request, ENDORSER_DASHBOARD_TEMPLATE, context)
+        ).count,
+        notification_count=Notification.objects.filter(
+            Q(target_group="endorser") | Q(target_group="all")
+        ).count,
+    )
+    context["active_page"] = "dashboard"
+    return await render_async(request, ENDORSER_DASHBOARD_TEMPLATE, context)
 
 
 def _manage_work_items(request):
     creator = request.user
     created_schedules = (
         WorkSchedule.objects.filter(endorser=creator)
-        .prefetch_related("assignments__assignee")
+        .with_progress()
+        .prefetch_related(
+            Prefetch(
+                "assignments",
+                queryset=_assignee_rows()[:WORK_ITEM_ASSIGNEE_PREVIEW],
+                to_attr="assignee_preview",
+            )
+        )
         .order_by("-due_date", "-id")
     )
     form_instance = None
@@ -91,12 +112,15 @@ def _manage_work_items(request):
             assignees = form.cleaned_data["assignees"]
             _sync_work_schedule_assignments(work_schedule, assignees)
 
-            for target_group in {assignee.role for assignee in assignees}:
-                Notification.objects.create(
+            # One notification per assignee role, written in a single insert.
+            Notification.objects.bulk_create(
+                Notification(
                     message=f"New work schedule: {work_schedule.role} (Due {work_schedule.due_date})",
                     target_group=target_group,
                     created_by=creator,
                 )
+                for target_group in sorted({assignee.role for assignee in assignees})
+            )
 
             messages.success(
                 request,
@@ -114,7 +138,7 @@ def _manage_work_items(request):
         "active_page": "work_schedule",
         "is_admin_workspace": creator.role == "admin",
     }
-    context.update(role_layout_context(creator))
+    context.update(request.identity.layout)
     return render(request, WORK_ITEMS_MANAGE_TEMPLATE, context)
 
 
@@ -130,6 +154,33 @@ def endorser_work_schedule(request):
     return _manage_work_items(request)
 
 
+@login_required
+@role_required(allowed_roles=["admin", "endorser"])
+def work_schedule_assignees_view(request, schedule_id):
+    """One page of a work item's assignees, for expanding large schedules on demand."""
+    schedule = get_object_or_404(WorkSchedule, id=schedule_id, endorser=request.user)
+    paginator = Paginator(_assignee_rows().filter(work_schedule=schedule), WORK_ITEM_ASSIGNEE_PAGE_SIZE)
+    page = paginator.get_page(request.GET.get("page"))
+    return JsonResponse(
+        {
+            "status": "success",
+            "page": page.number,
+            "num_pages": paginator.num_pages,
+            "total": paginator.count,
+            "has_next": page.has_next(),
+            "assignees": [
+                {
+                    "id": assignment.assignee_id,
+                    "name": assignment.assignee.get_full_name() or assignment.assignee.username,
+                    "status": assignment.status,
+                    "status_display": assignment.get_status_display(),
+                }
+                for assignment in page
+            ],
+        }
+    )
+
+
 @login_required
 @role_required(allowed_roles=["endorser"])
 def endorser_profile(request):
@@ -191,7 +242,7 @@ def assigned_work_items_view(request):
         "assignments": assignments,
         "active_page": "work_items",
     }
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, ASSIGNED_WORK_ITEMS_TEMPLATE, context)
 
 
@@ -1,16 +1,21 @@
 import csv
+import tempfile
+
 import openpyxl
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.db.models import Count
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, redirect, render
 
+from core.assignments import current_assignment_filter
 from core.decorators import role_required
+from core.exports import write_cohort_workbook
 from core.forms import ObjectiveItemForm, YearPlanItemForm
-from core.models import Mentee, MenteeAssessment, ObjectiveItem, RatingDomain, YearPlanItem
-from core.views.common import get_mentee_for_user, mentor_can_access_mentee
+from core.models import CurrentMentorAssignment, Mentee, MenteeAssessment, ObjectiveItem, RatingDomain, YearPlanItem
+from core.perf import timing_phase
+from core.roles import MENTEE_OVERSIGHT_ROLES
 
 
 MENTEE_DASHBOARD_TEMPLATE = "core/mentee/dashboard.html"
@@ -23,7 +28,7 @@ MENTEE_ASSESSMENT_LIST_TEMPLATE = "core/mentee/assessments/list.html"
 
 @role_required(allowed_roles=["mentee"])
 def mentee_dashboard_view(request):
-    mentee = get_mentee_for_user(request.user)
+    mentee = request.identity.mentee
     if not mentee:
         messages.warning(request, "Your mentee profile is not set up yet.")
         return render(request, MENTEE_DASHBOARD_TEMPLATE, {"mentee": None, "active_page": "dashboard"})
@@ -52,7 +57,7 @@ def mentee_dashboard_view(request):
 @login_required
 @role_required(allowed_roles=["mentee"])
 def objective_list_view(request):
-    mentee = get_mentee_for_user(request.user)
+    mentee = request.identity.mentee
     if not mentee:
         messages.warning(request, "Your mentee profile is not set up yet.")
         return render(request, MENTEE_OBJECTIVE_LIST_TEMPLATE, {"mentee": None, "active_page": "objectives"})
@@ -63,7 +68,7 @@ def objective_list_view(request):
 @login_required
 @role_required(allowed_roles=["mentee"])
 def objective_create_view(request):
-    mentee = get_mentee_for_user(request.user)
+    mentee = request.identity.mentee
     if not mentee:
         messages.warning(request, "Your mentee profile is not set up yet.")
         return redirect("mentee_dashboard")
@@ -85,7 +90,7 @@ def objective_create_view(request):
 @login_required
 @role_required(allowed_roles=["mentee"])
 def objective_edit_view(request, objective_id):
-    mentee = get_mentee_for_user(request.user)
+    mentee = request.identity.mentee
     if not mentee:
         messages.warning(request, "Your mentee profile is not set up yet.")
         return redirect("mentee_dashboard")
@@ -110,7 +115,7 @@ def objective_edit_view(request, objective_id):
 @login_required
 @role_required(allowed_roles=["mentee"])
 def year_plan_list_view(request):
-    mentee = get_mentee_for_user(request.user)
+    mentee = request.identity.mentee
     if not mentee:
         messages.warning(request, "Your mentee profile is not set up yet.")
         return render(request, MENTEE_YEAR_PLAN_LIST_TEMPLATE, {"mentee": None, "active_page": "year_plans"})
@@ -121,7 +126,7 @@ def year_plan_list_view(request):
 @login_required
 @role_required(allowed_roles=["mentee"])
 def year_plan_create_view(request):
-    mentee = get_mentee_for_user(request.user)
+    mentee = request.identity.mentee
     if not mentee:
         messages.warning(request, "Your mentee profile is not set up yet.")
         return redirect("mentee_dashboard")
@@ -143,7 +148,7 @@ def year_plan_create_view(request):
 @login_required
 @role_required(allowed_roles=["mentee"])
 def year_plan_edit_view(request, year_plan_id):
-    mentee = get_mentee_for_user(request.user)
+    mentee = request.identity.mentee
     if not mentee:
         messages.warning(request, "Your mentee profile is not set up yet.")
         return redirect("mentee_dashboard")
@@ -168,11 +173,13 @@ def year_plan_edit_view(request, year_plan_id):
 @login_required
 @role_required(allowed_roles=["mentee"])
 def mentee_assessment_list_view(request):
-    mentee = get_mentee_for_user(request.user)
+    mentee = request.identity.mentee
     if not mentee:
         messages.warning(request, "Your mentee profile is not set up yet.")
         return render(request, MENTEE_ASSESSMENT_LIST_TEMPLATE, {"mentee": None, "active_page": "assessments"})
-    assessments = MenteeAssessment.objects.filter(mentee=mentee).select_related("session_type")
+    assessments = (
+        MenteeAssessment.objects.filter(mentee=mentee).select_related("session_type").prefetch_related("ratings")
+    )
     return render(
         request,
         MENTEE_ASSESSMENT_LIST_TEMPLATE,
@@ -185,7 +192,7 @@ def export_mentee_progress_csv(request, mentee_id):
     mentee = get_object_or_404(Mentee, id=mentee_id)
     if request.user.role == "mentee" and mentee.user_id != request.user.id:
         return HttpResponse("You are not allowed to export this mentee.", status=403)
-    if request.user.role == "mentor" and not mentor_can_access_mentee(request.user, mentee):
+    if request.user.role == "mentor" and not request.identity.can_access_mentee(mentee):
         return HttpResponse("You are not allowed to export this mentee.", status=403)
 
     objectives = ObjectiveItem.objects.filter(mentee=mentee).select_related("status")
@@ -203,10 +210,10 @@ def export_mentee_progress_csv(request, mentee_id):
 
     response = HttpResponse(content_type="text/csv")
     response["Content-Disposition"] = f'attachment; filename="{mentee.id}_progress.csv"'
-    writer = csv.writer(response)
+    rows = []
 
-    writer.writerow(["Objectives"])
-    writer.writerow(
+    rows.append(["Objectives"])
+    rows.append(
         [
             "Title",
             "Objective Text",
@@ -221,7 +228,7 @@ def export_mentee_progress_csv(request, mentee_id):
         ]
     )
     for obj in objectives:
-        writer.writerow(
+        rows.append(
             [
                 obj.objective_title,
                 obj.objective_text,
@@ -236,9 +243,9 @@ def export_mentee_progress_csv(request, mentee_id):
             ]
         )
 
-    writer.writerow([])
-    writer.writerow(["Year Plans"])
-    writer.writerow(
+    rows.append([])
+    rows.append(["Year Plans"])
+    rows.append(
         [
             "Year",
             "Milestone",
@@ -252,7 +259,7 @@ def export_mentee_progress_csv(request, mentee_id):
         ]
     )
     for plan in year_plans:
-        writer.writerow(
+        rows.append(
             [
                 plan.get_year_display(),
                 plan.milestone,
@@ -266,9 +273,9 @@ def export_mentee_progress_csv(request, mentee_id):
             ]
         )
 
-    writer.writerow([])
-    writer.writerow(["Assessments"])
-    writer.writerow(
+    rows.append([])
+    rows.append(["Assessments"])
+    rows.append(
         [
             "Date",
             "Year",
@@ -284,7 +291,7 @@ def export_mentee_progress_csv(request, mentee_id):
     )
     for assessment in assessments:
         rating_map = {rating.domain_id: rating.value for rating in assessment.ratings.all()}
-        writer.writerow(
+        rows.append(
             [
                 assessment.date,
                 assessment.get_year_display(),
@@ -299,6 +306,8 @@ def export_mentee_progress_csv(request, mentee_id):
             ]
         )
 
+    with timing_phase("export"):
+        csv.writer(response).writerows(rows)
     return response
 
 
@@ -307,7 +316,7 @@ def export_mentee_progress_excel(request, mentee_id):
     mentee = get_object_or_404(Mentee, id=mentee_id)
     if request.user.role == "mentee" and mentee.user_id != request.user.id:
         return HttpResponse("You are not allowed to export this mentee.", status=403)
-    if request.user.role == "mentor" and not mentor_can_access_mentee(request.user, mentee):
+    if request.user.role == "mentor" and not request.identity.can_access_mentee(mentee):
         return HttpResponse("You are not allowed to export this mentee.", status=403)
 
     objectives = ObjectiveItem.objects.filter(mentee=mentee).select_related("status")
@@ -373,5 +382,45 @@ def export_mentee_progress_excel(request, mentee_id):
 
     response = HttpResponse(content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
     response["Content-Disposition"] = f'attachment; filename="{mentee.id}_progress.xlsx"'
-    workbook.save(response)
+    with timing_phase("export"):
+        workbook.save(response)
     return response
+
+
+@role_required(allowed_roles=MENTEE_OVERSIGHT_ROLES)
+def export_cohort_progress_excel(request):
+    """Progress workbook for every mentee of a mentor, chapter or school (combinable)."""
+    scope = {}
+    for name in ("mentor", "chapter", "school"):
+        value = request.GET.get(name)
+        if value:
+            if not value.isdigit():
+                return HttpResponseBadRequest(f"Invalid {name}.")
+            scope[name] = int(value)
+
+    mentees = Mentee.objects.all()
+    if request.user.role == "mentor":
+        # Mentors only ever export their own mentees.
+        scope["mentor"] = request.user.id
+        mentees = mentees.filter(id__in=request.identity.accessible_mentee_ids)
+    elif "mentor" in scope:
+        mentees = mentees.filter(
+            id__in=CurrentMentorAssignment.objects.filter(mentor_id=scope["mentor"])
+            .filter(current_assignment_filter())
+            .values("mentee_id")
+        )
+    if "chapter" in scope:
+        mentees = mentees.filter(chapter_id=scope["chapter"])
+    if "school" in scope:
+        mentees = mentees.filter(school_id=scope["school"])
+
+    stream = tempfile.TemporaryFile()
+    write_cohort_workbook(mentees, stream)
+    stream.seek(0)
+    label = "_".join(f"{name}_{value}" for name, value in sorted(scope.items())) or "all"
+    return FileResponse(
+        stream,
+        as_attachment=True,
+        filename=f"{label}_mentee_progress.xlsx",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
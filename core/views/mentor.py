@@ -1,14 +1,16 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
+from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
 from core.decorators import role_required
 from core.forms import MenteeAssessmentForm, ObjectiveItemMentorForm, YearPlanItemMentorForm
 from core.models import Activity, AssessmentRating, Mentee, MenteeAssessment, ObjectiveItem, YearPlanItem
+from core.portfolio import mentor_portfolio
 from core.roles import DIRECT_MENTOR_REVIEW_ROLES, MENTEE_OVERSIGHT_ROLES
-from core.views.common import active_assignments_qs, domains_for_year, mentor_can_access_mentee, role_layout_context
+from core.views.common import active_assignments_qs, domains_for_year
 
 
 MENTOR_DASHBOARD_TEMPLATE = "core/mentor/dashboard.html"
@@ -29,8 +31,11 @@ def _mentee_active_page(user):
 
 @role_required(allowed_roles=["mentor"])
 def dashboard_view(request):
-    assignments = active_assignments_qs(request.user).select_related("mentee")
+    assignments = active_assignments_qs(request.user).select_related("mentee", "mentee__user")
     mentees = [assignment.mentee for assignment in assignments]
+    portfolio = mentor_portfolio(request.user)
+    for mentee in mentees:
+        mentee.portfolio = portfolio.get(mentee.id)
     return render(request, MENTOR_DASHBOARD_TEMPLATE, {"assignments": assignments, "mentees": mentees, "active_page": "dashboard"})
 
 
@@ -38,11 +43,11 @@ def dashboard_view(request):
 @role_required(allowed_roles=MENTEE_OVERSIGHT_ROLES)
 def mentor_mentee_list_view(request):
     if request.user.role == "mentor":
-        mentees = Mentee.objects.filter(mentor_assignments__in=active_assignments_qs(request.user)).distinct()
+        mentees = Mentee.objects.filter(id__in=request.identity.accessible_mentee_ids)
     else:
         mentees = Mentee.objects.all()
     context = {"mentees": mentees, "active_page": _mentee_active_page(request.user)}
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, MENTOR_MENTEES_TEMPLATE, context)
 
 
@@ -50,11 +55,11 @@ def mentor_mentee_list_view(request):
 @role_required(allowed_roles=MENTEE_OVERSIGHT_ROLES)
 def mentor_objective_list_view(request, mentee_id):
     mentee = get_object_or_404(Mentee, id=mentee_id)
-    if request.user.role == "mentor" and not mentor_can_access_mentee(request.user, mentee):
+    if request.user.role == "mentor" and not request.identity.can_access_mentee(mentee):
         raise PermissionDenied("You are not allowed to access this mentee.")
     objectives = ObjectiveItem.objects.filter(mentee=mentee).select_related("status")
     context = {"mentee": mentee, "objectives": objectives, "active_page": _mentee_active_page(request.user)}
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, MENTOR_OBJECTIVE_LIST_TEMPLATE, context)
 
 
@@ -62,7 +67,7 @@ def mentor_objective_list_view(request, mentee_id):
 @role_required(allowed_roles=DIRECT_MENTOR_REVIEW_ROLES)
 def mentor_objective_update_view(request, objective_id):
     objective = get_object_or_404(ObjectiveItem, id=objective_id)
-    if request.user.role == "mentor" and not mentor_can_access_mentee(request.user, objective.mentee):
+    if request.user.role == "mentor" and not request.identity.can_access_mentee(objective.mentee):
         raise PermissionDenied("You are not allowed to access this mentee.")
     if request.method == "POST":
         form = ObjectiveItemMentorForm(request.POST, instance=objective)
@@ -77,7 +82,7 @@ def mentor_objective_update_view(request, objective_id):
     else:
         form = ObjectiveItemMentorForm(instance=objective)
     context = {"form": form, "objective": objective, "active_page": _mentee_active_page(request.user)}
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, MENTOR_OBJECTIVE_FORM_TEMPLATE, context)
 
 
@@ -85,11 +90,11 @@ def mentor_objective_update_view(request, objective_id):
 @role_required(allowed_roles=MENTEE_OVERSIGHT_ROLES)
 def mentor_year_plan_list_view(request, mentee_id):
     mentee = get_object_or_404(Mentee, id=mentee_id)
-    if request.user.role == "mentor" and not mentor_can_access_mentee(request.user, mentee):
+    if request.user.role == "mentor" and not request.identity.can_access_mentee(mentee):
         raise PermissionDenied("You are not allowed to access this mentee.")
     year_plans = YearPlanItem.objects.filter(mentee=mentee).select_related("status")
     context = {"mentee": mentee, "year_plans": year_plans, "active_page": _mentee_active_page(request.user)}
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, MENTOR_YEAR_PLAN_LIST_TEMPLATE, context)
 
 
@@ -97,7 +102,7 @@ def mentor_year_plan_list_view(request, mentee_id):
 @role_required(allowed_roles=DIRECT_MENTOR_REVIEW_ROLES)
 def mentor_year_plan_update_view(request, year_plan_id):
     year_plan = get_object_or_404(YearPlanItem, id=year_plan_id)
-    if request.user.role == "mentor" and not mentor_can_access_mentee(request.user, year_plan.mentee):
+    if request.user.role == "mentor" and not request.identity.can_access_mentee(year_plan.mentee):
         raise PermissionDenied("You are not allowed to access this mentee.")
     if request.method == "POST":
         form = YearPlanItemMentorForm(request.POST, instance=year_plan)
@@ -110,7 +115,7 @@ def mentor_year_plan_update_view(request, year_plan_id):
     else:
         form = YearPlanItemMentorForm(instance=year_plan)
     context = {"form": form, "year_plan": year_plan, "active_page": _mentee_active_page(request.user)}
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, MENTOR_YEAR_PLAN_FORM_TEMPLATE, context)
 
 
@@ -118,11 +123,13 @@ def mentor_year_plan_update_view(request, year_plan_id):
 @role_required(allowed_roles=MENTEE_OVERSIGHT_ROLES)
 def mentor_assessment_list_view(request, mentee_id):
     mentee = get_object_or_404(Mentee, id=mentee_id)
-    if request.user.role == "mentor" and not mentor_can_access_mentee(request.user, mentee):
+    if request.user.role == "mentor" and not request.identity.can_access_mentee(mentee):
         raise PermissionDenied("You are not allowed to access this mentee.")
-    assessments = MenteeAssessment.objects.filter(mentee=mentee).select_related("session_type")
+    assessments = (
+        MenteeAssessment.objects.filter(mentee=mentee).select_related("session_type").prefetch_related("ratings")
+    )
     context = {"mentee": mentee, "assessments": assessments, "active_page": _mentee_active_page(request.user)}
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, MENTOR_ASSESSMENT_LIST_TEMPLATE, context)
 
 
@@ -130,7 +137,7 @@ def mentor_assessment_list_view(request, mentee_id):
 @role_required(allowed_roles=DIRECT_MENTOR_REVIEW_ROLES)
 def mentor_assessment_create_view(request, mentee_id):
     mentee = get_object_or_404(Mentee, id=mentee_id)
-    if request.user.role == "mentor" and not mentor_can_access_mentee(request.user, mentee):
+    if request.user.role == "mentor" and not request.identity.can_access_mentee(mentee):
         raise PermissionDenied("You are not allowed to access this mentee.")
 
     rating_errors = []
@@ -138,27 +145,27 @@ def mentor_assessment_create_view(request, mentee_id):
     if request.method == "POST":
         form = MenteeAssessmentForm(request.POST)
         if form.is_valid():
-            assessment = form.save(commit=False)
-            assessment.mentee = mentee
-            assessment.mentor = request.user
-            assessment.save()
-
-            domains = domains_for_year(assessment.year)
-            for domain in domains:
+            ratings = []
+            for domain in domains_for_year(form.cleaned_data["year"]):
                 value = request.POST.get(f"rating_{domain.id}")
                 if value:
-                    AssessmentRating.objects.update_or_create(
-                        assessment=assessment,
-                        domain=domain,
-                        defaults={"value": int(value)},
-                    )
+                    ratings.append(AssessmentRating(domain=domain, value=int(value)))
                 else:
                     rating_errors.append(domain.name)
 
             if rating_errors:
-                assessment.delete()
                 messages.error(request, "Please provide ratings for all domains.")
             else:
+                # Saving the assessment retires the cached portfolios and
+                # analytics once the ratings have committed with it.
+                with transaction.atomic():
+                    assessment = form.save(commit=False)
+                    assessment.mentee = mentee
+                    assessment.mentor = request.user
+                    assessment.save()
+                    for rating in ratings:
+                        rating.assessment = assessment
+                    AssessmentRating.objects.bulk_create(ratings)
                 messages.success(request, "Assessment saved.")
                 return redirect("mentor_assessment_list", mentee_id=mentee.id)
 
@@ -184,7 +191,7 @@ def mentor_assessment_create_view(request, mentee_id):
         "rating_errors": rating_errors,
         "active_page": _mentee_active_page(request.user),
     }
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, MENTOR_ASSESSMENT_FORM_TEMPLATE, context)
 
 
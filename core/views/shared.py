@@ -9,8 +9,8 @@ from core.decorators import role_required
 from core.models import DiaryEntry, ProfileArtifact, ReflectiveReport, RepositoryAsset, VolunteerTranscript
 from core.forms import DiaryEntryForm, ReflectiveReportForm, RepositoryAssetForm
 from core.roles import REVIEW_ACCESS_ROLES, REVIEWER_ROLES
-from core.views.common import role_layout_context, volunteer_reporting_assignment_for
-from core.views.workspace import TRANSCRIPT_TEMPLATE_CHOICES, _scoped_transcript_queryset
+from core.review_queues import scoped_transcript_queryset
+from core.views.workspace import TRANSCRIPT_TEMPLATE_CHOICES
 
 
 PROFILE_TEMPLATE = "core/shared/profile.html"
@@ -23,14 +23,14 @@ REFLECTIVE_REPORT_LIST_TEMPLATE = "core/shared/reflective_report_list.html"
 @login_required
 def profile_view(request):
     context = {"user": request.user, "active_page": "profile"}
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, PROFILE_TEMPLATE, context)
 
 
 @login_required
 @role_required(allowed_roles=["volunteer"])
 def work_diary_view(request):
-    reporting_assignment = volunteer_reporting_assignment_for(request.user)
+    reporting_assignment = request.identity.reporting_assignment
 
     def selected_status():
         return "Submitted" if request.POST.get("submit_action") == "submit" else "Draft"
@@ -54,26 +54,30 @@ def work_diary_view(request):
     else:
         form = DiaryEntryForm(user=request.user)
     
-    entries = DiaryEntry.objects.filter(volunteer=request.user).order_by("-date", "-created_at")[:5]
+    entries = (
+        DiaryEntry.objects.filter(volunteer=request.user)
+        .select_related("location")
+        .order_by("-date", "-created_at")
+    )[:5]
     context = {
         "form": form,
         "entries": entries,
         "reporting_assignment": reporting_assignment,
         "active_page": "work_diary"
     }
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, "core/shared/work_diary.html", context)
 
 
 @login_required
 @role_required(allowed_roles=["volunteer"])
 def work_diary_list_view(request):
-    entries = DiaryEntry.objects.filter(volunteer=request.user).order_by("-date", "-created_at")
+    entries = DiaryEntry.objects.filter(volunteer=request.user).select_related("location").order_by("-date", "-created_at")
     context = {
         "entries": entries,
         "active_page": "work_diary",
     }
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, WORK_DIARY_LIST_TEMPLATE, context)
 
 @login_required
@@ -88,7 +92,7 @@ def reflective_report_view(request):
     def selected_status():
         return "Submitted" if request.POST.get("submit_action") == "submit" else "Draft"
 
-    reporting_assignment = volunteer_reporting_assignment_for(request.user)
+    reporting_assignment = request.identity.reporting_assignment
 
     if request.method == "POST":
         form = ReflectiveReportForm(request.POST, request.FILES, user=request.user)
@@ -126,7 +130,7 @@ def reflective_report_view(request):
         "reporting_assignment": reporting_assignment,
         "active_page": "reflective_report"
     }
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, "core/shared/reflective_report.html", context)
 
 
@@ -148,7 +152,7 @@ def reflective_report_list_view(request):
         "reporter_role": request.user.get_role_display(),
         "active_page": "reflective_report",
     }
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, REFLECTIVE_REPORT_LIST_TEMPLATE, context)
 
 @login_required
@@ -169,7 +173,7 @@ def repository_view(request):
         user_roles.append(request.user.role)
 
     if request.user.role == "admin":
-        assets = RepositoryAsset.objects.all().prefetch_related("attachments")
+        assets = RepositoryAsset.objects.select_related("uploaded_by").prefetch_related("attachments")
     else:
         assets = (
             RepositoryAsset.objects.filter(is_active=True)
@@ -178,6 +182,7 @@ def repository_view(request):
                 Q(role_visibility__in=user_roles) |
                 Q(uploaded_by=request.user)
             )
+            .select_related("uploaded_by")
             .prefetch_related("attachments")
             .distinct()
         )
@@ -209,7 +214,7 @@ def repository_view(request):
         "can_manage_repository": request.user.role == "admin",
         "active_page": "repository"
     }
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, "core/shared/repository.html", context)
 
 
@@ -233,14 +238,14 @@ def transcript_view(request):
     if request.user.role == 'volunteer':
         transcripts = VolunteerTranscript.objects.filter(volunteer=request.user)
     else:
-        transcripts = _scoped_transcript_queryset(request.user)
+        transcripts = scoped_transcript_queryset(request.user)
 
     assigned_roles = set(request.user.roles or [])
     if request.user.role:
         assigned_roles.add(request.user.role)
 
     context = {
-        "transcripts": transcripts,
+        "transcripts": transcripts.select_related("volunteer"),
         "transcript_templates": TRANSCRIPT_TEMPLATE_CHOICES,
         "can_generate_transcript": "volunteer" in assigned_roles and request.user.role == "volunteer",
         "can_review_transcript": request.user.role in REVIEWER_ROLES,
@@ -248,7 +253,7 @@ def transcript_view(request):
         "is_admin_transcript_view": request.user.role == "admin",
         "active_page": "transcript",
     }
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, "core/shared/transcript.html", context)
 
 
@@ -259,7 +264,7 @@ def settings_view(request):
 @login_required
 def workflow_guide_view(request):
     context = {"active_page": "workflow"}
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, WORKFLOW_GUIDE_TEMPLATE, context)
 
 
@@ -282,5 +287,5 @@ def profile_edit(request):
         return redirect("profile")
 
     context = {"user": user, "active_page": "profile"}
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, PROFILE_EDIT_TEMPLATE, context)
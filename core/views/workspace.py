@@ -1,5 +1,6 @@
 from decimal import Decimal
 
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
@@ -8,12 +9,12 @@ from django.db.models import Count, Q, Sum
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_POST
 
+from core.concurrency import gather_reads, render_async
 from core.decorators import role_required
 from core.forms import ProfileArtifactForm
 from core.models import (
     Activity,
     ApprovalLog,
-    Chapter,
     CustomUser,
     DiaryEntry,
     EvidenceAttachment,
@@ -22,8 +23,15 @@ from core.models import (
     ReflectiveReport,
     VolunteerTranscript,
 )
+from core.review_queues import (
+    diary_queue_queryset,
+    is_final_approver,
+    report_queue_queryset,
+    review_scope_location_ids,
+    transcript_queue_queryset,
+)
 from core.roles import REVIEW_ACCESS_ROLES, REVIEWER_ROLES
-from core.views.common import role_layout_context, user_notification_groups, volunteer_reporting_assignment_for
+from core.views.common import user_notification_groups
 
 VOLUNTEER_DASHBOARD_TEMPLATE = "core/workspace/volunteer_dashboard.html"
 APPROVAL_DASHBOARD_TEMPLATE = "core/workspace/approval_dashboard.html"
@@ -43,62 +51,20 @@ def _as_decimal(value):
     return value if value is not None else Decimal("0")
 
 
-def _is_final_approver(user):
-    return user.role == "admin"
-
-
-def _review_scope_location_ids(user):
-    if user.role in REVIEWER_ROLES and Chapter.objects.filter(leader=user).exists():
-        return list(
-            Chapter.objects.filter(leader=user)
-            .exclude(location__isnull=True)
-            .values_list("location_id", flat=True)
-            .distinct()
-        )
-    return None
-
-
-def _scope_location_queryset(queryset, user, field_name="location_id"):
-    location_ids = _review_scope_location_ids(user)
-    if location_ids is None:
-        return queryset
-    if not location_ids:
-        return queryset.none()
-    return queryset.filter(**{f"{field_name}__in": location_ids})
-
-
-def _scoped_transcript_queryset(user, queryset=None):
-    if queryset is None:
-        queryset = VolunteerTranscript.objects.all()
-    location_ids = _review_scope_location_ids(user)
-    if location_ids is None:
-        return queryset
-    if not location_ids:
-        return queryset.none()
-
-    volunteer_ids = set(
-        ReflectiveReport.objects.filter(location_id__in=location_ids).values_list("user_id", flat=True)
-    )
-    volunteer_ids.update(
-        DiaryEntry.objects.filter(location_id__in=location_ids).values_list("volunteer_id", flat=True)
-    )
-    return queryset.filter(volunteer_id__in=volunteer_ids)
-
-
 def _ensure_report_in_scope(report, user):
-    location_ids = _review_scope_location_ids(user)
+    location_ids = review_scope_location_ids(user)
     if location_ids is not None and report.location_id not in location_ids:
         raise PermissionDenied("You are not allowed to review this report.")
 
 
 def _ensure_diary_in_scope(diary, user):
-    location_ids = _review_scope_location_ids(user)
+    location_ids = review_scope_location_ids(user)
     if location_ids is not None and diary.location_id not in location_ids:
         raise PermissionDenied("You are not allowed to review this diary.")
 
 
 def _ensure_transcript_in_scope(transcript, user):
-    location_ids = _review_scope_location_ids(user)
+    location_ids = review_scope_location_ids(user)
     if location_ids is None:
         return
     if not location_ids:
@@ -246,90 +212,78 @@ def _create_notifications(created_by, target_groups, subject, message):
             seen.add(group)
 
 
-def _report_queue_queryset(user):
-    statuses = ["Submitted", "Reviewed"] if _is_final_approver(user) else ["Submitted"]
-    return _scope_location_queryset(
-        ReflectiveReport.objects.filter(status__in=statuses).select_related("user", "location", "programme"),
-        user,
-    )
-
-
-def _diary_queue_queryset(user):
-    statuses = ["Submitted", "Reviewed"] if _is_final_approver(user) else ["Submitted"]
-    return _scope_location_queryset(
-        DiaryEntry.objects.filter(review_status__in=statuses).select_related("volunteer", "location"),
-        user,
-    )
-
-
-def _transcript_queue_queryset(user):
-    if user.role not in REVIEWER_ROLES:
-        return VolunteerTranscript.objects.none()
-    statuses = ["Pending Review"]
-    return _scoped_transcript_queryset(
-        user,
-        VolunteerTranscript.objects.filter(approval_status__in=statuses).select_related("volunteer"),
-    )
+def _upload_profile_artifact(request):
+    artifact_form = ProfileArtifactForm(request.POST, request.FILES)
+    if artifact_form.is_valid():
+        artifact = artifact_form.save(commit=False)
+        artifact.user = request.user
+        artifact.save()
+        messages.success(request, "Profile artifact uploaded.")
+        return artifact_form, redirect("volunteer_dashboard")
+    return artifact_form, None
 
 
 @login_required
 @role_required(allowed_roles=["volunteer"])
-def volunteer_dashboard_view(request):
+async def volunteer_dashboard_view(request):
     artifact_form = ProfileArtifactForm()
     if request.method == "POST":
-        artifact_form = ProfileArtifactForm(request.POST, request.FILES)
-        if artifact_form.is_valid():
-            artifact = artifact_form.save(commit=False)
-            artifact.user = request.user
-            artifact.save()
-            messages.success(request, "Profile artifact uploaded.")
-            return redirect("volunteer_dashboard")
-
-    diaries = DiaryEntry.objects.filter(volunteer=request.user).order_by("-date")
-    reports = ReflectiveReport.objects.filter(user=request.user).order_by("-date")
-    transcripts = VolunteerTranscript.objects.filter(volunteer=request.user).order_by("-created_at")
-    artifacts = ProfileArtifact.objects.filter(user=request.user).order_by("-created_at")
-    reporting_assignment = volunteer_reporting_assignment_for(request.user)
-
-    context = {
-        "artifact_form": artifact_form,
-        "diary_count": diaries.count(),
-        "report_count": reports.count(),
-        "submitted_diary_count": diaries.filter(review_status__in=["Submitted", "Reviewed"]).count(),
-        "submitted_report_count": reports.filter(status__in=["Submitted", "Reviewed"]).count(),
-        "approved_transcript_count": transcripts.filter(approval_status="Approved").count(),
-        "public_artifact_count": artifacts.filter(is_public=True).count(),
-        "recent_diaries": diaries[:5],
-        "recent_reports": reports[:5],
-        "recent_transcripts": transcripts[:5],
-        "recent_artifacts": artifacts[:5],
-        "reporting_assignment": reporting_assignment,
-        "active_page": "dashboard",
-        "public_profile_user": request.user,
-    }
-    context.update(role_layout_context(request.user))
-    return render(request, VOLUNTEER_DASHBOARD_TEMPLATE, context)
+        artifact_form, response = await sync_to_async(_upload_profile_artifact)(request)
+        if response is not None:
+            return response
+
+    volunteer = request.user
+    diaries = DiaryEntry.objects.filter(volunteer=volunteer).order_by("-date")
+    reports = ReflectiveReport.objects.filter(user=volunteer).order_by("-date")
+    transcripts = VolunteerTranscript.objects.filter(volunteer=volunteer).order_by("-created_at")
+    artifacts = ProfileArtifact.objects.filter(user=volunteer).order_by("-created_at")
+
+    context = await gather_reads(
+        diary_count=diaries.count,
+        report_count=reports.count,
+        submitted_diary_count=diaries.filter(review_status__in=["Submitted", "Reviewed"]).count,
+        submitted_report_count=reports.filter(status__in=["Submitted", "Reviewed"]).count,
+        approved_transcript_count=transcripts.filter(approval_status="Approved").count,
+        public_artifact_count=artifacts.filter(is_public=True).count,
+        recent_diaries=lambda: list(diaries[:5]),
+        recent_reports=lambda: list(reports[:5]),
+        recent_transcripts=lambda: list(transcripts[:5]),
+        recent_artifacts=lambda: list(artifacts[:5]),
+        reporting_assignment=lambda: request.identity.reporting_assignment,
+    )
+    context.update(
+        {
+            "artifact_form": artifact_form,
+            "active_page": "dashboard",
+            "public_profile_user": volunteer,
+        }
+    )
+    context.update(request.identity.layout)
+    return await render_async(request, VOLUNTEER_DASHBOARD_TEMPLATE, context)
 
 
 @login_required
 @role_required(allowed_roles=REVIEW_ACCESS_ROLES)
-def approval_dashboard_view(request):
-    pending_reports = _report_queue_queryset(request.user).count()
-    pending_diaries = _diary_queue_queryset(request.user).count()
-    pending_transcripts = _transcript_queue_queryset(request.user).count()
-
-    context = {
-        "pending_reports": pending_reports,
-        "pending_diaries": pending_diaries,
-        "pending_transcripts": pending_transcripts,
-        "recent_reports": _report_queue_queryset(request.user)[:5],
-        "recent_diaries": _diary_queue_queryset(request.user)[:5],
-        "recent_transcripts": _transcript_queue_queryset(request.user)[:5],
-        "is_final_approver": _is_final_approver(request.user),
-        "active_page": "review_dashboard",
-    }
-    context.update(role_layout_context(request.user))
-    return render(request, APPROVAL_DASHBOARD_TEMPLATE, context)
+async def approval_dashboard_view(request):
+    reviewer = request.user
+    # The queue helpers resolve the reviewer's chapter scope with a query, so
+    # they are built inside each read rather than here on the event loop.
+    context = await gather_reads(
+        pending_reports=lambda: report_queue_queryset(reviewer).count(),
+        pending_diaries=lambda: diary_queue_queryset(reviewer).count(),
+        pending_transcripts=lambda: transcript_queue_queryset(reviewer).count(),
+        recent_reports=lambda: list(report_queue_queryset(reviewer)[:5]),
+        recent_diaries=lambda: list(diary_queue_queryset(reviewer)[:5]),
+        recent_transcripts=lambda: list(transcript_queue_queryset(reviewer)[:5]),
+    )
+    context.update(
+        {
+            "is_final_approver": is_final_approver(reviewer),
+            "active_page": "review_dashboard",
+        }
+    )
+    context.update(request.identity.layout)
+    return await render_async(request, APPROVAL_DASHBOARD_TEMPLATE, context)
 
 
 @login_required
@@ -338,9 +292,9 @@ def approval_queue_view(request):
     record_filter = request.GET.get("record", "all")
     search = request.GET.get("q", "").strip()
 
-    reports = _report_queue_queryset(request.user)
-    diaries = _diary_queue_queryset(request.user)
-    transcripts = _transcript_queue_queryset(request.user)
+    reports = report_queue_queryset(request.user)
+    diaries = diary_queue_queryset(request.user)
+    transcripts = transcript_queue_queryset(request.user)
 
     if search:
         reports = reports.filter(Q(user__first_name__icontains=search) | Q(user__last_name__icontains=search) | Q(activity_name__icontains=search))
@@ -353,10 +307,10 @@ def approval_queue_view(request):
         "reports": reports if record_filter in ("all", "reports") else [],
         "diaries": diaries if record_filter in ("all", "diaries") else [],
         "transcripts": transcripts if record_filter in ("all", "transcripts") else [],
-        "is_final_approver": _is_final_approver(request.user),
+        "is_final_approver": is_final_approver(request.user),
         "active_page": "approval_queue",
     }
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, APPROVAL_QUEUE_TEMPLATE, context)
 
 
@@ -374,7 +328,7 @@ def review_reflective_report_view(request, report_id):
         return redirect("approval_queue")
 
     if action == "approve":
-        report.status = "Approved" if _is_final_approver(request.user) else "Reviewed"
+        report.status = "Approved" if is_final_approver(request.user) else "Reviewed"
     else:
         report.status = "Returned"
     report.save(update_fields=["status", "updated_at"])
@@ -384,14 +338,14 @@ def review_reflective_report_view(request, report_id):
         reviewer=request.user,
         decision=(
             "approved"
-            if action == "approve" and _is_final_approver(request.user)
+            if action == "approve" and is_final_approver(request.user)
             else "escalated"
             if action == "approve"
             else "returned"
         ),
         comments=comments,
     )
-    if action == "approve" and _is_final_approver(request.user):
+    if action == "approve" and is_final_approver(request.user):
         _create_group_notification(
             request.user,
             "volunteer",
@@ -432,7 +386,7 @@ def review_work_diary_view(request, diary_id):
         return redirect("approval_queue")
 
     if action == "approve":
-        diary.review_status = "Approved" if _is_final_approver(request.user) else "Reviewed"
+        diary.review_status = "Approved" if is_final_approver(request.user) else "Reviewed"
     else:
         diary.review_status = "Returned"
     diary.save(update_fields=["review_status", "updated_at"])
@@ -442,14 +396,14 @@ def review_work_diary_view(request, diary_id):
         reviewer=request.user,
         decision=(
             "approved"
-            if action == "approve" and _is_final_approver(request.user)
+            if action == "approve" and is_final_approver(request.user)
             else "escalated"
             if action == "approve"
             else "returned"
         ),
         comments=comments,
     )
-    if action == "approve" and _is_final_approver(request.user):
+    if action == "approve" and is_final_approver(request.user):
         _create_group_notification(
             request.user,
             "volunteer",
@@ -585,7 +539,7 @@ def volunteer_public_profile_view(request, user_id):
         "approved_diaries_count": DiaryEntry.objects.filter(volunteer=volunteer, review_status="Approved").count(),
         "active_page": "public_profile",
     }
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, VOLUNTEER_PUBLIC_PROFILE_TEMPLATE, context)
 
 
@@ -604,7 +558,7 @@ def volunteer_internal_profile_view(request, user_id):
         "diaries": DiaryEntry.objects.filter(volunteer=volunteer).order_by("-date")[:10],
         "active_page": "volunteer_profiles",
     }
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, VOLUNTEER_INTERNAL_PROFILE_TEMPLATE, context)
 
 
@@ -616,5 +570,5 @@ def notification_center_view(request):
         "notifications": notifications,
         "active_page": "notifications",
     }
-    context.update(role_layout_context(request.user))
+    context.update(request.identity.layout)
     return render(request, NOTIFICATIONS_TEMPLATE, context)
@@ -28,20 +28,25 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.ServerTimingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.IdentityMiddleware',
     'allauth.account.middleware.AccountMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ServerTimingViewMiddleware',
 ]
 
 ROOT_URLCONF = 'lud-suite.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / "templates"],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -56,6 +61,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'lud-suite.wsgi.application'
+ASGI_APPLICATION = 'lud-suite.asgi.application'
 
 # Database
 DATABASES = {
@@ -65,6 +71,19 @@ DATABASES = {
     }
 }
 
+# Cache shared by every worker process. Access sets, portfolios, analytics
+# and the metrics snapshot are retired by bumping counters stored here, so a
+# per-process cache (LocMemCache, Django's default) would leave other workers
+# serving stale entries. The database cache needs no extra service; create
+# its table once with `manage.py createcachetable`. A Redis deployment can
+# use django.core.cache.backends.redis.RedisCache instead.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'lud_cache',
+    }
+}
+
 # Password validators
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -86,6 +105,14 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Evidence and repository uploads are stored once per distinct content
+# (see core/storage.py); run `manage.py collect_blobs` to free unused blobs.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "evidence": {"BACKEND": "core.storage.DeduplicatingStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # ---------------- Authentication ----------------
@@ -123,3 +150,61 @@ SOCIALACCOUNT_AUTO_SIGNUP = True
 # Redirect if someone tries to access signup page
 ACCOUNT_SIGNUP_REDIRECT_URL = '/'
 MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
+
+# ---------------- Performance instrumentation ----------------
+# Requests issuing more queries than their budget are logged as warnings and
+# listed on the admin query report. Override per URL name in QUERY_BUDGETS.
+QUERY_BUDGET_DEFAULT = 50
+QUERY_BUDGETS = {}
+QUERY_STATS_SAMPLE_RATE = 1.0
+
+# cProfile sampling (opt-in). When enabled, PROFILING_SAMPLE_RATE of requests,
+# plus any request carrying a signed token from the admin "Request Profiles"
+# page in the PROFILING_HEADER header, are profiled into PROFILING_DIR.
+PROFILING_ENABLED = False
+PROFILING_SAMPLE_RATE = 0.0
+PROFILING_HEADER = "X-Profile"
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+PROFILING_DIR = BASE_DIR / "profiles"
+PROFILING_RETENTION_DAYS = 7
+PROFILING_MAX_FILES = 200
+
+# Server-Timing header and one JSON "request_timing" line per request on the
+# "core.timing" logger (INFO), keyed by URL name and active role.
+SERVER_TIMING_ENABLED = True
+
+# Prometheus text endpoint at /metrics. Scrapers send "Authorization: Bearer
+# <METRICS_TOKEN>" or connect from an address in METRICS_ALLOWED_IPS; with
+# neither configured the endpoint answers 404. Do not list 127.0.0.1 behind a
+# reverse proxy on the same host: every proxied request comes from there.
+# Request latency, query and export series are fed by ServerTimingMiddleware;
+# each worker adds its totals to the shared cache every METRICS_FLUSH_SECONDS
+# and a scrape sums them. Queue depths and import totals come from the
+# snapshot that `manage.py refresh_metrics` stores there (run it from cron).
+METRICS_ENABLED = True
+METRICS_FLUSH_SECONDS = 10
+METRICS_TOKEN = None
+METRICS_ALLOWED_IPS = ()
+
+# Async dashboards (admin, endorser, volunteer, approval) gather their
+# independent reads on a pool of DASHBOARD_READ_WORKERS threads, each with its
+# own connection. None fans out on every backend except SQLite; True/False
+# force it. Reads always run sequentially inside a transaction.
+DASHBOARD_CONCURRENT_READS = None
+DASHBOARD_READ_WORKERS = 4
+
+# Mentor -> mentee authorisation set, cached per mentor and day in the default
+# cache and retired whenever a MentorMenteeAssignment is saved or deleted.
+# None caches it only in Redis or Memcached (from the database cache it costs
+# more than the query it saves); True also uses the database cache. Never
+# cached when CACHES uses a per-process backend such as LocMemCache.
+MENTEE_ACCESS_CACHE_ENABLED = None
+
+# Mentor dashboard portfolio (objectives, assessments, overdue year plans per
+# mentee), cached per mentor and day and retired when any of them changes.
+# Like the access set, never cached in a per-process cache.
+MENTOR_PORTFOLIO_CACHE_ENABLED = True
+
+# Admin cohort analytics, cached per cohort filter combination and retired
+# whenever an assessment, rating or mentee changes; not cached per-process either.
+COHORT_ANALYTICS_CACHE_SECONDS = 60 * 60